@@ -0,0 +1,107 @@
+"""
+Apply and verify a delta asset.
+
+Rebuilds a version's binary from the previous version's binary and the
+published delta, checking every checksum recorded in the release manifest:
+
+    python scripts/apply_delta.py --manifest releases/2.1.226/manifest.json \\
+        --platform linux-x64 --source claude-2.1.225-linux-x64 \\
+        --delta claude-2.1.226-linux-x64.from-2.1.225.zst --output claude
+
+Without `--manifest`, pass the expected checksums with `--source-sha256` /
+`--target-sha256` (or skip verification).
+"""
+
+import os
+import sys
+import json
+import logging
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from lib.blobstore import sha256_file
+from lib.delta import apply_delta
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S"
+)
+log = logging.getLogger(__name__)
+
+
+def verify(path: Path, expected: str | None, what: str) -> None:
+    """
+    Raise RuntimeError if a file's SHA256 differs from the expected one.
+    """
+    if not expected:
+        return
+    actual = sha256_file(path)
+    if actual.lower() != expected.lower():
+        raise RuntimeError(f"{what} checksum mismatch [{path.name}]: expected [{expected}], got [{actual}]")
+    log.info(f"{what} checksum verified [{path.name}]")
+
+
+def main(args: argparse.Namespace) -> int:
+    """
+    Main entry point.
+
+    Returns:
+        0 if the output was rebuilt and verified, otherwise 1.
+    """
+    expected = {
+        "sourceChecksum": args.source_sha256,
+        "targetChecksum": args.target_sha256,
+        "checksum": None,
+    }
+
+    try:
+        if args.manifest:
+            with open(args.manifest, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            record = manifest.get("deltas", {}).get(args.platform)
+            if not record:
+                raise RuntimeError(f"No delta for platform [{args.platform}] in [{args.manifest}]")
+            expected.update({k: record.get(k) for k in expected})
+
+        source, delta, output = Path(args.source), Path(args.delta), Path(args.output)
+
+        verify(source, expected["sourceChecksum"], "Source")
+        verify(delta, expected["checksum"], "Delta")
+        if args.check:
+            return 0
+
+        apply_delta(source, delta, output)
+        verify(output, expected["targetChecksum"], "Target")
+
+        if output.stat().st_mode & 0o111 == 0 and not output.name.endswith(".exe"):
+            output.chmod(output.stat().st_mode | 0o755)
+
+        log.info(f"Rebuilt [{output}] ({output.stat().st_size / 1024 / 1024:.1f}MB)")
+        return 0
+
+    except (RuntimeError, OSError, json.JSONDecodeError) as e:
+        log.error(f"Applying delta failed: {e}")
+        if not args.check:
+            Path(args.output).unlink(missing_ok=True)
+        return 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild a binary from the previous version and a delta.")
+    parser.add_argument("--source", required=True, help="Binary of the version the delta starts from")
+    parser.add_argument("--delta", required=True, help="Delta asset")
+    parser.add_argument("--output", required=True, help="Where to write the rebuilt binary")
+    parser.add_argument("--manifest", help="releases/{version}/manifest.json holding the delta record")
+    parser.add_argument("--platform", help="Platform key in the manifest, e.g. linux-x64")
+    parser.add_argument("--source-sha256", help="Expected source checksum (without --manifest)")
+    parser.add_argument("--target-sha256", help="Expected output checksum (without --manifest)")
+    parser.add_argument("--check", action="store_true", help="Only verify the source and delta checksums")
+    args = parser.parse_args()
+
+    if args.manifest and not args.platform:
+        parser.error("--manifest requires --platform")
+
+    sys.exit(main(args))
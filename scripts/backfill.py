@@ -0,0 +1,294 @@
+"""
+Entry point for bulk backfills.
+
+Syncs every unsynced version in a range, several versions at a time, under
+global download/upload limits, checkpointing progress so a run can stop at a
+time budget and a later run picks up where it left off:
+
+    python scripts/backfill.py --from 1.0.37 --to 2.0.0 --time-budget 18000
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import logging
+import argparse
+from pathlib import Path
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from lib import limits, metrics, mirror, platforms, profiling
+from lib.actions import set_output
+from lib.config import (
+    MIN_VERSION,
+    BACKFILL_CONCURRENCY,
+    BACKFILL_DOWNLOADS,
+    BACKFILL_UPLOADS,
+    BACKFILL_COMMIT_EVERY,
+    BACKFILL_TIME_BUDGET,
+    BACKFILL_CHECKPOINT,
+    METRICS_JSON_FILE,
+    METRICS_PROMETHEUS_FILE,
+    MIRROR_DIR,
+)
+from lib.fetcher import get_gcs_bucket, get_manifest
+from lib.http_client import log_connection_stats
+from lib.changelog import fetch_changelog, parse_versions
+from lib.version import VersionIndex, load_index, flush_synced
+from lib.git_batch import GitBatch
+from lib.release import load_catalog
+from lib.metadata import load_version_manifest
+from lib.sync import SyncJob, cleanup, run_stages
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S"
+)
+log = logging.getLogger(__name__)
+
+
+def load_checkpoint(path: Path, first: str, last: str, selection: str) -> dict:
+    """
+    Load backfill progress for a range and platform selection; a checkpoint
+    for a different range or selection starts over.
+    """
+    if path.exists():
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                checkpoint = json.load(f)
+            if (checkpoint.get("from") == first and checkpoint.get("to") == last
+                    and checkpoint.get("platforms", "all platforms") == selection):
+                return checkpoint
+            log.info(f"Checkpoint [{path}] is for a different range or platform selection; starting over")
+        except (json.JSONDecodeError, IOError) as e:
+            log.warning(f"Ignoring unreadable checkpoint [{path}]: {e}")
+
+    return {
+        "from": first, "to": last, "platforms": selection,
+        "done": [], "failed": {}, "sizes": {}, "runs": 0,
+    }
+
+
+def save_checkpoint(path: Path, checkpoint: dict) -> None:
+    checkpoint["updatedAt"] = datetime.now(timezone.utc).isoformat()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(tmp, path)
+
+
+def version_sizes(gcs_bucket: str, versions: list[str], known: dict[str, int]) -> dict[str, int]:
+    """
+    Total size of the selected binaries per version from the manifests
+    (fetched concurrently, cached).
+    """
+    missing = [v for v in versions if v not in known]
+
+    def total(version: str) -> int:
+        manifest = platforms.select(get_manifest(gcs_bucket, version))
+        return sum(info.get("size") or 0 for info in manifest.get("platforms", {}).values())
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for version, size in zip(missing, executor.map(total, missing)):
+            known[version] = size
+    return {v: known[v] for v in versions}
+
+
+def interleave_by_size(versions: list[str], sizes: dict[str, int]) -> list[str]:
+    """
+    Order versions largest, smallest, second largest, second smallest, ...
+
+    With several versions in flight, pairing big and small ones keeps some
+    versions uploading while others hold the download slots, instead of all
+    of them downloading (or uploading) at the same time.
+    """
+    ordered = sorted(versions, key=lambda v: sizes.get(v, 0), reverse=True)
+    result = []
+    lo, hi = 0, len(ordered) - 1
+    while lo <= hi:
+        result.append(ordered[lo])
+        lo += 1
+        if lo <= hi:
+            result.append(ordered[hi])
+            hi -= 1
+    return result
+
+
+def main(args: argparse.Namespace) -> int:
+    """
+    Main entry point.
+
+    Returns:
+        0 if every attempted version succeeded, otherwise 1.
+    """
+    started = time.monotonic()
+    stopping = False
+
+    def request_stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        log.warning(f"Received signal [{signum}]; finishing versions in flight")
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    limits.configure(args.downloads, args.uploads)
+
+    try:
+        gcs_bucket = get_gcs_bucket()
+        changelog_content = fetch_changelog()
+        load_catalog()
+
+        upstream = VersionIndex(parse_versions(changelog_content))
+        in_range = upstream.range(args.first, args.last)
+        if not in_range:
+            log.info(f"No upstream versions in range [{args.first}, {args.last}]")
+            return 0
+
+        checkpoint_path = Path(args.checkpoint)
+        checkpoint = load_checkpoint(checkpoint_path, in_range[0], in_range[-1], platforms.describe())
+        checkpoint["runs"] += 1
+
+        synced = load_index()
+        done = set(checkpoint["done"])
+        # Synced versions whose saved manifest skipped platforms the selection now includes.
+        widened = {
+            v for v in in_range
+            if v in synced and platforms.newly_selected(load_version_manifest(v))
+        }
+        if widened:
+            log.info(f"[{len(widened)}] synced version(s) get previously skipped platforms added")
+        # Failed versions are retried even if an older run recorded them as synced.
+        retry = set(checkpoint["failed"])
+        todo = [v for v in in_range if (v not in synced or v in widened or v in retry) and v not in done]
+        if args.skip_failed:
+            todo = [v for v in todo if v not in checkpoint["failed"]]
+
+        sizes = version_sizes(gcs_bucket, todo, checkpoint["sizes"])
+        plan = interleave_by_size(todo, sizes)
+        total_bytes = sum(sizes.values())
+        log.info(
+            f"Backfill [{in_range[0]} - {in_range[-1]}]: [{len(plan)}] version(s) to sync, "
+            f"[{total_bytes / 1024 / 1024 / 1024:.1f}GB], run [{checkpoint['runs']}]"
+        )
+        save_checkpoint(checkpoint_path, checkpoint)
+
+        if args.dry_run:
+            for version in plan:
+                print(f"{version}\t{sizes[version]}")
+            return 0
+
+        git_batch = GitBatch(every=args.commit_every)
+        durations: list[float] = []
+        succeeded: list[str] = []
+        failed: dict[str, str] = {}
+
+        def sync(version: str) -> float:
+            job = SyncJob(gcs_bucket, version, changelog_content, git_batch)
+            start = time.monotonic()
+            try:
+                run_stages(job)
+            finally:
+                cleanup(job)
+            return time.monotonic() - start
+
+        def budget_allows() -> bool:
+            if stopping:
+                return False
+            elapsed = time.monotonic() - started
+            # Do not start a version that would likely run past the budget.
+            estimate = sum(durations) / len(durations) if durations else 0.0
+            return elapsed + estimate <= args.time_budget
+
+        queue = list(plan)
+        with ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix="backfill") as executor:
+            running = {}
+            while queue or running:
+                while queue and len(running) < args.concurrency and budget_allows():
+                    version = queue.pop(0)
+                    running[executor.submit(sync, version)] = version
+
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    version = running.pop(future)
+                    try:
+                        durations.append(future.result())
+                        succeeded.append(version)
+                        checkpoint["done"].append(version)
+                        checkpoint["failed"].pop(version, None)
+                    except Exception as e:
+                        log.error(f"Failed to backfill version [{version}]: {e}", exc_info=True)
+                        failed[version] = str(e)
+                        checkpoint["failed"][version] = str(e)
+                    save_checkpoint(checkpoint_path, checkpoint)
+
+                if queue and not budget_allows():
+                    log.warning(f"Time budget reached; [{len(queue)}] version(s) left for the next run")
+                    queue.clear()
+
+        git_batch.commit()
+        flush_synced()
+
+        remaining = len(plan) - len(succeeded) - len(failed)
+        checkpoint["remaining"] = remaining
+        save_checkpoint(checkpoint_path, checkpoint)
+
+        elapsed = time.monotonic() - started
+        log.info(
+            f"Backfill run finished in [{elapsed / 60:.1f}min]: succeeded [{len(succeeded)}], "
+            f"failed [{len(failed)}], remaining [{remaining}]"
+        )
+        log_connection_stats()
+
+        set_output("remaining", str(remaining + len(failed)))
+        metrics.set_run(versions=len(succeeded) + len(failed), succeeded=len(succeeded),
+                        failed=len(failed), remaining=remaining)
+        return 0 if not failed else 1
+
+    except Exception as e:
+        log.error(f"Backfill failed: {e}", exc_info=True)
+        return 1
+    finally:
+        metrics.export(METRICS_JSON_FILE, METRICS_PROMETHEUS_FILE)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill a range of Claude Code versions.")
+    parser.add_argument("--from", dest="first", default=MIN_VERSION,
+                        help=f"Oldest version to sync (default: {MIN_VERSION})")
+    parser.add_argument("--to", dest="last", default=None, help="Newest version to sync (default: newest)")
+    parser.add_argument("--concurrency", type=int, default=BACKFILL_CONCURRENCY,
+                        help=f"Versions in flight (default: {BACKFILL_CONCURRENCY})")
+    parser.add_argument("--downloads", type=int, default=BACKFILL_DOWNLOADS,
+                        help=f"Concurrent file downloads across versions (default: {BACKFILL_DOWNLOADS})")
+    parser.add_argument("--uploads", type=int, default=BACKFILL_UPLOADS,
+                        help=f"Concurrent asset uploads across versions (default: {BACKFILL_UPLOADS})")
+    parser.add_argument("--commit-every", type=int, default=BACKFILL_COMMIT_EVERY,
+                        help=f"Commit and push after this many versions (default: {BACKFILL_COMMIT_EVERY})")
+    parser.add_argument("--time-budget", type=float, default=BACKFILL_TIME_BUDGET,
+                        help=f"Seconds after which no new version is started (default: {BACKFILL_TIME_BUDGET})")
+    parser.add_argument("--checkpoint", default=BACKFILL_CHECKPOINT,
+                        help=f"Progress file (default: {BACKFILL_CHECKPOINT})")
+    parser.add_argument("--skip-failed", action="store_true",
+                        help="Do not retry versions that failed in earlier runs")
+    parser.add_argument("--dry-run", action="store_true", help="Print the planned order and exit")
+    parser.add_argument("--mirror-dir", default=MIRROR_DIR,
+                        help="Also write synced versions into this local mirror (default: $CCR_MIRROR_DIR)")
+    platforms.add_platform_arguments(parser)
+    profiling.add_profile_arguments(parser)
+    args = parser.parse_args()
+    mirror.configure(args.mirror_dir)
+    platforms.configure(platforms.parse_patterns(args.platforms), platforms.parse_patterns(args.skip_platforms))
+
+    with profiling.session("backfill", args.profile_dir if args.profile else None):
+        exit_code = main(args)
+    sys.exit(exit_code)
@@ -0,0 +1,306 @@
+"""
+Micro-benchmarks for the `scripts/lib` hot paths.
+
+Runs offline against synthetic inputs and writes JSON results for comparing
+commits:
+
+    python scripts/benchmark.py --output before.json
+    python scripts/benchmark.py --output after.json --compare before.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import logging
+import argparse
+import platform
+import tempfile
+import subprocess
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import Callable
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from lib import changelog
+from lib.version import get_pending, save_synced, flush_synced
+from lib.downloader import download_file, download_file_segmented
+from lib.metadata import save_version_metadata
+from sim.gcs import FakeGCS
+
+logging.basicConfig(
+    level=logging.WARNING,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S"
+)
+log = logging.getLogger(__name__)
+
+SAMPLE_MANIFEST = Path(__file__).parent.parent / "releases" / "2.1.226" / "manifest.json"
+
+BENCHMARKS: dict[str, Callable[[float, int], dict]] = {}
+
+
+def benchmark(name: str):
+    """
+    Register a benchmark function taking `(scale, repeat)` and returning its result dict.
+    """
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+def _timed(func: Callable[[], None], repeat: int, setup: Callable[[], None] | None = None) -> dict:
+    runs = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - start)
+    return {"seconds": min(runs), "mean": sum(runs) / len(runs), "runs": runs}
+
+
+def synthetic_versions(count: int) -> list[str]:
+    """
+    Return `count` distinct versions, newest first, with some prereleases mixed in.
+    """
+    versions = []
+    major, minor, patch = 1, 0, 0
+    for i in range(count):
+        version = f"{major}.{minor}.{patch}"
+        if i % 50 == 49:
+            version += f"-beta.{i % 7}"
+        versions.append(version)
+        patch += 1
+        if patch == 250:
+            minor, patch = minor + 1, 0
+    return versions[::-1]
+
+
+def synthetic_changelog(versions: list[str]) -> str:
+    """
+    Build a newest-first CHANGELOG with a few hundred bytes of notes per version.
+    """
+    parts = ["# Changelog\n\n"]
+    for i, version in enumerate(versions):
+        parts.append(f"## {version}\n\n")
+        for j in range(3 + i % 5):
+            parts.append(f"- Fixed issue #{i * 10 + j} affecting the `claude` CLI on some platforms\n")
+        parts.append("\n")
+    return "".join(parts)
+
+
+def _reset_changelog_cache() -> None:
+    changelog._index_cache.clear()
+    changelog._last_index = None
+
+
+@benchmark("changelog.parse_versions")
+def bench_parse_versions(scale: float, repeat: int) -> dict:
+    versions = synthetic_versions(int(5000 * scale))
+    content = synthetic_changelog(versions)
+
+    result = _timed(lambda: changelog.parse_versions(content), repeat, _reset_changelog_cache)
+    result.update(versions=len(versions), bytes=len(content))
+    return result
+
+
+@benchmark("changelog.extract_notes")
+def bench_extract_notes(scale: float, repeat: int) -> dict:
+    versions = synthetic_versions(int(5000 * scale))
+    content = synthetic_changelog(versions)
+
+    def run():
+        for version in versions:
+            changelog.extract_notes(content, version)
+
+    result = _timed(run, repeat, _reset_changelog_cache)
+    result.update(versions=len(versions), bytes=len(content))
+    return result
+
+
+@benchmark("version.get_pending")
+def bench_get_pending(scale: float, repeat: int) -> dict:
+    upstream = synthetic_versions(int(10000 * scale))
+    synced = upstream[len(upstream) // 10:]
+
+    result = _timed(lambda: get_pending(upstream, synced), repeat)
+    result.update(versions=len(upstream), pending=len(upstream) - len(synced))
+    return result
+
+
+@benchmark("version.save_synced")
+def bench_save_synced(scale: float, repeat: int) -> dict:
+    versions = synthetic_versions(int(10000 * scale))
+
+    def reset():
+        for name in ("version.json", "version.json.journal"):
+            Path(name).unlink(missing_ok=True)
+
+    def run():
+        for version in versions:
+            save_synced(version)
+        flush_synced()
+
+    result = _timed(run, repeat, reset)
+    result.update(versions=len(versions))
+    return result
+
+
+def _payload(size: int) -> bytes:
+    # Cheap, incompressible-enough bytes without paying for os.urandom on every run.
+    block = hashlib.sha256(b"benchmark").digest() * (1024 * 1024 // 32)
+    return (block * (size // len(block) + 1))[:size]
+
+
+def _bench_download(scale: float, repeat: int, segmented: bool) -> dict:
+    size = int(128 * 1024 * 1024 * scale)
+    data = _payload(size)
+    checksum = hashlib.sha256(data).hexdigest()
+
+    with FakeGCS() as gcs:
+        url = gcs.put("payload/claude", data)
+        dest = Path("download") / "claude"
+
+        def run():
+            if segmented:
+                download_file_segmented(url, dest, checksum, size)
+            else:
+                download_file(url, dest, checksum)
+
+        result = _timed(run, repeat, lambda: shutil.rmtree("download", ignore_errors=True))
+
+    result.update(bytes=size, mb_per_s=size / 1024 / 1024 / result["seconds"])
+    return result
+
+
+@benchmark("downloader.download_file")
+def bench_download_file(scale: float, repeat: int) -> dict:
+    return _bench_download(scale, repeat, segmented=False)
+
+
+@benchmark("downloader.download_file_segmented")
+def bench_download_segmented(scale: float, repeat: int) -> dict:
+    return _bench_download(scale, repeat, segmented=True)
+
+
+@benchmark("hash.sha256")
+def bench_sha256(scale: float, repeat: int) -> dict:
+    size = int(128 * 1024 * 1024 * scale)
+    data = memoryview(_payload(size))
+    step = 1024 * 1024
+
+    def run():
+        sha256 = hashlib.sha256()
+        for offset in range(0, size, step):
+            sha256.update(data[offset:offset + step])
+
+    result = _timed(run, repeat)
+    result.update(bytes=size, mb_per_s=size / 1024 / 1024 / result["seconds"])
+    return result
+
+
+@benchmark("metadata.save_version_metadata")
+def bench_save_metadata(scale: float, repeat: int) -> dict:
+    versions = synthetic_versions(int(300 * scale))
+    manifest = json.loads(SAMPLE_MANIFEST.read_text()) if SAMPLE_MANIFEST.exists() else {"platforms": {}}
+    notes = "- Fixed a bug\n" * 20
+
+    def run():
+        for version in versions:
+            save_version_metadata(version, notes, {**manifest, "version": version}, base_dir=Path("."))
+
+    result = _timed(run, repeat, lambda: shutil.rmtree("releases", ignore_errors=True))
+    result.update(versions=len(versions))
+    return result
+
+
+def _git_commit() -> str:
+    result = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    return result.stdout.strip() if result.returncode == 0 else ""
+
+
+def compare(previous: dict, current: dict) -> None:
+    """
+    Print a per-benchmark comparison of best times.
+    """
+    print(f"{'benchmark':40} {'before':>10} {'after':>10} {'change':>8}")
+    for name, result in current["results"].items():
+        before = previous.get("results", {}).get(name)
+        if not before:
+            print(f"{name:40} {'-':>10} {result['seconds']:>9.4f}s {'':>8}")
+            continue
+        change = result["seconds"] / before["seconds"] - 1 if before["seconds"] else 0.0
+        print(f"{name:40} {before['seconds']:>9.4f}s {result['seconds']:>9.4f}s {change:>+7.1%}")
+
+
+def main() -> int:
+    """
+    Main entry point.
+
+    Returns:
+        0 on success, 1 on failure.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="*", default=None, help="Benchmark names (or prefixes) to run")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier for input sizes")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark; the best is reported")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--compare", help="Previous JSON results to compare against")
+    parser.add_argument("--list", action="store_true", help="List benchmarks and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return 0
+
+    selected = [
+        name for name in BENCHMARKS
+        if not args.only or any(name.startswith(prefix) for prefix in args.only)
+    ]
+
+    report = {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": args.scale,
+        "repeat": args.repeat,
+        "results": {},
+    }
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="ccr-bench-") as workdir:
+        # Benchmarks write `version.json`, `releases/` and downloads relative to the cwd.
+        os.chdir(workdir)
+        try:
+            for name in selected:
+                result = BENCHMARKS[name](args.scale, args.repeat)
+                report["results"][name] = result
+                extra = f", {result['mb_per_s']:.1f}MB/s" if "mb_per_s" in result else ""
+                print(f"{name:40} {result['seconds']:.4f}s{extra}", file=sys.stderr)
+        finally:
+            os.chdir(cwd)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(json.load(f), report)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
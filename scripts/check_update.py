@@ -2,18 +2,21 @@
 Entry point for update checks.
 
 Emits the pending version list for GitHub Actions.
+
+Most runs find nothing new. They end after one conditional HEAD request
+(`lib.probe`) and never import `requests` or `packaging`; the full check
+imports them only once the probe reports a change.
 """
 
 import os
 import sys
-import json
 import logging
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from lib.config import MAX_PER_RUN
-from lib.changelog import fetch_changelog, parse_versions
-from lib.version import load_synced, get_pending
+from lib import probe
+from lib.actions import set_output
+from lib.config import MAX_PER_RUN, CHANGELOG_STREAM_STOP_AFTER
 
 logging.basicConfig(
     level=logging.INFO,
@@ -23,26 +26,14 @@ logging.basicConfig(
 log = logging.getLogger(__name__)
 
 
-def set_output(name: str, value: str) -> None:
+def main(use_probe: bool = True, probe_only: bool = False) -> int:
     """
-    Set a GitHub Actions output variable.
+    Main entry point.
 
     Args:
-        name: Output variable name.
-        value: Output variable value.
-    """
-    # Newer GitHub Actions runners use the GITHUB_OUTPUT file.
-    github_output = os.environ.get("GITHUB_OUTPUT")
-    if github_output:
-        with open(github_output, "a", encoding="utf-8") as f:
-            f.write(f"{name}={value}\n")
-    else:
-        print(f"::set-output name={name}::{value}")
-
-
-def main() -> int:
-    """
-    Main entry point.
+        use_probe: Try the cheap no-change probe before the full check.
+        probe_only: Stop after the probe, setting the `changed` output
+            (for running before dependencies are installed).
 
     Returns:
         0 on success, 1 on failure.
@@ -50,20 +41,45 @@ def main() -> int:
     try:
         log.info("Starting update check...")
 
-        content = fetch_changelog()
-        all_versions = parse_versions(content)
-
-        if not all_versions:
-            log.warning("No versions parsed from CHANGELOG")
-            set_output("has_updates", "false")
-            return 0
+        # A preceding `--probe-only` run leaves its validators for this one.
+        validators = None if probe_only else probe.take_over()
+        if use_probe or probe_only:
+            unchanged, validators = probe.check()
+            if unchanged:
+                log.info("CHANGELOG and synced versions unchanged since the last check; no pending versions")
+                set_output("changed", "false")
+                set_output("has_updates", "false")
+                return 0
+            if probe_only:
+                log.info("Probe could not rule out updates; a full check is needed")
+                probe.hand_over(validators)
+                set_output("changed", "true")
+                return 0
+
+        # Only needed past the probe; `requests` and `packaging` dominate startup.
+        import json
+        from lib.changelog import fetch_changelog, parse_versions, iter_new_versions
+        from lib.version import load_synced, get_pending
 
         synced = load_synced()
 
+        if synced and CHANGELOG_STREAM_STOP_AFTER > 0:
+            # Only the headings above the synced ones are needed.
+            all_versions = list(iter_new_versions(set(synced), CHANGELOG_STREAM_STOP_AFTER))
+        else:
+            content = fetch_changelog()
+            all_versions = parse_versions(content)
+
+            if not all_versions:
+                log.warning("No versions parsed from CHANGELOG")
+                set_output("has_updates", "false")
+                return 0
+
         pending = get_pending(all_versions, synced)
 
         if not pending:
             log.info("No pending versions")
+            probe.record(validators)
             set_output("has_updates", "false")
             return 0
 
@@ -83,4 +99,20 @@ def main() -> int:
 
 
 if __name__ == "__main__":
-    sys.exit(main())
+    if sys.argv[1:] == ["--probe-only"]:
+        # The workflow's pre-install step: skip argparse and the profiler imports.
+        sys.exit(main(probe_only=True))
+
+    import argparse
+    from lib import profiling
+
+    parser = argparse.ArgumentParser(description="Emit the pending Claude Code versions for GitHub Actions.")
+    parser.add_argument("--probe-only", action="store_true",
+                        help="Only run the stdlib no-change probe; sets the `changed` output")
+    parser.add_argument("--no-probe", action="store_true", help="Always run the full check")
+    profiling.add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    with profiling.session("check_update", args.profile_dir if args.profile else None):
+        exit_code = main(use_probe=not args.no_probe, probe_only=args.probe_only)
+    sys.exit(exit_code)
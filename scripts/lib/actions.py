@@ -0,0 +1,42 @@
+"""
+GitHub Actions plumbing.
+
+Writes step outputs and job summaries through the files the runner provides.
+"""
+
+import os
+
+
+def set_output(name: str, value: str) -> None:
+    """
+    Set a GitHub Actions output variable.
+
+    Args:
+        name: Output variable name.
+        value: Output variable value.
+    """
+    # Newer GitHub Actions runners use the GITHUB_OUTPUT file.
+    github_output = os.environ.get("GITHUB_OUTPUT")
+    if github_output:
+        with open(github_output, "a", encoding="utf-8") as f:
+            f.write(f"{name}={value}\n")
+    else:
+        print(f"::set-output name={name}::{value}")
+
+
+def append_step_summary(markdown: str) -> bool:
+    """
+    Append Markdown to the job summary.
+
+    Args:
+        markdown: Markdown text to append.
+
+    Returns:
+        True if written, False when not running under GitHub Actions.
+    """
+    summary = os.environ.get("GITHUB_STEP_SUMMARY")
+    if not summary:
+        return False
+    with open(summary, "a", encoding="utf-8") as f:
+        f.write(markdown.rstrip("\n") + "\n\n")
+    return True
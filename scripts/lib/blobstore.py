@@ -0,0 +1,175 @@
+"""
+Content-addressed blob cache.
+
+Stores verified downloads under their SHA256 checksum so re-running a version
+does not download its binaries again.
+"""
+
+import os
+import uuid
+import shutil
+import hashlib
+import logging
+from pathlib import Path
+
+from .config import BLOB_CACHE_DIR, BLOB_CACHE_MAX_BYTES, BLOB_CACHE_VERIFY, DOWNLOAD_CHUNK_SIZE
+
+log = logging.getLogger(__name__)
+
+# Linux `FICLONE` ioctl (copy-on-write clone on btrfs/xfs).
+_FICLONE = 0x40049409
+
+
+def _reflink(src: Path, dst: Path) -> None:
+    import fcntl
+
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+        except OSError:
+            dst.unlink(missing_ok=True)
+            raise
+
+
+def link_or_copy(src: Path, dst: Path) -> None:
+    """
+    Place `src` at `dst` as cheaply as possible: hardlink, then reflink, then copy.
+    """
+    dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+        return
+    except OSError:
+        pass
+
+    try:
+        _reflink(src, dst)
+        return
+    except (OSError, ImportError):
+        pass
+
+    shutil.copyfile(src, dst)
+
+
+def sha256_file(path: Path) -> str:
+    """
+    Return the hex SHA256 of a file, read in `DOWNLOAD_CHUNK_SIZE` chunks.
+    """
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(DOWNLOAD_CHUNK_SIZE):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+class BlobStore:
+    """
+    Size-bounded, content-addressed file store with LRU eviction.
+
+    Blobs live at `{root}/{checksum[:2]}/{checksum}`. A blob's mtime is bumped on
+    every hit, so eviction removes the least recently used blobs first.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        max_bytes: int = BLOB_CACHE_MAX_BYTES,
+        verify: bool = BLOB_CACHE_VERIFY
+    ):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.verify = verify
+
+    def _path(self, checksum: str) -> Path:
+        checksum = checksum.lower()
+        return self.root / checksum[:2] / checksum
+
+    def get(self, checksum: str, dest: Path, size: int | None = None) -> bool:
+        """
+        Place a cached blob at `dest` if present and intact.
+
+        Args:
+            checksum: Expected SHA256 checksum.
+            dest: Destination file path.
+            size: Expected size in bytes, if known.
+
+        Returns:
+            True on a cache hit, False otherwise.
+        """
+        blob = self._path(checksum)
+        try:
+            blob_size = blob.stat().st_size
+        except FileNotFoundError:
+            return False
+
+        if size is not None and blob_size != size:
+            log.warning(f"Cached blob [{checksum}] has size [{blob_size}], expected [{size}]; evicting")
+            blob.unlink(missing_ok=True)
+            return False
+
+        if self.verify and sha256_file(blob) != checksum.lower():
+            log.warning(f"Cached blob [{checksum}] failed re-hash; evicting")
+            blob.unlink(missing_ok=True)
+            return False
+
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        link_or_copy(blob, dest)
+        os.utime(blob)
+
+        log.info(f"Cache hit: [{dest.name}] ({blob_size / 1024 / 1024:.1f}MB)")
+        return True
+
+    def put(self, checksum: str, src: Path) -> None:
+        """
+        Add a verified file to the store, then evict down to the size bound.
+
+        Args:
+            checksum: SHA256 checksum of `src`.
+            src: File to store.
+        """
+        blob = self._path(checksum)
+        if blob.exists():
+            os.utime(blob)
+            return
+
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        tmp = blob.with_name(f".{blob.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            link_or_copy(src, tmp)
+            os.replace(tmp, blob)
+        except OSError as e:
+            tmp.unlink(missing_ok=True)
+            log.warning(f"Failed to cache [{src.name}]: {e}")
+            return
+
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        Remove least recently used blobs until the store fits in `max_bytes`.
+        """
+        blobs = []
+        total = 0
+        for path in self.root.glob("*/*"):
+            if path.name.startswith("."):
+                continue
+            st = path.stat()
+            blobs.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+
+        blobs.sort()
+        for _, blob_size, path in blobs:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= blob_size
+            log.info(f"Evicted cached blob [{path.name}] ({blob_size / 1024 / 1024:.1f}MB)")
+
+
+def default_store() -> BlobStore | None:
+    """
+    Return the configured blob store, or None if caching is disabled.
+    """
+    if not BLOB_CACHE_DIR:
+        return None
+    return BlobStore(Path(BLOB_CACHE_DIR))
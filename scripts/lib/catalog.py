@@ -0,0 +1,184 @@
+"""
+Release catalog snapshot.
+
+Lists every GitHub Release once per run and answers existence and asset
+questions locally instead of querying the API per version.
+"""
+
+import re
+import logging
+import threading
+
+from . import http_cache
+from .github import GitHubClient
+
+log = logging.getLogger(__name__)
+
+CATALOG_CACHE = "release_catalog.json"
+
+_NEXT_LINK = re.compile(r'<([^>]+)>;\s*rel="next"')
+
+
+class ReleaseCatalog:
+    """
+    Tag -> release summary (`id`, `draft`, `assets` name -> size).
+
+    A published release takes precedence over drafts with the same tag. The ids
+    of all drafts are also kept per tag, so drafts left by a failed or
+    cancelled run can be reused or deleted.
+
+    Args:
+        releases: Initial tag -> summary mapping.
+        etag: ETag of the first listing page the snapshot was built from.
+        drafts: Initial tag -> draft release ids mapping.
+    """
+
+    def __init__(self, releases: dict[str, dict] | None = None, etag: str | None = None,
+                 drafts: dict[str, list[int]] | None = None):
+        self.releases = releases or {}
+        self.etag = etag
+        self.drafts = drafts or {}
+        self._lock = threading.Lock()
+
+    def _add(self, release: dict) -> None:
+        tag = release["tag_name"]
+        summary = self._summary(release)
+        if summary["draft"]:
+            ids = self.drafts.setdefault(tag, [])
+            if summary["id"] not in ids:
+                ids.append(summary["id"])
+        else:
+            self._drop_draft(tag, summary["id"])
+        current = self.releases.get(tag)
+        if current is None or current["draft"] or not summary["draft"]:
+            self.releases[tag] = summary
+
+    def _drop_draft(self, tag: str, release_id: int) -> None:
+        ids = [i for i in self.drafts.get(tag, []) if i != release_id]
+        if ids:
+            self.drafts[tag] = ids
+        else:
+            self.drafts.pop(tag, None)
+
+    @staticmethod
+    def _summary(release: dict) -> dict:
+        return {
+            "id": release["id"],
+            "draft": release.get("draft", False),
+            "assets": {a["name"]: a.get("size") for a in release.get("assets", [])},
+        }
+
+    @classmethod
+    def load(cls, client: GitHubClient, per_page: int = 100) -> "ReleaseCatalog":
+        """
+        Build the catalog with one paginated listing.
+
+        A snapshot persisted in the HTTP cache is revalidated with the first
+        page's ETag; on 304 it is reused without fetching further pages. Asset
+        changes on releases beyond the first page are not detected by that
+        check, but releases created or repaired by this tool update the snapshot.
+
+        Args:
+            client: GitHub API client.
+            per_page: Page size for the listing.
+
+        Returns:
+            The catalog.
+        """
+        cached = http_cache.load_json(CATALOG_CACHE)
+        headers = {}
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+
+        url = f"/repos/{client.repo}/releases?per_page={per_page}"
+        resp = client.request("GET", url, headers=headers, ok=(304,))
+
+        if cached and resp.status_code == 304:
+            catalog = cls(cached.get("releases", {}), cached.get("etag"), cached.get("drafts", {}))
+            log.info(f"Release catalog not modified; [{len(catalog.releases)}] release(s) from cache")
+            return catalog
+
+        catalog = cls(etag=resp.headers.get("ETag"))
+        pages = 0
+        while True:
+            pages += 1
+            for release in resp.json():
+                catalog._add(release)
+
+            match = _NEXT_LINK.search(resp.headers.get("Link", ""))
+            if not match:
+                break
+            resp = client.request("GET", match.group(1))
+
+        log.info(f"Release catalog loaded: [{len(catalog.releases)}] release(s) in [{pages}] page(s)")
+        catalog.save()
+        return catalog
+
+    def save(self) -> None:
+        """
+        Persist the snapshot to the HTTP cache directory.
+        """
+        # Summaries are replaced, never mutated, so a shallow copy is a consistent snapshot.
+        with self._lock:
+            releases = dict(self.releases)
+            drafts = {tag: list(ids) for tag, ids in self.drafts.items()}
+        http_cache.save_json(CATALOG_CACHE, {"etag": self.etag, "releases": releases, "drafts": drafts})
+
+    def exists(self, tag: str) -> bool:
+        """
+        Return True if a published release exists for the tag.
+        """
+        release = self.releases.get(tag)
+        return release is not None and not release["draft"]
+
+    def draft_ids(self, tag: str) -> list[int]:
+        """
+        Return the ids of draft releases with the tag, newest first.
+        """
+        with self._lock:
+            return sorted(self.drafts.get(tag, []), reverse=True)
+
+    def missing_assets(self, tag: str, expected: dict[str, int | None]) -> list[str]:
+        """
+        Return expected asset names that are absent or have the wrong size.
+
+        Args:
+            tag: Release tag.
+            expected: Asset name -> expected size (None skips the size check).
+
+        Returns:
+            Names of assets that need uploading.
+        """
+        assets = self.releases.get(tag, {}).get("assets", {})
+        return [
+            name for name, size in expected.items()
+            if name not in assets or (size is not None and assets[name] != size)
+        ]
+
+    def record(self, release: dict) -> None:
+        """
+        Update the snapshot with a release created or changed by this run.
+        """
+        with self._lock:
+            self._add(release)
+        self.save()
+
+    def forget(self, tag: str) -> None:
+        """
+        Drop a deleted release from the snapshot.
+        """
+        with self._lock:
+            removed = self.releases.pop(tag, None)
+        if removed is not None:
+            self.save()
+
+    def forget_draft(self, tag: str, release_id: int) -> None:
+        """
+        Drop a deleted draft from the snapshot.
+        """
+        with self._lock:
+            self._drop_draft(tag, release_id)
+            current = self.releases.get(tag)
+            if current is not None and current["id"] == release_id:
+                del self.releases[tag]
+        self.save()
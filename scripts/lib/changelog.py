@@ -5,15 +5,18 @@ Fetches and parses `CHANGELOG.md` from the upstream repository.
 """
 
 import re
+import hashlib
 import logging
+from typing import Iterator
 
-import requests
-
-from .config import CHANGELOG_URL, REQUEST_TIMEOUT
+from . import http_client, http_cache
+from .config import CHANGELOG_URL, CHANGELOG_SCAN_STATE_FILE
+from .profiling import traced
 
 log = logging.getLogger(__name__)
 
 
+@traced
 def fetch_changelog() -> str:
     """
     Fetch the raw `CHANGELOG.md` content.
@@ -26,14 +29,157 @@ def fetch_changelog() -> str:
     """
     log.info(f"Fetching CHANGELOG: [{CHANGELOG_URL}]")
 
-    resp = requests.get(CHANGELOG_URL, timeout=REQUEST_TIMEOUT)
-    resp.raise_for_status()
-
-    content = resp.text
+    content = http_cache.get_text(CHANGELOG_URL)
     log.info(f"CHANGELOG fetched successfully; length [{len(content)}] chars")
     return content
 
 
+def iter_new_versions(known: set[str], stop_after: int = 1) -> Iterator[str]:
+    """
+    Stream `CHANGELOG.md` and yield versions not in `known` as their headings arrive.
+
+    The CHANGELOG is newest-first, so the transfer is closed once `stop_after`
+    consecutive headings are already known; bytes read scale with the number of
+    new releases rather than the size of the whole history.
+
+    A version that keeps failing can end up more than `stop_after` headings
+    below the newest synced one. To still find it, the whole document is read
+    whenever its ETag differs from the one of the last full read (or there is
+    no ETag to compare).
+
+    Args:
+        known: Versions already synced.
+        stop_after: Consecutive known headings that end the scan.
+
+    Yields:
+        Unknown versions in appearance order (newest first).
+
+    Raises:
+        requests.HTTPError: If the request fails.
+    """
+    log.info(f"Streaming CHANGELOG: [{CHANGELOG_URL}]")
+
+    resp = http_client.get(CHANGELOG_URL, stream=True)
+    resp.raise_for_status()
+    resp.encoding = resp.encoding or "utf-8"
+
+    etag = resp.headers.get("ETag")
+    state = http_cache.load_json(CHANGELOG_SCAN_STATE_FILE) or {}
+    full_scan = not etag or state.get("etag") != etag
+    if full_scan:
+        log.info("CHANGELOG changed since the last full scan; reading all of it")
+
+    seen = 0
+    known_run = 0
+    try:
+        for line in resp.iter_lines(decode_unicode=True):
+            heading = VERSION_HEADING.match(line)
+            if not heading:
+                continue
+
+            version = heading.group(1)
+            seen += 1
+            if version not in known:
+                known_run = 0
+                yield version
+                continue
+
+            known_run += 1
+            if known_run >= stop_after and not full_scan:
+                log.info(
+                    f"Stopped CHANGELOG stream at synced version [{version}] after [{seen}] heading(s) "
+                    f"([{stop_after}] synced in a row); older unsynced versions wait for the next full scan"
+                )
+                return
+
+        log.info(f"Read the whole CHANGELOG stream; [{seen}] heading(s)")
+        if etag:
+            http_cache.save_json(CHANGELOG_SCAN_STATE_FILE, {"etag": etag})
+    finally:
+        resp.close()
+
+
+# Matches `## 1.2.3` or `## 1.2.3-beta.1`, etc.
+VERSION_HEADING = re.compile(r"^## (\d+\.\d+\.\d+(?:-[\w.]+)?)[ \t\r]*$", re.MULTILINE)
+
+# Any heading that starts a version section (and so ends the previous one).
+SECTION_START = re.compile(r"^## \d+\.\d+\.\d+", re.MULTILINE)
+
+_INDEX_CACHE_SIZE = 4
+_index_cache: dict[str, "ChangelogIndex"] = {}
+_last_index: "ChangelogIndex | None" = None
+
+
+class ChangelogIndex:
+    """
+    Version -> (start, end) offsets of release notes, built in one pass.
+
+    Attributes:
+        versions: Versions in appearance order (usually newest to oldest).
+        sections: Version -> (start, end) offsets of its notes in the content.
+    """
+
+    def __init__(self, content: str):
+        self.content = content
+        self.versions: list[str] = []
+        self.sections: dict[str, tuple[int, int]] = {}
+
+        current = None
+        body_start = 0
+        for boundary in SECTION_START.finditer(content):
+            if current is not None:
+                self.sections.setdefault(current, (body_start, boundary.start()))
+                current = None
+
+            heading = VERSION_HEADING.match(content, boundary.start())
+            if heading:
+                current = heading.group(1)
+                self.versions.append(current)
+                body_start = heading.end() + 1
+
+        if current is not None:
+            self.sections.setdefault(current, (body_start, len(content)))
+
+    def notes(self, version: str) -> str | None:
+        """
+        Return the stripped release notes for a version, or None if absent.
+        """
+        section = self.sections.get(version)
+        if section is None:
+            return None
+        start, end = section
+        return self.content[start:end].strip()
+
+
+def index_changelog(content: str) -> ChangelogIndex:
+    """
+    Return the index for CHANGELOG content, reusing it if the content is unchanged.
+
+    Indexes are cached by the SHA256 of the content; passing the very same
+    string again (the common case when extracting notes version by version)
+    skips even the hash.
+
+    Args:
+        content: The `CHANGELOG.md` text.
+
+    Returns:
+        The changelog index.
+    """
+    global _last_index
+    if _last_index is not None and _last_index.content is content:
+        return _last_index
+
+    key = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    index = _index_cache.get(key)
+    if index is None:
+        index = ChangelogIndex(content)
+        if len(_index_cache) >= _INDEX_CACHE_SIZE:
+            _index_cache.pop(next(iter(_index_cache)))
+        _index_cache[key] = index
+    _last_index = index
+    return index
+
+
 def parse_versions(content: str) -> list[str]:
     """
     Parse all versions from CHANGELOG content.
@@ -46,9 +192,7 @@ def parse_versions(content: str) -> list[str]:
     Returns:
         Version list in appearance order (usually newest to oldest).
     """
-    # Matches `## 1.2.3` or `## 1.2.3-beta.1`, etc.
-    pattern = r"^## (\d+\.\d+\.\d+(?:-[\w.]+)?)\s*$"
-    versions = re.findall(pattern, content, re.MULTILINE)
+    versions = list(index_changelog(content).versions)
 
     log.info(f"Parsed [{len(versions)}] versions from CHANGELOG")
     return versions
@@ -65,17 +209,11 @@ def extract_notes(content: str, version: str) -> str:
     Returns:
         Release notes for that version, or an empty string if not found.
     """
-    # Escape special characters in the version string.
-    escaped_version = re.escape(version)
-
-    # Match content from this version heading up to the next version heading.
-    pattern = rf"^## {escaped_version}\s*\n(.*?)(?=^## \d+\.\d+\.\d+|\Z)"
-    match = re.search(pattern, content, re.MULTILINE | re.DOTALL)
+    notes = index_changelog(content).notes(version)
 
-    if not match:
+    if notes is None:
         log.warning(f"No release notes found for version [{version}]")
         return ""
 
-    notes = match.group(1).strip()
     log.info(f"Release notes for version [{version}] length [{len(notes)}] chars")
     return notes
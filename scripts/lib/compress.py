@@ -0,0 +1,220 @@
+"""
+Compressed asset variants.
+
+Writes `.zst` / `.xz` copies of a platform binary while it downloads: every
+chunk that is hashed is also fed to one compressor per format, so the binary
+is never read back from disk for compression. The `zstd` and `xz` CLIs run
+multithreaded (`-T0`); without `xz`, Python's `lzma` is used single-threaded.
+"""
+
+import time
+import lzma
+import shutil
+import logging
+import subprocess
+from pathlib import Path
+
+from . import metrics
+from .blobstore import sha256_file
+from .config import COMPRESS_ZSTD_LEVEL, COMPRESS_XZ_PRESET, DOWNLOAD_CHUNK_SIZE
+
+log = logging.getLogger(__name__)
+
+FORMATS = ("zst", "xz")
+
+
+def variant_path(path: Path, fmt: str) -> Path:
+    """
+    Return where the `fmt` variant of a file is written, e.g. `claude-2.1.0-linux-x64.zst`.
+    """
+    return path.with_name(f"{path.name}.{fmt}")
+
+
+def _command(fmt: str) -> list[str] | None:
+    if fmt == "zst":
+        zstd = shutil.which("zstd")
+        if not zstd:
+            return None
+        cmd = [zstd, "-q", "-c", "-T0", f"-{COMPRESS_ZSTD_LEVEL}"]
+        if COMPRESS_ZSTD_LEVEL > 19:
+            cmd.insert(1, "--ultra")
+        return cmd
+    if fmt == "xz":
+        xz = shutil.which("xz")
+        return [xz, "-q", "-c", "-T0", f"-{COMPRESS_XZ_PRESET}"] if xz else None
+    return None
+
+
+class _Sink:
+    """
+    One compressed output, written to `{dest}.part` until it is finished.
+    """
+
+    def __init__(self, fmt: str, dest: Path):
+        self.fmt = fmt
+        self.dest = dest
+        self.part = dest.with_name(dest.name + ".part")
+        self.failed = False
+        self._out = open(self.part, "wb")
+        self._proc: subprocess.Popen | None = None
+        self._lzma: lzma.LZMACompressor | None = None
+
+        cmd = _command(fmt)
+        if cmd:
+            self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=self._out,
+                                          stderr=subprocess.PIPE)
+        elif fmt == "xz":
+            self._lzma = lzma.LZMACompressor(preset=COMPRESS_XZ_PRESET)
+        else:
+            self._out.close()
+            self.part.unlink(missing_ok=True)
+            raise RuntimeError(f"No compressor available for [{fmt}]")
+
+    def write(self, chunk: bytes) -> None:
+        if self.failed:
+            return
+        try:
+            if self._proc:
+                self._proc.stdin.write(chunk)
+            else:
+                self._out.write(self._lzma.compress(chunk))
+        except OSError as e:
+            log.warning(f"Compressing [{self.dest.name}] failed: {e}")
+            self.abort()
+
+    def finish(self) -> bool:
+        """
+        Flush and move the output into place.
+
+        Returns:
+            True if the variant was written.
+        """
+        if self.failed:
+            return False
+        try:
+            if self._proc:
+                self._proc.stdin.close()
+                stderr = self._proc.stderr.read().decode(errors="replace").strip()
+                if self._proc.wait() != 0:
+                    raise OSError(f"compressor exited with [{self._proc.returncode}]: {stderr}")
+            else:
+                self._out.write(self._lzma.flush())
+            self._out.close()
+        except OSError as e:
+            log.warning(f"Compressing [{self.dest.name}] failed: {e}")
+            self.abort()
+            return False
+
+        self.part.replace(self.dest)
+        return True
+
+    def abort(self) -> None:
+        self.failed = True
+        if self._proc:
+            self._proc.kill()
+            self._proc.wait()
+            for pipe in (self._proc.stdin, self._proc.stderr):
+                try:
+                    pipe.close()
+                except OSError:
+                    pass
+        self._out.close()
+        self.part.unlink(missing_ok=True)
+
+
+class Compressor:
+    """
+    Compresses one byte stream into several formats at once.
+
+    Feed it the same chunks, in the same order, as the file's checksum:
+    `reset()` when the stream restarts from zero, `finish()` once it is
+    verified, `abort()` when it is discarded. A format whose compressor fails
+    is dropped with a warning; compression never fails a download.
+    """
+
+    def __init__(self, dest: Path, formats: tuple[str, ...]):
+        self.dest = dest
+        self.formats = formats
+        self.seconds = 0.0
+        self._sinks: list[_Sink] = []
+        self._open()
+
+    def _open(self) -> None:
+        self._sinks = []
+        for fmt in self.formats:
+            try:
+                self._sinks.append(_Sink(fmt, variant_path(self.dest, fmt)))
+            except (RuntimeError, OSError) as e:
+                log.warning(f"Skipping [{fmt}] variant of [{self.dest.name}]: {e}")
+
+    def write(self, chunk: bytes) -> None:
+        start = time.monotonic()
+        for sink in self._sinks:
+            sink.write(chunk)
+        self.seconds += time.monotonic() - start
+
+    def reset(self) -> None:
+        self.abort()
+        self._open()
+
+    def finish(self) -> list[Path]:
+        """
+        Finish every format.
+
+        Returns:
+            The variant files written.
+        """
+        start = time.monotonic()
+        written = [sink.dest for sink in self._sinks if sink.finish()]
+        self.seconds += time.monotonic() - start
+        metrics.record_asset(self.dest.name, compress_seconds=self.seconds)
+        return written
+
+    def abort(self) -> None:
+        for sink in self._sinks:
+            sink.abort()
+        self._sinks = []
+
+
+def open_compressor(dest: Path, formats: tuple[str, ...]) -> Compressor | None:
+    """
+    Return a `Compressor` for the formats, or None when there are none.
+    """
+    return Compressor(dest, formats) if formats else None
+
+
+def compress_file(path: Path, formats: tuple[str, ...]) -> list[Path]:
+    """
+    Write the variants of a file that is already on disk (e.g. a blob cache hit).
+
+    Returns:
+        The variant files written.
+    """
+    compressor = open_compressor(path, formats)
+    if not compressor:
+        return []
+    try:
+        with open(path, "rb") as f:
+            while chunk := f.read(DOWNLOAD_CHUNK_SIZE):
+                compressor.write(chunk)
+    except OSError:
+        compressor.abort()
+        raise
+    return compressor.finish()
+
+
+def describe_variants(path: Path, formats: tuple[str, ...]) -> dict[str, dict]:
+    """
+    Return `{format: {asset, checksum, size}}` for the variants of `path` that exist.
+    """
+    records = {}
+    for fmt in formats:
+        variant = variant_path(path, fmt)
+        if not variant.exists():
+            continue
+        records[fmt] = {
+            "asset": variant.name,
+            "checksum": sha256_file(variant),
+            "size": variant.stat().st_size,
+        }
+    return records
@@ -2,15 +2,96 @@
 Configuration constants.
 """
 
-INSTALL_SCRIPT_URL = "https://claude.ai/install.sh"
-CHANGELOG_URL = "https://raw.githubusercontent.com/anthropics/claude-code/refs/heads/main/CHANGELOG.md"
+import os
+
+# Upstream endpoints; the `CCR_*` environment variables point them at local stand-ins.
+INSTALL_SCRIPT_URL = os.environ.get("CCR_INSTALL_SCRIPT_URL", "https://claude.ai/install.sh")
+CHANGELOG_URL = os.environ.get(
+    "CCR_CHANGELOG_URL",
+    "https://raw.githubusercontent.com/anthropics/claude-code/refs/heads/main/CHANGELOG.md"
+)
 
 MIN_VERSION = "1.0.37"  # Lowest supported version (older versions have no manifest).
 MAX_PER_RUN = 5  # Max versions per run (prevents workflow timeouts).
 
+# Platforms to sync, as comma-separated shell patterns (e.g. `linux-x64,linux-x64-musl`).
+# Empty includes every platform; `--platforms` / `--skip-platforms` override these.
+PLATFORM_INCLUDE = tuple(p.strip() for p in os.environ.get("CCR_PLATFORMS", "").split(",") if p.strip())
+PLATFORM_EXCLUDE = tuple(p.strip() for p in os.environ.get("CCR_SKIP_PLATFORMS", "").split(",") if p.strip())
+
+# Stream the CHANGELOG during update checks and stop after this many consecutive
+# already-synced headings (0 always reads the whole document). The window lets
+# recently failed versions below the newest synced one still be retried; the
+# whole document is still read whenever it changed since the last full scan, so
+# older unsynced versions are not lost for good.
+CHANGELOG_STREAM_STOP_AFTER = 10
+CHANGELOG_SCAN_STATE_FILE = "changelog_scan.json"  # ETag of the last fully read CHANGELOG (in `HTTP_CACHE_DIR`).
+
 VERSION_FILE = "version.json"
+VERSION_JOURNAL_FILE = "version.json.journal"  # Append-only log of versions synced since the last compaction.
+VERSION_JOURNAL_COMPACT_EVERY = 50  # Fold the journal into `version.json` after this many entries.
+MANIFEST_INDEX_FILE = "index.json"  # Aggregated manifest index inside `releases/` (see `manifest_index.py`).
+
+PIPELINE_MAX_IN_FLIGHT = 2  # Versions held between manifest fetch and publish (bounds temp disk use).
+
+GIT_COMMIT_EVERY = 0  # Commit and push after this many synced versions (0 = once per run).
+GIT_COMMIT_INTERVAL = 0  # Also commit once this many seconds passed since the last commit (0 disables).
+GIT_PUSH_RETRIES = 3  # Push attempts; each retry first rebases onto the remote.
 
 REQUEST_TIMEOUT = 30
 DOWNLOAD_TIMEOUT = 300  # Large file download timeout (seconds).
+UPLOAD_TIMEOUT = 600  # Release asset upload timeout (seconds).
+UPLOAD_WORKERS = 4  # Concurrent release asset uploads.
+UPLOAD_RETRIES = 3  # Attempts per asset before the release is abandoned.
+
+GITHUB_API_URL = "https://api.github.com"  # Overridden by `$GITHUB_API_URL` (set on Actions runners).
 
 MAX_DOWNLOAD_WORKERS = 7
+DOWNLOAD_SEGMENTS = 4  # Concurrent byte ranges per file (1 disables segmented downloads).
+DOWNLOAD_SEGMENT_MIN_SIZE = 16 * 1024 * 1024  # Files smaller than this use a single stream.
+DOWNLOAD_RETRIES = 3  # Attempts per file before giving up (partial data is kept between attempts).
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+PARTIAL_SAVE_INTERVAL = 1.0  # Seconds between saves of a segmented download's range offsets.
+
+HTTP_POOL_HOSTS = 8  # Per-host connection pools kept alive.
+HTTP_POOL_SIZE = MAX_DOWNLOAD_WORKERS * DOWNLOAD_SEGMENTS  # Keep-alive connections per host.
+HTTP_RETRIES = 3  # Transport-level retries for connection errors and 429/5xx responses.
+HTTP_BACKOFF_FACTOR = 1.0  # Retry delays grow as factor * 2^(retry - 1) seconds.
+
+HTTP_CACHE_DIR = ".cache/http"  # Conditional-GET cache for small documents ("" disables it).
+BASE_URL_TTL = 24 * 3600  # Seconds to reuse the download base URL parsed from the install script.
+PROBE_STATE_FILE = "check_probe.json"  # CHANGELOG validators of the last no-op update check (in `HTTP_CACHE_DIR`).
+PROBE_TIMEOUT = 10  # Seconds for the update check's conditional HEAD request.
+
+BLOB_CACHE_DIR = ".cache/blobs"  # Content-addressed download cache keyed by SHA256 ("" disables it).
+BLOB_CACHE_MAX_BYTES = 4 * 1024 * 1024 * 1024  # Least recently used blobs are evicted beyond this.
+BLOB_CACHE_VERIFY = False  # Re-hash blobs on cache hit (size is always checked).
+
+# Sync metrics sinks ("" disables a sink); the Markdown summary goes to `$GITHUB_STEP_SUMMARY` when set.
+METRICS_JSON_FILE = os.environ.get("CCR_METRICS_JSON", "")
+METRICS_PROMETHEUS_FILE = os.environ.get("CCR_METRICS_PROM", "")  # Prometheus textfile collector output.
+
+PROFILE_DIR = ".cache/profiles"  # Parent of the per-run `--profile` artifact directories.
+PROFILE_SAMPLE_INTERVAL = 0.01  # Seconds between stack samples for the folded-stack output.
+
+BACKFILL_CONCURRENCY = 3  # Versions synced at once by `backfill.py`.
+BACKFILL_DOWNLOADS = MAX_DOWNLOAD_WORKERS  # Files downloading at once across all versions (fits HTTP_POOL_SIZE).
+BACKFILL_UPLOADS = 2 * UPLOAD_WORKERS  # Assets uploading at once across all versions.
+BACKFILL_COMMIT_EVERY = 10  # Commit and push after this many backfilled versions.
+BACKFILL_TIME_BUDGET = 5 * 3600  # Seconds before no new versions are started (Actions jobs end at 6h).
+BACKFILL_CHECKPOINT = ".cache/backfill.json"  # Progress file used to resume an interrupted backfill.
+
+# Binary deltas (`zstd --patch-from`) from the previous synced version; `CCR_DELTAS=1` enables them.
+DELTA_ENABLED = os.environ.get("CCR_DELTAS", "") == "1"
+DELTA_WORKERS = 2  # Platforms diffed at once; each zstd process holds both binaries in memory.
+DELTA_LEVEL = 12  # zstd level (19 shrinks deltas further but takes minutes per 300MB binary).
+DELTA_MAX_RATIO = 0.5  # Drop a delta larger than this fraction of its target binary.
+
+# Compressed copies of each binary, written while it downloads: `CCR_COMPRESS=zst,xz` ("" disables).
+COMPRESS_FORMATS = tuple(f.strip() for f in os.environ.get("CCR_COMPRESS", "").split(",") if f.strip())
+COMPRESS_ZSTD_LEVEL = 19  # zstd level (above 19 needs `--ultra` and far more memory).
+COMPRESS_XZ_PRESET = 6  # xz preset (the `xz` default).
+
+# Local mirror laid out like the upstream download base URL ("" disables it; see `mirror_server.py`).
+MIRROR_DIR = os.environ.get("CCR_MIRROR_DIR", "")
+MIRROR_PORT = 8080  # Default port of `mirror_server.py`.
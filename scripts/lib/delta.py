@@ -0,0 +1,234 @@
+"""
+Binary delta assets.
+
+Builds `zstd --patch-from` deltas from each platform binary of the previous
+synced version to the new one, so clients that already have the previous
+binary only download the difference. Requires the `zstd` CLI (1.4.5+).
+"""
+
+import shutil
+import logging
+import threading
+import subprocess
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from . import limits
+from .blobstore import default_store, sha256_file
+from .config import DELTA_WORKERS, DELTA_LEVEL, DELTA_MAX_RATIO
+from .downloader import asset_name, platform_url, download_file_segmented
+from .metadata import load_version_manifest
+from .version import load_index, version_key
+
+log = logging.getLogger(__name__)
+
+DELTA_FORMAT = "zstd-patch"
+
+# zstd accepts window logs up to 31 on 64-bit builds; the window must cover the source.
+_MIN_WINDOW_LOG = 27
+_MAX_WINDOW_LOG = 31
+
+# Manifests of versions downloaded by this process. A version ahead in the
+# pipeline may not have saved its manifest yet, but is still the best source.
+_recent: dict[str, dict] = {}
+_recent_lock = threading.Lock()
+
+
+def zstd_path() -> str | None:
+    """
+    Return the `zstd` executable, or None if it is not installed.
+    """
+    return shutil.which("zstd")
+
+
+def delta_name(version: str, platform: str, source_version: str) -> str:
+    """
+    Return the asset name of a delta, e.g. `claude-2.1.226-linux-x64.from-2.1.225.zst`.
+    """
+    return f"{asset_name(version, platform)}.from-{source_version}.zst"
+
+
+def _window_log(size: int) -> int:
+    return max(_MIN_WINDOW_LOG, min(_MAX_WINDOW_LOG, max(size - 1, 1).bit_length()))
+
+
+def create_delta(source: Path, target: Path, dest: Path, level: int = DELTA_LEVEL) -> Path:
+    """
+    Write a patch that turns `source` into `target`.
+
+    Memory use is roughly the size of both files plus the match window, so
+    callers bound how many run at once.
+
+    Raises:
+        RuntimeError: If `zstd` is missing or fails.
+    """
+    zstd = zstd_path()
+    if not zstd:
+        raise RuntimeError("zstd is not installed")
+
+    window = _window_log(max(source.stat().st_size, target.stat().st_size))
+    cmd = [
+        zstd, "-q", "-f", f"-{level}", f"--long={window}",
+        f"--patch-from={source}", str(target), "-o", str(dest),
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        dest.unlink(missing_ok=True)
+        raise RuntimeError(f"zstd --patch-from failed for [{target.name}]: {result.stderr.strip()}")
+    return dest
+
+
+def apply_delta(source: Path, delta: Path, dest: Path) -> Path:
+    """
+    Rebuild a target binary from its source binary and a delta.
+
+    Raises:
+        RuntimeError: If `zstd` is missing or fails.
+    """
+    zstd = zstd_path()
+    if not zstd:
+        raise RuntimeError("zstd is not installed")
+
+    cmd = [
+        zstd, "-d", "-q", "-f", f"--long={_MAX_WINDOW_LOG}",
+        f"--patch-from={source}", str(delta), "-o", str(dest),
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        dest.unlink(missing_ok=True)
+        raise RuntimeError(f"Applying delta [{delta.name}] failed: {result.stderr.strip()}")
+    return dest
+
+
+def previous_version(version: str) -> tuple[str, dict] | None:
+    """
+    Find the newest synced (or just downloaded) version older than `version`
+    that has a manifest.
+
+    Returns:
+        (version, manifest), or None if there is none.
+    """
+    key = version_key(version)
+    with _recent_lock:
+        recent = dict(_recent)
+
+    candidates = set(load_index()) | set(recent)
+    for candidate in sorted(candidates, key=version_key, reverse=True):
+        if version_key(candidate) >= key:
+            continue
+        manifest = recent.get(candidate) or load_version_manifest(candidate)
+        if manifest and manifest.get("platforms"):
+            return candidate, manifest
+    return None
+
+
+def _source_binary(gcs_bucket: str, version: str, platform: str, info: dict, workdir: Path) -> Path:
+    """
+    Get a previous version's binary from the blob cache, or download it.
+    """
+    dest = workdir / "delta-sources" / asset_name(version, platform)
+    checksum = info["checksum"]
+
+    store = default_store()
+    if store and store.get(checksum, dest, info.get("size")):
+        return dest
+
+    # Same global download limit as the release binaries (see `limits`).
+    with limits.download_slot():
+        download_file_segmented(platform_url(gcs_bucket, version, platform), dest, checksum, info.get("size"))
+    if store:
+        store.put(checksum, dest)
+    return dest
+
+
+def _build_one(gcs_bucket: str, version: str, platform: str, source_version: str,
+               source_info: dict, target_info: dict, workdir: Path) -> dict | None:
+    target = workdir / asset_name(version, platform)
+    source = _source_binary(gcs_bucket, source_version, platform, source_info, workdir)
+    dest = workdir / delta_name(version, platform, source_version)
+
+    try:
+        create_delta(source, target, dest)
+    finally:
+        source.unlink(missing_ok=True)
+
+    size = dest.stat().st_size
+    target_size = target.stat().st_size
+    if size > target_size * DELTA_MAX_RATIO:
+        log.info(
+            f"Delta [{dest.name}] is [{size / target_size:.0%}] of the binary; not publishing it"
+        )
+        dest.unlink(missing_ok=True)
+        return None
+
+    log.info(
+        f"Delta [{dest.name}]: [{size / 1024 / 1024:.1f}MB] "
+        f"vs [{target_size / 1024 / 1024:.1f}MB] full binary"
+    )
+    return {
+        "asset": dest.name,
+        "format": DELTA_FORMAT,
+        "from": source_version,
+        "sourceChecksum": source_info["checksum"],
+        "targetChecksum": target_info["checksum"],
+        "checksum": sha256_file(dest),
+        "size": size,
+    }
+
+
+def build_deltas(gcs_bucket: str, version: str, manifest: dict, workdir: Path) -> dict[str, dict]:
+    """
+    Build deltas for every platform downloaded into `workdir`.
+
+    Deltas are optional: a platform whose delta fails (or is not worth
+    publishing) is logged and skipped, never failing the sync.
+
+    Args:
+        gcs_bucket: GCS_BUCKET base URL (to fetch source binaries not in the blob cache).
+        version: Target version.
+        manifest: Target version's manifest.
+        workdir: Directory holding the downloaded target binaries; deltas are written there.
+
+    Returns:
+        Platform -> delta record (`asset`, `format`, `from`, `sourceChecksum`,
+        `targetChecksum`, `checksum`, `size`).
+    """
+    if not zstd_path():
+        log.warning("zstd is not installed; skipping delta assets")
+        return {}
+
+    previous = previous_version(version)
+    with _recent_lock:
+        _recent[version] = {"platforms": manifest.get("platforms", {})}
+
+    if previous is None:
+        log.info(f"No earlier synced version to diff [{version}] against")
+        return {}
+    source_version, source_manifest = previous
+    source_platforms = source_manifest["platforms"]
+
+    platforms = [
+        p for p, info in manifest.get("platforms", {}).items()
+        if p in source_platforms and source_platforms[p].get("checksum")
+        and (workdir / asset_name(version, p)).exists()
+    ]
+    log.info(f"Building deltas [{source_version}] -> [{version}] for [{len(platforms)}] platform(s)")
+
+    deltas = {}
+
+    def build(platform: str) -> None:
+        try:
+            record = _build_one(
+                gcs_bucket, version, platform, source_version,
+                source_platforms[platform], manifest["platforms"][platform], workdir
+            )
+        except Exception as e:
+            log.warning(f"Delta for platform [{platform}] failed: {e}")
+            return
+        if record:
+            deltas[platform] = record
+
+    with ThreadPoolExecutor(max_workers=DELTA_WORKERS) as executor:
+        list(executor.map(build, platforms))
+
+    return dict(sorted(deltas.items()))
@@ -4,26 +4,112 @@ File download and verification helpers.
 Downloads installer artifacts and verifies SHA256 checksums.
 """
 
+import json
+import time
 import hashlib
 import logging
+import threading
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import requests
 
-from .config import DOWNLOAD_TIMEOUT, MAX_DOWNLOAD_WORKERS
+from . import http_client, limits, metrics
+from .blobstore import default_store
+from .compress import open_compressor, compress_file
+from .config import (
+    DOWNLOAD_TIMEOUT,
+    MAX_DOWNLOAD_WORKERS,
+    DOWNLOAD_SEGMENTS,
+    DOWNLOAD_SEGMENT_MIN_SIZE,
+    DOWNLOAD_RETRIES,
+    DOWNLOAD_CHUNK_SIZE,
+    PARTIAL_SAVE_INTERVAL,
+)
+from .profiling import traced
 
 log = logging.getLogger(__name__)
 
 
-def download_file(url: str, dest: Path, expected_sha256: str) -> Path:
+def _partial_paths(dest: Path) -> tuple[Path, Path]:
+    """
+    Return the `.part` data file and its `.part.json` state file for a destination.
+    """
+    return (
+        dest.with_name(dest.name + ".part"),
+        dest.with_name(dest.name + ".part.json"),
+    )
+
+
+def _discard_partial(part_path: Path, state_path: Path) -> None:
+    part_path.unlink(missing_ok=True)
+    state_path.unlink(missing_ok=True)
+
+
+def _load_partial(url: str, expected_sha256: str, part_path: Path, state_path: Path) -> dict | None:
+    """
+    Load the saved state of a previous partial download, if it can be resumed.
+
+    A partial is only reused when it was started for the same URL and checksum.
+
+    Returns:
+        The saved state dict, or None if there is nothing to resume.
+    """
+    if not part_path.exists() or not state_path.exists():
+        _discard_partial(part_path, state_path)
+        return None
+
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (json.JSONDecodeError, IOError) as e:
+        log.warning(f"Discarding unreadable partial state [{state_path.name}]: {e}")
+        _discard_partial(part_path, state_path)
+        return None
+
+    if state.get("url") != url or state.get("sha256", "").lower() != expected_sha256.lower():
+        log.info(f"Discarding stale partial [{part_path.name}] (different URL or checksum)")
+        _discard_partial(part_path, state_path)
+        return None
+
+    return state
+
+
+def _save_partial(state_path: Path, state: dict) -> None:
+    with open(state_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+
+
+def _validators(resp: requests.Response) -> dict:
+    return {
+        "etag": resp.headers.get("ETag"),
+        "lastModified": resp.headers.get("Last-Modified"),
+    }
+
+
+def download_file(url: str, dest: Path, expected_sha256: str, variants: tuple[str, ...] = ()) -> Path:
     """
     Download a file and verify its SHA256 checksum.
 
+    Data is written to `{dest}.part` next to a `{dest}.part.json` state file holding
+    the URL, expected checksum and the server's ETag/Last-Modified validators. If the
+    connection drops, the transfer resumes from the current offset with an HTTP
+    `Range` request guarded by `If-Range`, so a changed upstream file restarts from
+    zero instead of being spliced onto a stale prefix.
+
+    The running SHA256 is kept across retries, so the checksum always covers the
+    whole file without re-reading data already on disk. A partial left behind by a
+    previous process is hashed once when it is picked up (hash state cannot be
+    serialized).
+
+    Compressed variants follow the checksum: each chunk is hashed and then fed
+    to the compressors, so they are complete when the download is.
+
     Args:
         url: Download URL.
         dest: Destination file path.
         expected_sha256: Expected SHA256 checksum.
+        variants: Compressed formats to write next to `dest` (see `compress`).
 
     Returns:
         The downloaded file path.
@@ -33,39 +119,449 @@ def download_file(url: str, dest: Path, expected_sha256: str) -> Path:
     """
     log.info(f"Downloading: [{url}]")
 
-    try:
-        resp = requests.get(url, timeout=DOWNLOAD_TIMEOUT, stream=True)
-        resp.raise_for_status()
-    except requests.RequestException as e:
-        raise RuntimeError(f"Download failed [{url}]: {e}")
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    part_path, state_path = _partial_paths(dest)
+    compressor = open_compressor(dest, variants)
 
-    # Stream to disk while computing SHA256 to avoid high memory usage.
     sha256 = hashlib.sha256()
-    dest.parent.mkdir(parents=True, exist_ok=True)
+    offset = 0
+    received = 0
+    hash_seconds = 0.0
+    state = _load_partial(url, expected_sha256, part_path, state_path)
+    if state and "segments" in state:
+        # Left by a segmented download: the file has holes, not a prefix.
+        log.info(f"Discarding segmented partial [{part_path.name}] for a single-stream download")
+        _discard_partial(part_path, state_path)
+        state = None
+
+    if state:
+        start = time.monotonic()
+        with open(part_path, "rb") as f:
+            while chunk := f.read(DOWNLOAD_CHUNK_SIZE):
+                sha256.update(chunk)
+                offset += len(chunk)
+                if compressor:
+                    compressor.write(chunk)
+        hash_seconds += time.monotonic() - start
+        log.info(f"Resuming [{dest.name}] from offset [{offset}]")
+    else:
+        state = {"url": url, "sha256": expected_sha256}
+
+    last_error = None
+    for attempt in range(1, DOWNLOAD_RETRIES + 1):
+        headers = {}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            validator = state.get("etag") or state.get("lastModified")
+            if validator:
+                headers["If-Range"] = validator
+
+        try:
+            resp = http_client.get(url, headers=headers, timeout=DOWNLOAD_TIMEOUT, stream=True)
+
+            if offset and resp.status_code == 416:
+                # The partial already holds the whole file; the checksum decides.
+                resp.close()
+                break
+
+            resp.raise_for_status()
+
+            if offset and resp.status_code != 206:
+                # Range ignored or validator mismatch: the server sent the full body.
+                log.info(f"Server did not resume [{dest.name}]; restarting from zero")
+                sha256 = hashlib.sha256()
+                offset = 0
+                if compressor:
+                    compressor.reset()
+
+            state.update(_validators(resp))
+            _save_partial(state_path, state)
+
+            with open(part_path, "ab" if offset else "wb") as f:
+                for chunk in resp.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+                    start = time.monotonic()
+                    sha256.update(chunk)
+                    hash_seconds += time.monotonic() - start
+                    offset += len(chunk)
+                    received += len(chunk)
+                    if compressor:
+                        compressor.write(chunk)
+            break
 
-    with open(dest, "wb") as f:
-        for chunk in resp.iter_content(chunk_size=8192):
-            f.write(chunk)
-            sha256.update(chunk)
+        except requests.RequestException as e:
+            last_error = e
+            if attempt < DOWNLOAD_RETRIES:
+                metrics.record_asset(dest.name, download_retries=1)
+                delay = 2 ** attempt
+                log.warning(
+                    f"Download interrupted [{dest.name}] at offset [{offset}] "
+                    f"(attempt {attempt}/{DOWNLOAD_RETRIES}): {e}; retrying in [{delay}]s"
+                )
+                time.sleep(delay)
+    else:
+        metrics.record_asset(dest.name, download_bytes=received, hash_seconds=hash_seconds)
+        if compressor:
+            compressor.abort()
+        raise RuntimeError(f"Download failed [{url}]: {last_error}")
+
+    metrics.record_asset(dest.name, download_bytes=received, hash_seconds=hash_seconds)
 
     actual_sha256 = sha256.hexdigest()
     if actual_sha256.lower() != expected_sha256.lower():
-        dest.unlink(missing_ok=True)
+        _discard_partial(part_path, state_path)
+        if compressor:
+            compressor.abort()
         raise RuntimeError(
             f"SHA256 verification failed [{dest.name}]: "
             f"expected [{expected_sha256}], got [{actual_sha256}]"
         )
 
+    part_path.replace(dest)
+    state_path.unlink(missing_ok=True)
+    if compressor:
+        compressor.finish()
+
     file_size = dest.stat().st_size
     log.info(f"Download complete: [{dest.name}], size [{file_size / 1024 / 1024:.1f}MB]")
     return dest
 
 
+def _probe_range_support(url: str) -> tuple[int | None, dict]:
+    """
+    Check whether the server honours byte ranges for a URL.
+
+    Returns:
+        (total, validators): total file size reported by `Content-Range` (None if
+        ranges are not supported) and the response's ETag/Last-Modified.
+    """
+    try:
+        resp = http_client.get(url, headers={"Range": "bytes=0-0"}, stream=True)
+        resp.close()
+    except requests.RequestException as e:
+        log.warning(f"Range probe failed [{url}]: {e}")
+        return None, {}
+
+    content_range = resp.headers.get("Content-Range", "")
+    if resp.status_code != 206 or "/" not in content_range:
+        return None, {}
+
+    total = content_range.rsplit("/", 1)[1]
+    return (int(total) if total.isdigit() else None), _validators(resp)
+
+
+class _SegmentProgress:
+    """
+    Write offsets of a segmented download, kept in its `.part.json` state file.
+
+    `state["segments"]` holds one `[start, end, position]` entry per range;
+    `position` only moves past bytes already written to the `.part` file, so a
+    later attempt (or run) can continue every range where it stopped.
+    """
+
+    def __init__(self, state_path: Path, state: dict):
+        self.state_path = state_path
+        self.state = state
+        self._lock = threading.Lock()
+        self._saved = time.monotonic()
+
+    def segment(self, index: int) -> tuple[int, int, int]:
+        start, end, position = self.state["segments"][index]
+        return start, end, position
+
+    def pending(self) -> list[int]:
+        return [i for i, (_, end, position) in enumerate(self.state["segments"]) if position <= end]
+
+    def remaining(self) -> int:
+        return sum(end + 1 - position for _, end, position in self.state["segments"])
+
+    def advance(self, index: int, position: int) -> None:
+        with self._lock:
+            self.state["segments"][index][2] = position
+            if time.monotonic() - self._saved >= PARTIAL_SAVE_INTERVAL:
+                self._save()
+
+    def save(self) -> None:
+        with self._lock:
+            self._save()
+
+    def _save(self) -> None:
+        _save_partial(self.state_path, self.state)
+        self._saved = time.monotonic()
+
+
+def _download_segment(url: str, part_path: Path, progress: _SegmentProgress, index: int) -> None:
+    """
+    Fetch one range of a URL into the same offsets of a preallocated file.
+
+    Interrupted segments (errors or bodies that end early) are retried from the
+    last byte written.
+
+    Raises:
+        RuntimeError: If the segment cannot be fetched.
+    """
+    start, end, position = progress.segment(index)
+    last_error = None
+    name = part_path.name.removesuffix(".part")
+
+    for attempt in range(1, DOWNLOAD_RETRIES + 1):
+        begin = position
+        try:
+            resp = http_client.get(
+                url,
+                headers={"Range": f"bytes={position}-{end}"},
+                timeout=DOWNLOAD_TIMEOUT,
+                stream=True,
+            )
+            resp.raise_for_status()
+            if resp.status_code != 206:
+                resp.close()
+                raise RuntimeError(f"Server ignored range [{position}-{end}] for [{url}]")
+
+            with open(part_path, "r+b") as f:
+                f.seek(position)
+                for chunk in resp.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+                    f.flush()
+                    position += len(chunk)
+                    progress.advance(index, position)
+
+            metrics.record_asset(name, download_bytes=position - begin)
+            if position == end + 1:
+                return
+            last_error = f"ended early at [{position}]"
+
+        except requests.RequestException as e:
+            last_error = e
+            metrics.record_asset(name, download_bytes=position - begin)
+
+        if attempt < DOWNLOAD_RETRIES:
+            metrics.record_asset(name, download_retries=1)
+            delay = 2 ** attempt
+            log.warning(
+                f"Segment [{start}-{end}] of [{part_path.name}] interrupted at [{position}] "
+                f"(attempt {attempt}/{DOWNLOAD_RETRIES}): {last_error}; retrying in [{delay}]s"
+            )
+            time.sleep(delay)
+
+    raise RuntimeError(f"Segment [{start}-{end}] download failed [{url}]: {last_error}")
+
+
+def _resume_segmented(url: str, expected_sha256: str, part_path: Path, state_path: Path,
+                      total: int, validators: dict) -> dict | None:
+    """
+    Load the state of an earlier segmented download of the same file, if any.
+
+    A partial is only reused when its size and the server's validators still match.
+    """
+    state = _load_partial(url, expected_sha256, part_path, state_path)
+    if not state or "segments" not in state:
+        return state
+    if state.get("size") != total or part_path.stat().st_size != total:
+        log.info(f"Discarding stale partial [{part_path.name}] (size changed)")
+        _discard_partial(part_path, state_path)
+        return None
+    for key in ("etag", "lastModified"):
+        if state.get(key) and validators.get(key) and state[key] != validators[key]:
+            log.info(f"Discarding stale partial [{part_path.name}] (upstream file changed)")
+            _discard_partial(part_path, state_path)
+            return None
+    return state
+
+
+def download_file_segmented(
+    url: str,
+    dest: Path,
+    expected_sha256: str,
+    size: int | None = None,
+    segments: int = DOWNLOAD_SEGMENTS,
+    variants: tuple[str, ...] = ()
+) -> Path:
+    """
+    Download a file as several concurrent byte ranges and verify its SHA256 checksum.
+
+    The file is preallocated and each range is written at its own offset, so
+    per-file throughput is not capped by a single connection. Falls back to the
+    single-stream `download_file` when segmentation is disabled, the file is small,
+    the server does not support ranges, or a single-stream partial is waiting.
+
+    Each range's offset is saved in `{dest}.part.json`. A range that runs out of
+    retries does not discard the others: the remaining ranges are retried in
+    further rounds while they make progress, and a partial left when the call
+    gives up is resumed by the next call for the same file.
+
+    Ranges arrive out of order, so compressed variants are fed from the
+    sequential hash pass over the finished file rather than from the sockets.
+
+    Args:
+        url: Download URL.
+        dest: Destination file path.
+        expected_sha256: Expected SHA256 checksum.
+        size: Expected size in bytes (from the manifest), if known.
+        segments: Number of concurrent ranges.
+        variants: Compressed formats to write next to `dest` (see `compress`).
+
+    Returns:
+        The downloaded file path.
+
+    Raises:
+        RuntimeError: If the download fails or the checksum does not match.
+    """
+    if segments <= 1 or (size is not None and size < DOWNLOAD_SEGMENT_MIN_SIZE):
+        return download_file(url, dest, expected_sha256, variants)
+
+    total, validators = _probe_range_support(url)
+    if total is None:
+        log.info(f"Server does not support ranges for [{url}]; using a single stream")
+        return download_file(url, dest, expected_sha256, variants)
+    if size is not None and total != size:
+        log.warning(f"Size mismatch for [{url}]: manifest [{size}], server [{total}]")
+    if total < DOWNLOAD_SEGMENT_MIN_SIZE:
+        return download_file(url, dest, expected_sha256, variants)
+
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    part_path, state_path = _partial_paths(dest)
+    state = _resume_segmented(url, expected_sha256, part_path, state_path, total, validators)
+    if state and "segments" not in state:
+        return download_file(url, dest, expected_sha256, variants)
+
+    if state:
+        progress = _SegmentProgress(state_path, state)
+        log.info(
+            f"Resuming: [{url}] with [{progress.remaining()}] of [{total}] bytes "
+            f"left in [{len(progress.pending())}] segments"
+        )
+    else:
+        log.info(f"Downloading: [{url}] in [{segments}] segments")
+        with open(part_path, "wb") as f:
+            f.truncate(total)
+        step = -(-total // segments)
+        state = {
+            "url": url,
+            "sha256": expected_sha256,
+            "size": total,
+            **validators,
+            "segments": [[start, min(start + step, total) - 1, start] for start in range(0, total, step)],
+        }
+        progress = _SegmentProgress(state_path, state)
+        progress.save()
+
+    errors: list[Exception] = []
+    for _ in range(DOWNLOAD_RETRIES):
+        pending = progress.pending()
+        if not pending:
+            break
+        before = progress.remaining()
+        errors = []
+        with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+            futures = [executor.submit(_download_segment, url, part_path, progress, i) for i in pending]
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except RuntimeError as e:
+                    errors.append(e)
+        progress.save()
+        if errors and progress.remaining() == before:
+            break  # No range moved forward; more rounds will not help.
+
+    if progress.pending():
+        raise RuntimeError(
+            f"Download failed [{url}]: [{progress.remaining()}] bytes left in "
+            f"[{len(progress.pending())}] segment(s), partial kept for the next attempt: "
+            f"{errors[0] if errors else 'no progress'}"
+        )
+
+    compressor = open_compressor(dest, variants)
+    try:
+        start = time.monotonic()
+        sha256 = hashlib.sha256()
+        with open(part_path, "rb") as f:
+            while chunk := f.read(DOWNLOAD_CHUNK_SIZE):
+                sha256.update(chunk)
+                if compressor:
+                    compressor.write(chunk)
+        metrics.record_asset(dest.name, hash_seconds=time.monotonic() - start)
+    except Exception:
+        if compressor:
+            compressor.abort()
+        raise
+
+    actual_sha256 = sha256.hexdigest()
+    if actual_sha256.lower() != expected_sha256.lower():
+        _discard_partial(part_path, state_path)
+        if compressor:
+            compressor.abort()
+        raise RuntimeError(
+            f"SHA256 verification failed [{dest.name}]: "
+            f"expected [{expected_sha256}], got [{actual_sha256}]"
+        )
+
+    part_path.replace(dest)
+    state_path.unlink(missing_ok=True)
+    if compressor:
+        compressor.finish()
+
+    log.info(f"Download complete: [{dest.name}], size [{total / 1024 / 1024:.1f}MB]")
+    return dest
+
+
+def _timed_download(url: str, dest: Path, expected_sha256: str, size: int | None,
+                    variants: tuple[str, ...] = ()) -> Path:
+    """
+    `download_file_segmented` under the global download limit, recording the
+    asset's wall time in the run metrics.
+    """
+    with limits.download_slot():
+        start = time.monotonic()
+        try:
+            return download_file_segmented(url, dest, expected_sha256, size, variants=variants)
+        finally:
+            metrics.record_asset(dest.name, download_seconds=time.monotonic() - start)
+
+
+def platform_path(version: str, platform: str) -> str:
+    """
+    Return a platform binary's path below the download base URL.
+
+    Windows artifacts end with `.exe`; other platforms have no extension.
+    """
+    path = f"{version}/{platform}/claude"
+    if platform.startswith("win"):
+        path += ".exe"
+    return path
+
+
+def platform_url(gcs_bucket: str, version: str, platform: str) -> str:
+    """
+    Return the upstream download URL of a platform binary.
+    """
+    return f"{gcs_bucket}/{platform_path(version, platform)}"
+
+
+def asset_name(version: str, platform: str) -> str:
+    """
+    Return the release asset file name for a platform binary.
+
+    Windows artifacts end with `.exe`; other platforms have no extension.
+    """
+    filename = f"claude-{version}-{platform}"
+    if platform.startswith("win"):
+        filename += ".exe"
+    return filename
+
+
+def _compress_cached(dest: Path, variants: tuple[str, ...]) -> Path:
+    compress_file(dest, variants)
+    return dest
+
+
+@traced
 def download_version_files(
     gcs_bucket: str,
     version: str,
     manifest: dict,
-    dest_dir: Path
+    dest_dir: Path,
+    variants: tuple[str, ...] = ()
 ) -> list[Path]:
     """
     Download all platform artifacts for a version in parallel.
@@ -76,6 +572,8 @@ def download_version_files(
         version: Target version.
         manifest: Parsed `manifest.json` content.
         dest_dir: Destination directory.
+        variants: Compressed formats to write next to each binary (see `compress`);
+            they are not part of the returned list.
 
     Returns:
         List of downloaded file paths (empty list in fallback mode).
@@ -100,6 +598,7 @@ def download_version_files(
 
     log.info(f"Downloading version [{version}] artifacts for [{len(platforms)}] platforms...")
 
+    store = default_store()
     files = []
     errors = []
 
@@ -107,30 +606,34 @@ def download_version_files(
         futures = {}
 
         for platform, info in platforms.items():
-            # Windows artifacts end with `.exe`; other platforms have no extension.
-            is_win = platform.startswith("win")
-            url = f"{gcs_bucket}/{version}/{platform}/claude"
-            if is_win:
-                url += ".exe"
-
-            filename = f"claude-{version}-{platform}"
-            if is_win:
-                filename += ".exe"
-            dest = Path(dest_dir) / filename
+            url = platform_url(gcs_bucket, version, platform)
+            dest = Path(dest_dir) / asset_name(version, platform)
 
             checksum = info.get("checksum", "")
             if not checksum:
                 log.warning(f"Platform [{platform}] has no checksum; skipping")
                 continue
 
-            future = executor.submit(download_file, url, dest, checksum)
-            futures[future] = platform
+            metrics.record_asset(dest.name, version=version, platform=platform)
+            if store and store.get(checksum, dest, info.get("size")):
+                metrics.record_asset(dest.name, cache_hit=True)
+                if variants:
+                    # Nothing streams through on a cache hit; compress the cached copy.
+                    futures[executor.submit(_compress_cached, dest, variants)] = (platform, checksum)
+                else:
+                    files.append(dest)
+                continue
+
+            future = executor.submit(_timed_download, url, dest, checksum, info.get("size"), variants)
+            futures[future] = (platform, checksum)
 
         for future in as_completed(futures):
-            platform = futures[future]
+            platform, checksum = futures[future]
             try:
                 file_path = future.result()
                 files.append(file_path)
+                if store:
+                    store.put(checksum, file_path)
             except Exception as e:
                 log.error(f"Platform [{platform}] download failed: {e}")
                 errors.append(f"{platform}: {e}")
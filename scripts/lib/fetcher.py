@@ -6,19 +6,26 @@ Fetches the upstream `GCS_BUCKET` base URL and `manifest.json`.
 
 import re
 import json
+import time
 import logging
 import requests
 
-from .config import INSTALL_SCRIPT_URL, REQUEST_TIMEOUT
+from . import http_client, http_cache
+from .config import INSTALL_SCRIPT_URL, BASE_URL_TTL
+from .profiling import traced
 
 log = logging.getLogger(__name__)
 
+BASE_URL_CACHE = "download_base_url.json"
 
+
+@traced
 def get_gcs_bucket() -> str:
     """
     Parse the official install script to extract the download base URL.
 
     Supports both legacy `GCS_BUCKET` and current `DOWNLOAD_BASE_URL`.
+    A parsed URL younger than `BASE_URL_TTL` is reused without any request.
 
     Returns:
         Download base URL (without a trailing slash).
@@ -26,11 +33,15 @@ def get_gcs_bucket() -> str:
     Raises:
         RuntimeError: If parsing fails.
     """
+    cached = http_cache.load_json(BASE_URL_CACHE)
+    if cached and time.time() - cached.get("fetchedAt", 0) < BASE_URL_TTL:
+        log.info(f"Download base URL (cached): [{cached['url']}]")
+        return cached["url"]
+
     log.info("Fetching download base URL...")
 
     # `install.sh` may redirect to the actual script.
-    resp = requests.get(INSTALL_SCRIPT_URL, timeout=REQUEST_TIMEOUT, allow_redirects=True)
-    resp.raise_for_status()
+    script = http_cache.get_text(INSTALL_SCRIPT_URL, allow_redirects=True)
 
     patterns = [
         r'DOWNLOAD_BASE_URL\s*=\s*["\']([^"\']+)["\']',
@@ -38,10 +49,11 @@ def get_gcs_bucket() -> str:
     ]
 
     for pattern in patterns:
-        match = re.search(pattern, resp.text)
+        match = re.search(pattern, script)
         if match:
             bucket = match.group(1).rstrip("/")
             log.info(f"Download base URL: [{bucket}]")
+            http_cache.save_json(BASE_URL_CACHE, {"url": bucket, "fetchedAt": time.time()})
             return bucket
 
     raise RuntimeError(
@@ -50,6 +62,7 @@ def get_gcs_bucket() -> str:
     )
 
 
+@traced
 def get_manifest(gcs_bucket: str, version: str) -> dict:
     """
     Fetch `manifest.json` for a given version.
@@ -67,9 +80,7 @@ def get_manifest(gcs_bucket: str, version: str) -> dict:
     log.info(f"Fetching manifest: [{url}]")
 
     try:
-        resp = requests.get(url, timeout=REQUEST_TIMEOUT)
-        resp.raise_for_status()
-        manifest = resp.json()
+        manifest = json.loads(http_cache.get_text(url))
         log.info(f"Version [{version}] contains [{len(manifest.get('platforms', {}))}] platforms")
         return manifest
 
@@ -100,7 +111,7 @@ def get_latest_version(gcs_bucket: str) -> str:
     url = f"{gcs_bucket}/latest"
     log.info(f"Fetching latest version: [{url}]")
 
-    resp = requests.get(url, timeout=REQUEST_TIMEOUT)
+    resp = http_client.get(url)
     resp.raise_for_status()
 
     version = resp.text.strip()
@@ -0,0 +1,202 @@
+"""
+Batched git commits.
+
+Collects the `version.json`, `releases/{version}/` and `releases/index.json`
+changes of a sync run and commits/pushes them together instead of once per
+version. The metadata of a new release is pushed before the release is
+created (`push_release`), taking any pending versions along, so its tag points
+at a commit that contains it.
+"""
+
+import time
+import logging
+import threading
+import subprocess
+from pathlib import Path
+
+from . import metrics
+from .config import (
+    GIT_COMMIT_EVERY,
+    GIT_COMMIT_INTERVAL,
+    GIT_PUSH_RETRIES,
+    VERSION_FILE,
+    MANIFEST_INDEX_FILE,
+)
+from .profiling import traced
+from .version import flush_synced, version_key
+
+log = logging.getLogger(__name__)
+
+
+def _git(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(["git", *args], check=True, capture_output=True)
+
+
+def _stderr(e: subprocess.CalledProcessError) -> str:
+    return e.stderr.decode() if e.stderr else str(e)
+
+
+def _commit_message(versions: list[str]) -> list[str]:
+    # Concurrent syncs (backfill) can finish out of order.
+    versions = sorted(versions, key=version_key)
+    if len(versions) == 1:
+        return ["-m", f":bookmark: Release version {versions[0]}"]
+    if len(versions) <= 3:
+        return ["-m", f":bookmark: Release versions {', '.join(versions)}"]
+    return [
+        "-m", f":bookmark: Release {len(versions)} versions ({versions[0]} - {versions[-1]})",
+        "-m", "\n".join(f"- {v}" for v in versions),
+    ]
+
+
+class GitBatch:
+    """
+    Accumulates synced versions and commits them in batches.
+
+    A commit is made when `every` versions are pending, when `interval` seconds
+    have passed since the last commit, or when `commit()` is called at the end
+    of a run.
+
+    Attributes:
+        commits: Versions included in each successful commit, in order.
+    """
+
+    def __init__(self, every: int = GIT_COMMIT_EVERY, interval: float = GIT_COMMIT_INTERVAL):
+        self.every = every
+        self.interval = interval
+        self.pending: list[str] = []
+        self._unpushed: list[str] = []
+        self.commits: list[list[str]] = []
+        self._last_commit = time.monotonic()
+        # Versions may finish on several threads (backfill); one commit at a time.
+        self._lock = threading.RLock()
+
+    def add(self, version: str) -> None:
+        """
+        Queue a synced version, committing if a batch threshold is reached.
+
+        Args:
+            version: The version that was just synced.
+        """
+        with self._lock:
+            self.pending.append(version)
+
+            if self.every and len(self.pending) >= self.every:
+                self.commit()
+            elif self.interval and time.monotonic() - self._last_commit >= self.interval:
+                self.commit()
+
+    @traced
+    def commit(self) -> list[str]:
+        """
+        Commit all pending versions and push.
+
+        Git failures are logged rather than raised, matching the per-version flow
+        this replaces. Versions whose commit was not pushed are retried on the
+        next call.
+
+        Returns:
+            Versions included in the pushed commit(s) (empty if nothing was pushed).
+        """
+        with self._lock:
+            try:
+                return self._commit()
+            except subprocess.CalledProcessError as e:
+                log.warning(f"Git operation failed: {_stderr(e)}")
+                return []
+
+    @traced
+    def push_release(self, version: str) -> str:
+        """
+        Commit and push a new version's `releases/{version}/` before its release is created.
+
+        Pending versions go into the same commit. The release tag is created on
+        the returned commit, so it always contains the version's metadata.
+
+        Returns:
+            SHA of the pushed commit.
+
+        Raises:
+            RuntimeError: If the commit or push fails.
+        """
+        with self._lock:
+            try:
+                self._commit(release=version)
+                return _git("rev-parse", "HEAD").stdout.decode().strip()
+            except subprocess.CalledProcessError as e:
+                raise RuntimeError(f"Failed to push metadata of version [{version}]: {_stderr(e).strip()}")
+
+    def _commit(self, release: str | None = None) -> list[str]:
+        versions = list(dict.fromkeys(self.pending + ([release] if release else [])))
+        if not versions and not self._unpushed:
+            return []
+
+        if versions:
+            # The commit must carry the compacted index, not the local journal.
+            flush_synced()
+
+            _git("add", VERSION_FILE)
+            release_dirs = [f"releases/{v}" for v in versions if Path("releases", v).exists()]
+            if Path("releases", MANIFEST_INDEX_FILE).exists():
+                release_dirs.append(f"releases/{MANIFEST_INDEX_FILE}")
+            if release_dirs:
+                _git("add", *release_dirs)
+
+            if subprocess.run(["git", "diff", "--cached", "--quiet"]).returncode == 0:
+                log.info(f"Nothing to commit for versions {versions}")
+            else:
+                with metrics.timer("git.commit"):
+                    _git("commit", *_commit_message(versions))
+                self._unpushed.extend(versions)
+            self.pending.clear()
+
+        if self._unpushed:
+            with metrics.timer("git.push"):
+                self._push()
+
+        pushed, self._unpushed = self._unpushed, []
+        self._last_commit = time.monotonic()
+        if pushed:
+            self.commits.append(pushed)
+            log.info(f"Git commit and push succeeded for [{len(pushed)}] version(s): {pushed}")
+        return pushed
+
+    def _push(self) -> None:
+        for attempt in range(1, GIT_PUSH_RETRIES + 1):
+            try:
+                _git("push")
+                return
+            except subprocess.CalledProcessError as e:
+                if attempt == GIT_PUSH_RETRIES:
+                    raise
+                log.warning(
+                    f"Push rejected (attempt {attempt}/{GIT_PUSH_RETRIES}): {_stderr(e).strip()}; "
+                    f"rebasing onto remote"
+                )
+                time.sleep(2 ** attempt)
+                self._rebase()
+
+    def _rebase(self) -> None:
+        """
+        Rebase local commits onto the remote, leaving the work tree clean if it fails.
+
+        Other threads (backfill) keep writing tracked metadata while a push is
+        retried, so uncommitted changes are stashed around the rebase.
+
+        Raises:
+            subprocess.CalledProcessError: If the rebase fails (after it was aborted).
+        """
+        try:
+            _git("pull", "--rebase", "--autostash")
+        except subprocess.CalledProcessError as e:
+            conflicts = subprocess.run(
+                ["git", "diff", "--name-only", "--diff-filter=U"], capture_output=True, text=True
+            ).stdout.split()
+            if conflicts:
+                log.error(f"Rebase onto remote hit conflicts in {conflicts}; aborting it")
+            else:
+                log.error(f"Rebase onto remote failed: {_stderr(e).strip()}; aborting it")
+            abort = subprocess.run(["git", "rebase", "--abort"], capture_output=True)
+            if abort.returncode != 0 and conflicts:
+                log.warning(f"git rebase --abort failed: {abort.stderr.decode().strip()}")
+            raise
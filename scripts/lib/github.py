@@ -0,0 +1,194 @@
+"""
+GitHub REST API client for releases.
+
+Talks to the Releases API directly over the shared pooled session instead of
+spawning `gh` for every call.
+"""
+
+import os
+import logging
+from pathlib import Path
+from urllib.parse import quote
+
+import requests
+
+from . import http_client
+from .config import GITHUB_API_URL, UPLOAD_TIMEOUT
+
+log = logging.getLogger(__name__)
+
+
+class GitHubError(RuntimeError):
+    """
+    A GitHub API request failed.
+    """
+
+    def __init__(self, message: str, status: int | None = None):
+        super().__init__(message)
+        self.status = status
+
+
+class GitHubClient:
+    """
+    Minimal Releases API client.
+
+    Args:
+        repo: `owner/name`; defaults to `$GITHUB_REPOSITORY`.
+        token: API token; defaults to `$GITHUB_TOKEN` or `$GH_TOKEN`.
+        api_url: API base URL; defaults to `$GITHUB_API_URL` or `GITHUB_API_URL`.
+    """
+
+    def __init__(self, repo: str | None = None, token: str | None = None, api_url: str | None = None):
+        self.repo = repo or os.environ.get("GITHUB_REPOSITORY", "")
+        self.token = token or os.environ.get("GITHUB_TOKEN") or os.environ.get("GH_TOKEN", "")
+        self.api_url = (api_url or os.environ.get("GITHUB_API_URL") or GITHUB_API_URL).rstrip("/")
+
+        if not self.repo or not self.token:
+            raise GitHubError("GitHub client needs a repository and a token")
+
+    @classmethod
+    def from_env(cls) -> "GitHubClient | None":
+        """
+        Build a client from the environment, or return None if it is not configured.
+        """
+        try:
+            return cls()
+        except GitHubError:
+            return None
+
+    def _headers(self, extra: dict | None = None) -> dict:
+        headers = {
+            "Authorization": f"Bearer {self.token}",
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28",
+        }
+        if extra:
+            headers.update(extra)
+        return headers
+
+    def request(self, method: str, path: str, ok: tuple[int, ...] = (), **kwargs) -> requests.Response:
+        """
+        Send an API request and raise `GitHubError` on an unexpected status.
+
+        Args:
+            method: HTTP method.
+            path: Path below the API base URL, or an absolute URL.
+            ok: Extra status codes that are not treated as errors.
+            **kwargs: Passed through to `http_client.request`.
+
+        Returns:
+            The response.
+
+        Raises:
+            GitHubError: If the request fails.
+        """
+        url = path if path.startswith("http") else f"{self.api_url}{path}"
+        headers = self._headers(kwargs.pop("headers", None))
+
+        try:
+            resp = http_client.request(method, url, headers=headers, **kwargs)
+        except requests.RequestException as e:
+            raise GitHubError(f"{method} [{url}] failed: {e}")
+
+        if resp.status_code >= 400 and resp.status_code not in ok:
+            raise GitHubError(
+                f"{method} [{url}] returned [{resp.status_code}]: {resp.text[:500]}",
+                resp.status_code,
+            )
+        return resp
+
+    def get_release_by_tag(self, tag: str) -> dict | None:
+        """
+        Return the published release for a tag, or None if there is none.
+        """
+        resp = self.request("GET", f"/repos/{self.repo}/releases/tags/{quote(tag)}", ok=(404,))
+        return None if resp.status_code == 404 else resp.json()
+
+    def create_release(self, tag: str, name: str, body: str, draft: bool = True,
+                       target: str | None = None) -> dict:
+        """
+        Create a release (a draft by default, so assets can be attached before it is visible).
+
+        Args:
+            target: Commit SHA or branch the tag is created on when it does not
+                exist yet (default: the repository's default branch).
+        """
+        payload = {"tag_name": tag, "name": name, "body": body, "draft": draft}
+        if target:
+            payload["target_commitish"] = target
+        resp = self.request("POST", f"/repos/{self.repo}/releases", json=payload)
+        return resp.json()
+
+    def update_draft(self, release_id: int, name: str, body: str, target: str | None = None) -> dict | None:
+        """
+        Update the name, notes and target of a draft release.
+
+        Returns:
+            The updated release, or None if it no longer exists.
+        """
+        payload = {"name": name, "body": body}
+        if target:
+            payload["target_commitish"] = target
+        resp = self.request("PATCH", f"/repos/{self.repo}/releases/{release_id}", ok=(404,), json=payload)
+        return None if resp.status_code == 404 else resp.json()
+
+    def upload_asset(self, release: dict, path: Path, name: str | None = None) -> dict:
+        """
+        Upload a file to a release, streaming the body from disk.
+
+        Args:
+            release: Release object returned by the API.
+            path: File to upload.
+            name: Asset name; defaults to the file name.
+
+        Returns:
+            The created asset object.
+        """
+        name = name or path.name
+        upload_url = release["upload_url"].split("{", 1)[0]
+
+        with open(path, "rb") as f:
+            resp = self.request(
+                "POST",
+                upload_url,
+                params={"name": name},
+                data=f,
+                headers={
+                    "Content-Type": "application/octet-stream",
+                    "Content-Length": str(path.stat().st_size),
+                },
+                timeout=UPLOAD_TIMEOUT,
+            )
+        return resp.json()
+
+    def publish_release(self, release: dict, make_latest: bool = True) -> dict:
+        """
+        Turn a draft release into a published one (creating its tag).
+
+        Args:
+            release: Draft release object.
+            make_latest: Whether the release becomes the repository's "Latest".
+        """
+        resp = self.request(
+            "PATCH", f"/repos/{self.repo}/releases/{release['id']}",
+            json={"draft": False, "make_latest": "true" if make_latest else "false"}
+        )
+        return resp.json()
+
+    def list_assets(self, release: dict) -> list[dict]:
+        """
+        Return the current assets of a release.
+        """
+        resp = self.request(
+            "GET", f"/repos/{self.repo}/releases/{release['id']}/assets", params={"per_page": 100}
+        )
+        return resp.json()
+
+    def delete_asset(self, asset_id: int) -> None:
+        self.request("DELETE", f"/repos/{self.repo}/releases/assets/{asset_id}", ok=(404,))
+
+    def delete_release(self, release_id: int) -> None:
+        self.request("DELETE", f"/repos/{self.repo}/releases/{release_id}", ok=(404,))
+
+    def delete_tag(self, tag: str) -> None:
+        self.request("DELETE", f"/repos/{self.repo}/git/refs/tags/{quote(tag)}", ok=(404, 422))
@@ -0,0 +1,117 @@
+"""
+Conditional-GET cache for small upstream documents.
+
+Stores response bodies with their ETag/Last-Modified validators so unchanged
+documents (CHANGELOG, install script, manifests) are answered by a 304.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from pathlib import Path
+
+from . import http_client
+from .config import HTTP_CACHE_DIR
+
+log = logging.getLogger(__name__)
+
+
+def _entry_paths(url: str) -> tuple[Path, Path]:
+    key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    root = Path(HTTP_CACHE_DIR)
+    return root / f"{key}.json", root / f"{key}.body"
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def load_json(name: str) -> dict | None:
+    """
+    Load a small JSON record stored in the cache directory.
+
+    Args:
+        name: File name inside `HTTP_CACHE_DIR`.
+
+    Returns:
+        The stored dict, or None if missing, unreadable or caching is disabled.
+    """
+    if not HTTP_CACHE_DIR:
+        return None
+    try:
+        with open(Path(HTTP_CACHE_DIR) / name, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError, IOError):
+        return None
+
+
+def save_json(name: str, data: dict) -> None:
+    """
+    Atomically store a small JSON record in the cache directory.
+
+    Args:
+        name: File name inside `HTTP_CACHE_DIR`.
+        data: Record to store.
+    """
+    if not HTTP_CACHE_DIR:
+        return
+    _write_atomic(Path(HTTP_CACHE_DIR) / name, json.dumps(data).encode("utf-8"))
+
+
+def get_text(url: str, **kwargs) -> str:
+    """
+    Fetch a text document, revalidating a cached copy with a conditional GET.
+
+    Args:
+        url: Document URL.
+        **kwargs: Passed through to `http_client.get`.
+
+    Returns:
+        The document text (from the network or, on 304, from the cache).
+
+    Raises:
+        requests.HTTPError: If the request fails.
+    """
+    if not HTTP_CACHE_DIR:
+        resp = http_client.get(url, **kwargs)
+        resp.raise_for_status()
+        return resp.text
+
+    meta_path, body_path = _entry_paths(url)
+    meta = load_json(meta_path.name) if body_path.exists() else None
+
+    headers = dict(kwargs.pop("headers", None) or {})
+    if meta:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("lastModified"):
+            headers["If-Modified-Since"] = meta["lastModified"]
+
+    resp = http_client.get(url, headers=headers, **kwargs)
+
+    if meta and resp.status_code == 304:
+        log.info(f"Not modified; using cached copy of [{url}]")
+        return body_path.read_text(encoding="utf-8")
+
+    resp.raise_for_status()
+    text = resp.text
+
+    etag = resp.headers.get("ETag")
+    last_modified = resp.headers.get("Last-Modified")
+    if etag or last_modified:
+        _write_atomic(body_path, text.encode("utf-8"))
+        save_json(meta_path.name, {
+            "url": url,
+            "etag": etag,
+            "lastModified": last_modified,
+            "storedAt": time.time(),
+        })
+
+    return text
@@ -0,0 +1,180 @@
+"""
+Shared HTTP client.
+
+One pooled `requests.Session` used by every module that talks HTTP, so
+connections to the same host are reused and retry/timeout policy is uniform.
+`requests` only speaks HTTP/1.1, so reuse comes from keep-alive pools rather
+than HTTP/2 multiplexing.
+"""
+
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+from .config import (
+    REQUEST_TIMEOUT,
+    HTTP_POOL_HOSTS,
+    HTTP_POOL_SIZE,
+    HTTP_RETRIES,
+    HTTP_BACKOFF_FACTOR,
+)
+
+log = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_session: requests.Session | None = None
+_stats = {"requests": 0}
+_pools: list[HTTPConnectionPool] = []
+
+
+def _count(name: str) -> None:
+    with _lock:
+        _stats[name] += 1
+
+
+class _CountingRetry(Retry):
+    """
+    `Retry` that counts the transport-level retries urllib3 makes inside one adapter call.
+    """
+
+    def increment(self, *args, **kwargs):
+        retry = super().increment(*args, **kwargs)
+        # Only reached when another attempt follows (exhaustion raises).
+        _count("requests")
+        return retry
+
+
+class _TrackedHTTPConnectionPool(HTTPConnectionPool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        with _lock:
+            _pools.append(self)
+
+
+class _TrackedHTTPSConnectionPool(HTTPSConnectionPool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        with _lock:
+            _pools.append(self)
+
+
+class _PooledAdapter(HTTPAdapter):
+    """
+    `HTTPAdapter` that counts the HTTP exchanges it sends and keeps its pools
+    reachable for their public `num_connections` counters.
+
+    `requests` follows redirects itself, one `send` per hop; urllib3 retries
+    happen inside `send` and are counted by `_CountingRetry`.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TrackedHTTPConnectionPool,
+            "https": _TrackedHTTPSConnectionPool,
+        }
+
+    def send(self, request, *args, **kwargs):
+        _count("requests")
+        return super().send(request, *args, **kwargs)
+
+
+def _build_session() -> requests.Session:
+    retry = _CountingRetry(
+        total=HTTP_RETRIES,
+        backoff_factor=HTTP_BACKOFF_FACTOR,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        # Hand the final error response back so callers' `raise_for_status` reports it.
+        raise_on_status=False,
+    )
+    adapter = _PooledAdapter(
+        pool_connections=HTTP_POOL_HOSTS,
+        pool_maxsize=HTTP_POOL_SIZE,
+        max_retries=retry,
+        pool_block=False,
+    )
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """
+    Return the process-wide pooled session, creating it on first use.
+    """
+    global _session
+    with _lock:
+        if _session is None:
+            _session = _build_session()
+        return _session
+
+
+def get(url: str, timeout: float = REQUEST_TIMEOUT, **kwargs) -> requests.Response:
+    """
+    Issue a GET request through the shared session.
+
+    Args:
+        url: Request URL.
+        timeout: Timeout in seconds (defaults to `REQUEST_TIMEOUT`).
+        **kwargs: Passed through to `requests.Session.get`.
+
+    Returns:
+        The response.
+    """
+    return get_session().get(url, timeout=timeout, **kwargs)
+
+
+def request(method: str, url: str, timeout: float = REQUEST_TIMEOUT, **kwargs) -> requests.Response:
+    """
+    Issue a request with any method through the shared session.
+
+    Only GET and HEAD are retried at the transport level.
+
+    Args:
+        method: HTTP method.
+        url: Request URL.
+        timeout: Timeout in seconds (defaults to `REQUEST_TIMEOUT`).
+        **kwargs: Passed through to `requests.Session.request`.
+
+    Returns:
+        The response.
+    """
+    return get_session().request(method, url, timeout=timeout, **kwargs)
+
+
+def connection_stats() -> dict:
+    """
+    Return request and connection counters.
+
+    Returns:
+        Dict with `requests` (HTTP exchanges, counting transport retries and
+        redirects), `connections_opened` and `connections_reused` (exchanges
+        sent on an already used connection; every new connection carries one
+        exchange first).
+    """
+    with _lock:
+        stats = dict(_stats)
+        opened = sum(pool.num_connections for pool in _pools)
+    stats["connections_opened"] = opened
+    stats["connections_reused"] = max(stats["requests"] - opened, 0)
+    return stats
+
+
+def log_connection_stats() -> None:
+    """
+    Log how many requests reused a pooled connection.
+    """
+    stats = connection_stats()
+    log.info(
+        f"HTTP requests [{stats['requests']}], "
+        f"connections opened [{stats['connections_opened']}], "
+        f"reused [{stats['connections_reused']}]"
+    )
@@ -0,0 +1,55 @@
+"""
+Process-wide transfer limits.
+
+Caps concurrent downloads and uploads across every version in flight, so a
+run syncing several versions at once (backfill) does not multiply the
+per-version worker counts. Unlimited unless `configure()` is called.
+"""
+
+import threading
+from contextlib import contextmanager, nullcontext
+
+_downloads: threading.BoundedSemaphore | None = None
+_uploads: threading.BoundedSemaphore | None = None
+
+
+def configure(downloads: int | None = None, uploads: int | None = None) -> None:
+    """
+    Set the global limits (None or 0 removes a limit).
+
+    Args:
+        downloads: Maximum files downloading at once.
+        uploads: Maximum assets uploading at once.
+    """
+    global _downloads, _uploads
+    _downloads = threading.BoundedSemaphore(downloads) if downloads else None
+    _uploads = threading.BoundedSemaphore(uploads) if uploads else None
+
+
+def _slot(semaphore: threading.BoundedSemaphore | None):
+    if semaphore is None:
+        return nullcontext()
+    return _held(semaphore)
+
+
+@contextmanager
+def _held(semaphore: threading.BoundedSemaphore):
+    semaphore.acquire()
+    try:
+        yield
+    finally:
+        semaphore.release()
+
+
+def download_slot():
+    """
+    Context manager holding one download slot.
+    """
+    return _slot(_downloads)
+
+
+def upload_slot():
+    """
+    Context manager holding one upload slot.
+    """
+    return _slot(_uploads)
@@ -0,0 +1,252 @@
+"""
+Aggregated manifest index.
+
+Keeps every `releases/{version}/manifest.json` in one file,
+`releases/index.json`, so lookups by checksum, platform or version range
+read a single small file instead of hundreds of manifests:
+
+    {
+      "format": 2,
+      "versions": [                       oldest to newest
+        ["1.0.37", "2025-..."],           version, build date
+        ...
+      ],
+      "builds": [                         one row per (version, platform)
+        ["1.0.37", "darwin-arm64", "db75...", 200503760],
+        ...
+      ]
+    }
+
+Every row is written on its own line, so adding a version adds lines to the
+git diff instead of rewriting existing ones. `save_version_metadata` updates
+the index as it saves a manifest; `rebuild()` recreates it from the manifests.
+"""
+
+import os
+import json
+import logging
+import threading
+from pathlib import Path
+
+from .config import MANIFEST_INDEX_FILE
+from .version import version_key
+
+log = logging.getLogger(__name__)
+
+INDEX_FORMAT = 2
+
+# Versions may be saved on several threads (backfill); one read-modify-write at a time.
+_lock = threading.Lock()
+
+
+def _releases_dir(base_dir: Path | None) -> Path:
+    if base_dir is None:
+        base_dir = Path(__file__).parent.parent.parent
+    return base_dir / "releases"
+
+
+def index_path(base_dir: Path | None = None) -> Path:
+    """
+    Return the path of `releases/index.json` below `base_dir` (default: repository root).
+    """
+    return _releases_dir(base_dir) / MANIFEST_INDEX_FILE
+
+
+class ManifestIndex:
+    """
+    In-memory form of the index: version -> (build date, {platform: (checksum, size)}).
+
+    Query results are dicts with `version`, `platform`, `checksum`, `size` and
+    `buildDate`, ordered oldest to newest.
+    """
+
+    def __init__(self, entries: dict[str, tuple[str | None, dict[str, tuple[str, int | None]]]] | None = None):
+        self.entries = entries or {}
+        self._by_checksum: dict[str, tuple[str, str]] | None = None
+
+    @classmethod
+    def load(cls, path: Path) -> "ManifestIndex":
+        """
+        Load an index file.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+            ValueError: If the file is not a readable index.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("format") != INDEX_FORMAT:
+            raise ValueError(f"Unsupported index format [{data.get('format')}] in [{path}]")
+
+        entries = {version: (date, {}) for version, date in data["versions"]}
+        for version, platform, checksum, size in data["builds"]:
+            entries[version][1][platform] = (checksum, size)
+        return cls(entries)
+
+    @classmethod
+    def from_releases(cls, base_dir: Path | None = None) -> "ManifestIndex":
+        """
+        Build an index from every saved `releases/{version}/manifest.json`.
+        """
+        index = cls()
+        for manifest_path in _releases_dir(base_dir).glob("*/manifest.json"):
+            try:
+                with open(manifest_path, "r", encoding="utf-8") as f:
+                    manifest = json.load(f)
+                index.put(manifest_path.parent.name, manifest)
+            except (IOError, OSError, json.JSONDecodeError, ValueError) as e:
+                log.warning(f"Skipping unreadable manifest [{manifest_path}]: {e}")
+        return index
+
+    def put(self, version: str, manifest: dict) -> None:
+        """
+        Add or replace a version's builds.
+        """
+        version_key(version)  # Reject names that are not versions before they are stored.
+        platforms = {
+            platform: (info.get("checksum", "").lower(), info.get("size"))
+            for platform, info in manifest.get("platforms", {}).items()
+            if info.get("checksum")
+        }
+        self.entries[version] = (manifest.get("buildDate"), platforms)
+        self._by_checksum = None
+
+    def to_json(self) -> str:
+        versions = sorted(self.entries, key=version_key)
+
+        def dump(value) -> str:
+            return json.dumps(value, separators=(", ", ": "))
+
+        def rows(values: list) -> str:
+            return ",\n".join(f"    {dump(v)}" for v in values)
+
+        builds = [
+            [version, platform, checksum, size]
+            for version in versions
+            for platform, (checksum, size) in sorted(self.entries[version][1].items())
+        ]
+        return "\n".join([
+            "{",
+            f'  "format": {INDEX_FORMAT},',
+            '  "versions": [',
+            rows([[v, self.entries[v][0]] for v in versions]),
+            "  ],",
+            '  "builds": [',
+            rows(builds),
+            "  ]",
+            "}",
+            "",
+        ])
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+        try:
+            tmp.write_text(self.to_json(), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+            raise
+
+    def _row(self, version: str, platform: str) -> dict:
+        build_date, builds = self.entries[version]
+        checksum, size = builds[platform]
+        return {"version": version, "platform": platform, "checksum": checksum,
+                "size": size, "buildDate": build_date}
+
+    def versions(self, first: str | None = None, last: str | None = None) -> list[str]:
+        """
+        Return indexed versions in `[first, last]` (either bound optional), oldest first.
+        """
+        low = version_key(first) if first else None
+        high = version_key(last) if last else None
+        return [
+            v for v in sorted(self.entries, key=version_key)
+            if (low is None or version_key(v) >= low) and (high is None or version_key(v) <= high)
+        ]
+
+    def platforms(self) -> list[str]:
+        return sorted({p for _, builds in self.entries.values() for p in builds})
+
+    def find_checksum(self, checksum: str) -> list[dict]:
+        """
+        Return the builds whose checksum equals `checksum`, or starts with it
+        (prefixes are matched with a scan).
+        """
+        checksum = checksum.lower()
+        if self._by_checksum is None:
+            self._by_checksum = {
+                c: (v, p) for v, (_, builds) in self.entries.items() for p, (c, _) in builds.items()
+            }
+        if checksum in self._by_checksum:
+            return [self._row(*self._by_checksum[checksum])]
+        matches = [vp for c, vp in self._by_checksum.items() if c.startswith(checksum)]
+        return sorted((self._row(v, p) for v, p in matches), key=lambda r: version_key(r["version"]))
+
+    def builds(self, platform: str | None = None, first: str | None = None,
+               last: str | None = None) -> list[dict]:
+        """
+        Return builds in a version range, optionally for one platform, oldest first.
+        """
+        rows = []
+        for version in self.versions(first, last):
+            for p in sorted(self.entries[version][1]):
+                if platform is None or p == platform:
+                    rows.append(self._row(version, p))
+        return rows
+
+    def latest(self, platform: str) -> dict | None:
+        """
+        Return the newest build for a platform, or None if no version has one.
+        """
+        for version in reversed(self.versions()):
+            if platform in self.entries[version][1]:
+                return self._row(version, platform)
+        return None
+
+
+def load(base_dir: Path | None = None) -> ManifestIndex:
+    """
+    Load `releases/index.json`, rebuilding it from the manifests if it is
+    missing or unreadable.
+    """
+    path = index_path(base_dir)
+    try:
+        return ManifestIndex.load(path)
+    except FileNotFoundError:
+        log.info(f"Manifest index [{path}] not found; building it")
+    except (ValueError, KeyError, TypeError, IndexError) as e:
+        log.warning(f"Manifest index [{path}] is unreadable ({e}); rebuilding it")
+    return rebuild(base_dir)
+
+
+def rebuild(base_dir: Path | None = None) -> ManifestIndex:
+    """
+    Recreate `releases/index.json` from every saved manifest.
+    """
+    with _lock:
+        index = ManifestIndex.from_releases(base_dir)
+        index.save(index_path(base_dir))
+    log.info(f"Built manifest index from [{len(index.entries)}] versions")
+    return index
+
+
+def update(version: str, manifest: dict, base_dir: Path | None = None) -> None:
+    """
+    Record a just-saved manifest in `releases/index.json`.
+
+    Raises:
+        OSError: If the index cannot be written.
+    """
+    path = index_path(base_dir)
+    with _lock:
+        try:
+            index = ManifestIndex.load(path)
+        except FileNotFoundError:
+            # First use: index every manifest saved so far (including this one).
+            index = ManifestIndex.from_releases(base_dir)
+        except (ValueError, KeyError, TypeError, IndexError) as e:
+            log.warning(f"Manifest index [{path}] is unreadable ({e}); rebuilding it")
+            index = ManifestIndex.from_releases(base_dir)
+        index.put(version, manifest)
+        index.save(path)
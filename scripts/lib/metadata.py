@@ -7,6 +7,8 @@ import json
 import logging
 from pathlib import Path
 
+from . import manifest_index
+
 log = logging.getLogger(__name__)
 
 
@@ -24,6 +26,7 @@ def save_version_metadata(
       {version}/
         changelog.md   - Release notes for this version (current version only)
         manifest.json  - Complete manifest.json
+      index.json       - Aggregated index of all manifests (updated in place)
 
     Args:
         version: Version number (e.g., "1.0.48")
@@ -74,9 +77,63 @@ def save_version_metadata(
         platforms_count = len(manifest.get("platforms", {}))
         log.info(f"Saved manifest: [{manifest_path}] ({platforms_count} platforms)")
 
+        manifest_index.update(version, manifest, base_dir)
+
         log.info(f"Version [{version}] metadata saved successfully: [{version_dir}]")
         return version_dir
 
     except (IOError, OSError) as e:
         log.error(f"Failed to save version [{version}] metadata: {e}")
         raise
+
+
+def save_version_manifest(version: str, manifest: dict, base_dir: Path = None) -> Path:
+    """
+    Overwrite releases/{version}/manifest.json (keeping changelog.md) and update the index
+
+    Args:
+        version: Version number (e.g., "1.0.48")
+        manifest: Dictionary object of manifest.json
+        base_dir: Base directory path, defaults to repository root
+
+    Returns:
+        Path object of the manifest file
+
+    Raises:
+        IOError: Raised when file write fails
+    """
+    if base_dir is None:
+        base_dir = Path(__file__).parent.parent.parent
+
+    manifest_path = base_dir / "releases" / version / "manifest.json"
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    log.info(f"Updated manifest: [{manifest_path}]")
+
+    manifest_index.update(version, manifest, base_dir)
+    return manifest_path
+
+
+def load_version_manifest(version: str, base_dir: Path = None) -> dict | None:
+    """
+    Load releases/{version}/manifest.json saved by an earlier sync
+
+    Args:
+        version: Version number (e.g., "1.0.48")
+        base_dir: Base directory path, defaults to repository root
+
+    Returns:
+        The saved manifest, or None if the version has none or it is unreadable
+    """
+    if base_dir is None:
+        base_dir = Path(__file__).parent.parent.parent
+
+    manifest_path = base_dir / "releases" / version / "manifest.json"
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (IOError, OSError, json.JSONDecodeError) as e:
+        log.warning(f"Failed to read saved manifest [{manifest_path}]: {e}")
+        return None
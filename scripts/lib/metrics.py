@@ -0,0 +1,288 @@
+"""
+Sync run metrics.
+
+Collects stage durations, per-asset transfer figures (bytes, time, retries,
+cache hits) and named timers from every module of a run, and exports them as
+a JSON report, a Prometheus textfile and a Markdown job summary.
+"""
+
+import json
+import time
+import logging
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from .actions import append_step_summary
+from .http_client import connection_stats
+
+log = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_run: dict = {}
+_stages: dict[str, dict[str, float]] = {}
+_assets: dict[str, dict] = {}
+_timers: dict[str, float] = {}
+_started = time.monotonic()
+
+
+def reset() -> None:
+    """
+    Forget everything recorded so far and restart the run clock.
+    """
+    global _started
+    with _lock:
+        _run.clear()
+        _stages.clear()
+        _assets.clear()
+        _timers.clear()
+        _started = time.monotonic()
+
+
+def set_run(**fields) -> None:
+    """
+    Record run-level facts (version counts, exit status, ...).
+    """
+    with _lock:
+        _run.update(fields)
+
+
+def record_stage(version: str, stage: str, seconds: float) -> None:
+    """
+    Record the time one version spent in a sync stage.
+    """
+    with _lock:
+        _stages.setdefault(version, {})[stage] = seconds
+
+
+def record_asset(name: str, **fields) -> None:
+    """
+    Record facts about one release asset.
+
+    Numeric fields are added to what is already recorded for the asset (so
+    retries and partial transfers accumulate); other fields are replaced.
+
+    Args:
+        name: Asset file name, e.g. `claude-2.1.0-linux-x64`.
+        **fields: e.g. `download_bytes`, `download_seconds`, `download_retries`,
+            `hash_seconds`, `cache_hit`, `upload_bytes`, `upload_seconds`,
+            `upload_retries`, `version`, `platform`.
+    """
+    with _lock:
+        asset = _assets.setdefault(name, {})
+        for key, value in fields.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                asset[key] = asset.get(key, 0) + value
+            else:
+                asset[key] = value
+
+
+def add_time(name: str, seconds: float) -> None:
+    """
+    Add to a named timer.
+    """
+    with _lock:
+        _timers[name] = _timers.get(name, 0.0) + seconds
+
+
+@contextmanager
+def timer(name: str):
+    """
+    Time a block into the named timer, whether or not it raises.
+    """
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        add_time(name, time.monotonic() - start)
+
+
+def _rate(size: float, seconds: float) -> float:
+    return round(size / 1024 / 1024 / seconds, 2) if seconds > 0 else 0.0
+
+
+def report() -> dict:
+    """
+    Build the run report.
+
+    Returns:
+        Dict with `run`, `stages` (totals), `versions` (per-version stage
+        times), `platforms` (aggregated transfers), `assets`, `timers` and `http`.
+    """
+    with _lock:
+        run = dict(_run)
+        versions = {v: dict(s) for v, s in _stages.items()}
+        assets = {n: dict(a) for n, a in _assets.items()}
+        timers = dict(_timers)
+        wall = time.monotonic() - _started
+
+    stages: dict[str, float] = {}
+    for timings in versions.values():
+        for stage, seconds in timings.items():
+            stages[stage] = stages.get(stage, 0.0) + seconds
+
+    platforms: dict[str, dict] = {}
+    for asset in assets.values():
+        totals = platforms.setdefault(asset.get("platform", "unknown"), {
+            "assets": 0, "cacheHits": 0,
+            "downloadBytes": 0, "downloadSeconds": 0.0, "downloadRetries": 0,
+            "hashSeconds": 0.0,
+            "uploadBytes": 0, "uploadSeconds": 0.0, "uploadRetries": 0,
+        })
+        totals["assets"] += 1
+        totals["cacheHits"] += 1 if asset.get("cache_hit") else 0
+        totals["downloadBytes"] += asset.get("download_bytes", 0)
+        totals["downloadSeconds"] += asset.get("download_seconds", 0.0)
+        totals["downloadRetries"] += asset.get("download_retries", 0)
+        totals["hashSeconds"] += asset.get("hash_seconds", 0.0)
+        totals["uploadBytes"] += asset.get("upload_bytes", 0)
+        totals["uploadSeconds"] += asset.get("upload_seconds", 0.0)
+        totals["uploadRetries"] += asset.get("upload_retries", 0)
+
+    for totals in platforms.values():
+        totals["downloadMBps"] = _rate(totals["downloadBytes"], totals["downloadSeconds"])
+        totals["uploadMBps"] = _rate(totals["uploadBytes"], totals["uploadSeconds"])
+        for key in ("downloadSeconds", "hashSeconds", "uploadSeconds"):
+            totals[key] = round(totals[key], 3)
+
+    return {
+        "run": {
+            "finishedAt": datetime.now(timezone.utc).isoformat(),
+            "wallSeconds": round(wall, 3),
+            **run,
+        },
+        "stages": {k: round(v, 3) for k, v in stages.items()},
+        "versions": {v: {k: round(s, 3) for k, s in t.items()} for v, t in versions.items()},
+        "platforms": dict(sorted(platforms.items())),
+        "assets": assets,
+        "timers": {k: round(v, 3) for k, v in timers.items()},
+        "http": connection_stats(),
+    }
+
+
+def _label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def to_prometheus(data: dict, prefix: str = "ccr_sync") -> str:
+    """
+    Render a report in the Prometheus text exposition format (for textfile collectors).
+    """
+    lines = []
+
+    def metric(name: str, help_text: str, samples: list[tuple[dict, float]]) -> None:
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} gauge")
+        for labels, value in samples:
+            rendered = ",".join(f'{k}="{_label(v)}"' for k, v in labels.items())
+            lines.append(f"{prefix}_{name}{{{rendered}}} {value}" if rendered else f"{prefix}_{name} {value}")
+
+    run = data["run"]
+    metric("wall_seconds", "Wall time of the sync run.", [({}, run["wallSeconds"])])
+    metric("last_run_timestamp_seconds", "Unix time the report was written.", [({}, round(time.time(), 3))])
+    metric("versions", "Versions handled by the run, by result.", [
+        ({"result": key}, run[key]) for key in ("succeeded", "failed") if key in run
+    ])
+    metric("stage_seconds", "Seconds spent in each sync stage, summed over versions.", [
+        ({"stage": stage}, seconds) for stage, seconds in data["stages"].items()
+    ])
+
+    platforms = data["platforms"].items()
+    for direction in ("download", "upload"):
+        metric(f"{direction}_bytes", f"Bytes transferred ({direction}) per platform.", [
+            ({"platform": p}, t[f"{direction}Bytes"]) for p, t in platforms
+        ])
+        metric(f"{direction}_seconds", f"Transfer time ({direction}) per platform.", [
+            ({"platform": p}, t[f"{direction}Seconds"]) for p, t in platforms
+        ])
+        metric(f"{direction}_retries", f"Retried {direction} attempts per platform.", [
+            ({"platform": p}, t[f"{direction}Retries"]) for p, t in platforms
+        ])
+    metric("hash_seconds", "Time spent hashing downloads per platform.", [
+        ({"platform": p}, t["hashSeconds"]) for p, t in platforms
+    ])
+    metric("cache_hits", "Assets served from the local blob cache per platform.", [
+        ({"platform": p}, t["cacheHits"]) for p, t in platforms
+    ])
+    metric("timer_seconds", "Named timers (git, catalog, ...).", [
+        ({"name": name}, seconds) for name, seconds in data["timers"].items()
+    ])
+    metric("http_requests", "HTTP requests and connection reuse.", [
+        ({"kind": key}, value) for key, value in data["http"].items()
+    ])
+    return "\n".join(lines) + "\n"
+
+
+def to_markdown(data: dict) -> str:
+    """
+    Render a report as Markdown tables for the job summary.
+    """
+    run = data["run"]
+    lines = [
+        "### Sync Metrics",
+        "",
+        f"Wall time **{run['wallSeconds']:.1f}s**"
+        + (f", succeeded **{run['succeeded']}**, failed **{run['failed']}**" if "succeeded" in run else ""),
+        "",
+    ]
+
+    if data["stages"]:
+        lines += ["| Stage | Seconds |", "| --- | ---: |"]
+        lines += [f"| {stage} | {seconds:.1f} |" for stage, seconds in data["stages"].items()]
+        lines += [f"| {name} | {seconds:.1f} |" for name, seconds in data["timers"].items()]
+        lines.append("")
+
+    if data["platforms"]:
+        lines += [
+            "| Platform | Downloaded | MB/s | Retries | Cache hits | Uploaded | MB/s | Retries |",
+            "| --- | ---: | ---: | ---: | ---: | ---: | ---: | ---: |",
+        ]
+        for platform, t in data["platforms"].items():
+            lines.append(
+                f"| {platform} | {t['downloadBytes'] / 1024 / 1024:.1f} MB | {t['downloadMBps']:.1f} "
+                f"| {t['downloadRetries']} | {t['cacheHits']}/{t['assets']} "
+                f"| {t['uploadBytes'] / 1024 / 1024:.1f} MB | {t['uploadMBps']:.1f} | {t['uploadRetries']} |"
+            )
+        lines.append("")
+
+    return "\n".join(lines)
+
+
+def export(json_path: str | None = None, prometheus_path: str | None = None) -> dict:
+    """
+    Build the report and write it to every configured sink.
+
+    The JSON and Prometheus files are written only when a path is given; the
+    Markdown summary is appended whenever `$GITHUB_STEP_SUMMARY` is set.
+    Export failures are logged, never raised, so metrics cannot fail a sync.
+
+    Returns:
+        The report dict.
+    """
+    data = report()
+
+    sinks = [
+        (json_path, lambda: json.dumps(data, indent=2)),
+        (prometheus_path, lambda: to_prometheus(data)),
+    ]
+    for path, render in sinks:
+        if not path:
+            continue
+        try:
+            target = Path(path)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_name(f".{target.name}.tmp")
+            tmp.write_text(render(), encoding="utf-8")
+            # Textfile collectors may read at any time; never expose a half-written file.
+            tmp.replace(target)
+            log.info(f"Metrics written to [{target}]")
+        except OSError as e:
+            log.warning(f"Failed to write metrics to [{path}]: {e}")
+
+    try:
+        append_step_summary(to_markdown(data))
+    except OSError as e:
+        log.warning(f"Failed to append the job summary: {e}")
+
+    return data
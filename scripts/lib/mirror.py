@@ -0,0 +1,131 @@
+"""
+Local download mirror.
+
+Lays synced versions out like the upstream download base URL, so the
+official install script can be pointed at an internal `DOWNLOAD_BASE_URL`:
+
+    {root}/latest
+    {root}/{version}/manifest.json
+    {root}/{version}/{platform}/claude[.exe]
+
+Files are placed with a hardlink (or reflink/copy) and an atomic rename, and a
+version's binaries are in place before its manifest, which is in place before
+`latest` points at it. Disabled unless `configure()` gets a directory.
+
+With a platform selection (`CCR_PLATFORMS` / `CCR_SKIP_PLATFORMS`) a mirrored
+`manifest.json` lists only the synced platforms; the skipped ones are kept in
+`skippedPlatforms` of the saved `releases/{version}/manifest.json`, not in the
+mirror.
+"""
+
+import os
+import json
+import uuid
+import logging
+import threading
+from pathlib import Path
+
+from .blobstore import link_or_copy
+from .config import MIRROR_DIR
+from .downloader import asset_name, platform_path
+from .version import version_key
+
+log = logging.getLogger(__name__)
+
+_root: Path | None = Path(MIRROR_DIR) if MIRROR_DIR else None
+_latest_lock = threading.Lock()
+
+# Keys this repo adds to saved manifests; upstream manifests do not have them.
+_LOCAL_KEYS = ("deltas", "compressed", "skippedPlatforms", "_fallback_mode")
+
+
+def configure(root: str | None) -> None:
+    """
+    Set the mirror directory (None or "" disables the mirror).
+    """
+    global _root
+    _root = Path(root) if root else None
+
+
+def enabled() -> bool:
+    return _root is not None
+
+
+def has_version(version: str) -> bool:
+    """
+    Return True if the mirror holds the version's manifest (and so its binaries).
+    """
+    return _root is not None and (_root / version / "manifest.json").exists()
+
+
+def _place(src: Path, dest: Path) -> None:
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(f".{dest.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        link_or_copy(src, tmp)
+        os.replace(tmp, dest)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def _write_text(dest: Path, text: str) -> None:
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(f".{dest.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, dest)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def _update_latest(version: str) -> None:
+    """
+    Point `latest` at `version` unless the mirror already has a newer one.
+    """
+    path = _root / "latest"
+    with _latest_lock:
+        try:
+            current = path.read_text(encoding="utf-8").strip()
+        except FileNotFoundError:
+            current = ""
+        try:
+            if current and version_key(current) >= version_key(version):
+                return
+        except ValueError:
+            log.warning(f"Replacing unparsable mirror [latest] [{current}]")
+        _write_text(path, version)
+    log.info(f"Mirror [latest] now points at [{version}]")
+
+
+def write_version(version: str, manifest: dict, workdir: Path) -> None:
+    """
+    Add a version's binaries and manifest to the mirror.
+
+    Args:
+        version: Version number.
+        manifest: Manifest of the version as synced (`platforms.select`):
+            only the selected platforms are mirrored and listed in the
+            mirror's `manifest.json`.
+        workdir: Directory holding the verified binaries, named by `asset_name`.
+
+    Raises:
+        RuntimeError: If a platform binary is missing from `workdir`.
+        OSError: If the mirror cannot be written.
+    """
+    if _root is None:
+        return
+
+    platforms = manifest.get("platforms", {})
+    for platform in platforms:
+        src = workdir / asset_name(version, platform)
+        if not src.exists():
+            raise RuntimeError(f"Cannot mirror version [{version}]: [{src.name}] was not downloaded")
+        _place(src, _root / platform_path(version, platform))
+
+    upstream = {k: v for k, v in manifest.items() if k not in _LOCAL_KEYS}
+    _write_text(_root / version / "manifest.json", json.dumps(upstream, indent=2))
+    log.info(f"Mirrored version [{version}] ([{len(platforms)}] platforms) into [{_root}]")
+
+    _update_latest(version)
@@ -0,0 +1,138 @@
+"""
+Staged pipeline runner.
+
+Runs items through a fixed sequence of stages, one worker thread per stage,
+so different items can occupy different stages at the same time.
+"""
+
+import time
+import queue
+import logging
+import threading
+from typing import Any, Callable, Iterable
+
+from .config import PIPELINE_MAX_IN_FLIGHT
+
+log = logging.getLogger(__name__)
+
+# Returned by a stage to end an item's run successfully without the remaining stages.
+FINISHED = object()
+
+_END = object()
+
+
+class PipelineItem:
+    """
+    An item's progress through the pipeline.
+
+    Attributes:
+        payload: The caller's object passed to every stage.
+        error: Exception raised by a stage, if any.
+        finished: True if a stage ended the run early.
+        timings: Stage name -> seconds spent in that stage.
+    """
+
+    def __init__(self, payload: Any):
+        self.payload = payload
+        self.error: Exception | None = None
+        self.finished = False
+        self.timings: dict[str, float] = {}
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def run_pipeline(
+    payloads: Iterable[Any],
+    stages: list[tuple[str, Callable[[Any], Any]]],
+    max_in_flight: int = PIPELINE_MAX_IN_FLIGHT,
+    cleanup: Callable[[Any], None] | None = None
+) -> list[PipelineItem]:
+    """
+    Run payloads through the stages with bounded queues between them.
+
+    Each stage has a single worker and FIFO queues connect the stages, so
+    items leave every stage in input order. At most `max_in_flight` items are
+    between the first stage and the end of the last one; `payloads` is consumed
+    lazily as slots free up. A stage that raises marks the item failed and the
+    remaining stages skip it.
+
+    Args:
+        payloads: Items to process, in order.
+        stages: (name, function) pairs; a function may return `FINISHED`.
+        max_in_flight: Maximum items inside the pipeline at once.
+        cleanup: Called with each payload once it leaves the pipeline.
+
+    Returns:
+        One `PipelineItem` per payload, in input order.
+    """
+    slots = threading.Semaphore(max(max_in_flight, 1))
+    queues = [queue.Queue(maxsize=1) for _ in stages]
+    items: list[PipelineItem] = []
+
+    def release(item: PipelineItem) -> None:
+        try:
+            if cleanup:
+                cleanup(item.payload)
+        except Exception as e:
+            log.warning(f"Cleanup failed for [{item.payload}]: {e}")
+        finally:
+            slots.release()
+
+    def worker(i: int, name: str, func: Callable[[Any], Any]) -> None:
+        inbox = queues[i]
+        outbox = queues[i + 1] if i + 1 < len(stages) else None
+
+        while True:
+            item = inbox.get()
+            if item is _END:
+                if outbox:
+                    outbox.put(_END)
+                return
+
+            if item.ok and not item.finished:
+                start = time.monotonic()
+                try:
+                    if func(item.payload) is FINISHED:
+                        item.finished = True
+                except Exception as e:
+                    item.error = e
+                    log.error(f"Stage [{name}] failed for [{item.payload}]: {e}", exc_info=True)
+                item.timings[name] = time.monotonic() - start
+
+            if outbox:
+                outbox.put(item)
+            else:
+                release(item)
+
+    threads = [
+        threading.Thread(target=worker, args=(i, name, func), name=f"pipeline-{name}", daemon=True)
+        for i, (name, func) in enumerate(stages)
+    ]
+    for t in threads:
+        t.start()
+
+    try:
+        for payload in payloads:
+            slots.acquire()
+            item = PipelineItem(payload)
+            items.append(item)
+            queues[0].put(item)
+    finally:
+        queues[0].put(_END)
+        for t in threads:
+            t.join()
+
+    return items
+
+
+def stage_totals(items: list[PipelineItem]) -> dict[str, float]:
+    """
+    Sum the time spent in each stage across items.
+    """
+    totals: dict[str, float] = {}
+    for item in items:
+        for name, seconds in item.timings.items():
+            totals[name] = totals.get(name, 0.0) + seconds
+    return totals
@@ -0,0 +1,130 @@
+"""
+Platform selection.
+
+Limits which platforms of a manifest are downloaded, mirrored and published.
+Patterns are shell-style (`linux-*`); a platform is selected when it matches
+an include pattern (or there are none) and no exclude pattern. Everything is
+selected unless `configure()` or `CCR_PLATFORMS` / `CCR_SKIP_PLATFORMS` say
+otherwise.
+
+Saved manifests keep the platforms that were left out under
+`skippedPlatforms`, so a later run with a wider selection can add just those.
+"""
+
+from fnmatch import fnmatchcase
+
+from .config import PLATFORM_INCLUDE, PLATFORM_EXCLUDE
+
+SKIPPED_KEY = "skippedPlatforms"
+
+_include: tuple[str, ...] = PLATFORM_INCLUDE
+_exclude: tuple[str, ...] = PLATFORM_EXCLUDE
+
+
+def parse_patterns(value: str | None) -> tuple[str, ...] | None:
+    """
+    Split a comma-separated pattern list, e.g. `"linux-x64, linux-x64-musl"`.
+
+    Returns:
+        The patterns, or None if `value` is None (not given).
+    """
+    if value is None:
+        return None
+    return tuple(p.strip() for p in value.split(",") if p.strip())
+
+
+def add_platform_arguments(parser) -> None:
+    """
+    Add `--platforms` / `--skip-platforms` to an entry point's argument parser.
+    """
+    parser.add_argument("--platforms", default=None,
+                        help="Comma-separated platforms to sync, shell patterns allowed "
+                             "(default: $CCR_PLATFORMS, or all)")
+    parser.add_argument("--skip-platforms", default=None,
+                        help="Comma-separated platforms to leave out (default: $CCR_SKIP_PLATFORMS)")
+
+
+def configure(include: tuple[str, ...] | None = None, exclude: tuple[str, ...] | None = None) -> None:
+    """
+    Set the selection (None keeps the configured default for that side).
+    """
+    global _include, _exclude
+    if include is not None:
+        _include = include
+    if exclude is not None:
+        _exclude = exclude
+
+
+def is_filtered() -> bool:
+    """
+    Return True if some platforms may be left out.
+    """
+    return bool(_include or _exclude)
+
+
+def describe() -> str:
+    parts = []
+    if _include:
+        parts.append(f"include {list(_include)}")
+    if _exclude:
+        parts.append(f"exclude {list(_exclude)}")
+    return ", ".join(parts) or "all platforms"
+
+
+def selected(platform: str) -> bool:
+    """
+    Return True if `platform` is part of the selection.
+    """
+    if _include and not any(fnmatchcase(platform, p) for p in _include):
+        return False
+    return not any(fnmatchcase(platform, p) for p in _exclude)
+
+
+def select(manifest: dict) -> dict:
+    """
+    Return a copy of a manifest holding only the selected platforms.
+
+    Left-out platforms move to `skippedPlatforms` (merged with any already
+    there), keeping their checksums and sizes. Previously skipped platforms
+    that are now selected move back to `platforms`.
+    """
+    everything = {**manifest.get("platforms", {})}
+    for platform, info in manifest.get(SKIPPED_KEY, {}).items():
+        everything.setdefault(platform, info)
+    if not everything:
+        return manifest
+
+    kept = {p: info for p, info in everything.items() if selected(p)}
+    skipped = {p: info for p, info in everything.items() if not selected(p)}
+
+    result = {k: v for k, v in manifest.items() if k != SKIPPED_KEY}
+    result["platforms"] = kept
+    if skipped:
+        result[SKIPPED_KEY] = skipped
+    return result
+
+
+def restore(saved_manifest: dict, names: list[str]) -> dict:
+    """
+    Return a copy of a saved manifest with `names` moved from `skippedPlatforms` back to `platforms`.
+    """
+    skipped = dict(saved_manifest.get(SKIPPED_KEY, {}))
+    kept = dict(saved_manifest.get("platforms", {}))
+    for name in names:
+        if name in skipped:
+            kept[name] = skipped.pop(name)
+
+    result = {k: v for k, v in saved_manifest.items() if k != SKIPPED_KEY}
+    result["platforms"] = dict(sorted(kept.items()))
+    if skipped:
+        result[SKIPPED_KEY] = skipped
+    return result
+
+
+def newly_selected(saved_manifest: dict | None) -> list[str]:
+    """
+    Return platforms a saved manifest skipped that the current selection includes.
+    """
+    if not saved_manifest:
+        return []
+    return sorted(p for p in saved_manifest.get(SKIPPED_KEY, {}) if selected(p))
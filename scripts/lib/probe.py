@@ -0,0 +1,180 @@
+"""
+Cheap no-change probe for update checks.
+
+An update check only depends on the upstream CHANGELOG and the synced
+versions. After a full check finds nothing pending, the CHANGELOG's
+validators and a fingerprint of `version.json` (plus its journal) are stored;
+the next check sends one conditional HEAD request and, if neither input
+changed, reports "no updates" without importing `requests` or `packaging`.
+
+Standard library only, so it also runs before dependencies are installed.
+The request goes through `http.client` directly: `urllib.request` would
+import a good part of the standard library that a single HEAD never uses.
+"""
+
+import os
+import json
+import hashlib
+import logging
+import http.client
+from urllib.parse import urlsplit
+
+from .config import (
+    CHANGELOG_URL,
+    HTTP_CACHE_DIR,
+    MIN_VERSION,
+    PROBE_STATE_FILE,
+    PROBE_TIMEOUT,
+    VERSION_FILE,
+    VERSION_JOURNAL_FILE,
+)
+
+log = logging.getLogger(__name__)
+
+
+def _state_path() -> str | None:
+    return os.path.join(HTTP_CACHE_DIR, PROBE_STATE_FILE) if HTTP_CACHE_DIR else None
+
+
+def synced_fingerprint() -> str:
+    """
+    Hash the inputs of a check besides the CHANGELOG: the synced versions and the version floor.
+    """
+    sha256 = hashlib.sha256(MIN_VERSION.encode("utf-8"))
+    for name in (VERSION_FILE, VERSION_JOURNAL_FILE):
+        sha256.update(b"\0")
+        try:
+            with open(name, "rb") as f:
+                sha256.update(f.read())
+        except FileNotFoundError:
+            pass
+    return sha256.hexdigest()
+
+
+def changelog_validators(stored: dict | None = None) -> tuple[bool, dict | None]:
+    """
+    Send a HEAD request for the CHANGELOG, conditional on `stored` validators.
+
+    Returns:
+        (unchanged, validators): `unchanged` is True if the server confirmed the
+        stored validators; `validators` are the current ones (None on errors).
+    """
+    headers = {}
+    if stored:
+        if stored.get("etag"):
+            headers["If-None-Match"] = stored["etag"]
+        if stored.get("lastModified"):
+            headers["If-Modified-Since"] = stored["lastModified"]
+
+    url = urlsplit(CHANGELOG_URL)
+    connection_class = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+    connection = connection_class(url.netloc, timeout=PROBE_TIMEOUT)
+    target = url.path + (f"?{url.query}" if url.query else "")
+    try:
+        connection.request("HEAD", target or "/", headers=headers)
+        resp = connection.getresponse()
+        status = resp.status
+        validators = {
+            "etag": resp.getheader("ETag"),
+            "lastModified": resp.getheader("Last-Modified"),
+        }
+    except (http.client.HTTPException, OSError) as e:
+        log.warning(f"CHANGELOG probe failed: {e}")
+        return False, None
+    finally:
+        connection.close()
+
+    if status == 304 and stored:
+        return True, stored
+    if status != 200:
+        # Redirects are not followed; the full check runs instead.
+        log.warning(f"CHANGELOG probe failed: HTTP [{status}]")
+        return False, None
+
+    if not (validators["etag"] or validators["lastModified"]):
+        return False, None
+    # Some servers ignore conditional headers on HEAD; compare the ETag ourselves.
+    unchanged = bool(stored and validators["etag"] and validators["etag"] == stored.get("etag"))
+    return unchanged, validators
+
+
+def check() -> tuple[bool, dict | None]:
+    """
+    Decide whether the last "no updates" result still holds.
+
+    Returns:
+        (unchanged, validators): pass `validators` to `record()` if the full
+        check that follows finds nothing pending.
+    """
+    path = _state_path()
+    stored = None
+    if path:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError, OSError):
+            stored = None
+
+    fingerprint = synced_fingerprint()
+    if stored and stored.get("synced") != fingerprint:
+        # Synced versions changed (e.g. a sync ran); the CHANGELOG answer is not reusable.
+        stored = None
+
+    unchanged, validators = changelog_validators(stored)
+    if validators:
+        validators = {**validators, "synced": fingerprint}
+    return unchanged, validators
+
+
+def _write_state(name: str, data: dict) -> None:
+    path = os.path.join(HTTP_CACHE_DIR, name)
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = os.path.join(os.path.dirname(path), f".{name}.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        log.warning(f"Failed to save probe state [{path}]: {e}")
+
+
+def record(validators: dict | None) -> None:
+    """
+    Remember that the CHANGELOG behind `validators` had no pending versions.
+    """
+    if not HTTP_CACHE_DIR or not validators:
+        return
+    _write_state(PROBE_STATE_FILE, validators)
+
+
+def hand_over(validators: dict | None) -> None:
+    """
+    Keep the validators of a probe that found changes for the full check that follows.
+
+    The workflow probes and checks in separate processes (`--probe-only`, then
+    `--no-probe`); without them the full check could not `record()` a "no
+    updates" result.
+    """
+    if not HTTP_CACHE_DIR or not validators:
+        return
+    _write_state(f"{PROBE_STATE_FILE}.pending", validators)
+
+
+def take_over() -> dict | None:
+    """
+    Return (and remove) the validators left by `hand_over()`, if still valid.
+
+    They are dropped when the synced versions changed since the probe.
+    """
+    if not HTTP_CACHE_DIR:
+        return None
+    path = os.path.join(HTTP_CACHE_DIR, f"{PROBE_STATE_FILE}.pending")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            validators = json.load(f)
+        os.unlink(path)
+    except (FileNotFoundError, json.JSONDecodeError, OSError):
+        return None
+    if validators.get("synced") != synced_fingerprint():
+        return None
+    return validators
@@ -0,0 +1,270 @@
+"""
+Opt-in run profiling.
+
+`session()` wraps an entry point and, when enabled, writes to a directory per run:
+
+    cpu.pstats      cProfile data merged over all threads (snakeviz, gprof2dot, flameprof;
+                    omitted where cProfile cannot run per thread, e.g. Python 3.12+)
+    cpu.txt         Top functions by cumulative time (omitted with cpu.pstats)
+    stacks.folded   Sampled stacks of all threads in collapsed format
+                    (flamegraph.pl, speedscope, inferno)
+    memory.json     tracemalloc peak/current and the largest allocation sites
+    trace.json      Wall-clock spans in Chrome trace format (chrome://tracing, Perfetto)
+
+Spans come from functions decorated with `@traced`; the decorator is a flag
+check when no session is active. The profilers are imported only when a
+session starts, so importing this module stays cheap for entry points.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import threading
+import functools
+from pathlib import Path
+from contextlib import contextmanager
+from datetime import datetime
+
+from .config import PROFILE_DIR, PROFILE_SAMPLE_INTERVAL
+
+log = logging.getLogger(__name__)
+
+_active = False
+_lock = threading.Lock()
+_spans: list[dict] = []
+_origin = 0.0
+
+
+def add_profile_arguments(parser) -> None:
+    """
+    Add `--profile` / `--profile-dir` to an entry point's argument parser.
+    """
+    parser.add_argument("--profile", action="store_true",
+                        help="Record CPU, memory and span profiles for this run")
+    parser.add_argument("--profile-dir", default=PROFILE_DIR,
+                        help=f"Parent directory for profile artifacts (default: {PROFILE_DIR})")
+
+
+def traced(func):
+    """
+    Record each call of `func` as a span while a profiling session is active.
+    """
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _active:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            end = time.perf_counter()
+            # Version-like positional arguments make spans of concurrent calls distinguishable.
+            label = next((a for a in args if isinstance(a, str) and a[:1].isdigit()), None)
+            with _lock:
+                _spans.append({
+                    "name": name,
+                    "ph": "X",
+                    "ts": round((start - _origin) * 1e6),
+                    "dur": round((end - start) * 1e6),
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                    "args": {"version": label} if label else {},
+                })
+    return wrapper
+
+
+class _StackSampler(threading.Thread):
+    """
+    Samples the stacks of every thread at a fixed interval into folded-stack counts.
+    """
+
+    def __init__(self, interval: float):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.interval = interval
+        self.counts: dict[str, int] = {}
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        me = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                key = ";".join(reversed(stack))
+                self.counts[key] = self.counts.get(key, 0) + 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+class _Profiler:
+    """
+    cProfile for the starting thread plus every thread started while it runs.
+
+    From Python 3.12 cProfile is built on `sys.monitoring`, which allows one
+    active profiler per process, so per-thread profiles fail with "Another
+    profiling tool is already active". cProfile is then left off and the run
+    relies on the stack sampler alone.
+    """
+
+    def __init__(self):
+        import cProfile
+
+        self._profile_class = cProfile.Profile
+        self.main = cProfile.Profile()
+        self.threads: list = []
+        self.enabled = False
+
+    def _start_thread(self, *args) -> None:
+        # Installed via threading.setprofile: runs first in each new thread,
+        # where it swaps itself for a per-thread cProfile.
+        profile = self._profile_class()
+        with _lock:
+            self.threads.append(profile)
+        profile.enable()
+
+    def start(self) -> None:
+        try:
+            self.main.enable()
+            # Fails on 3.12+ (or under a debugger/coverage tool) while another profile is active.
+            probe = self._profile_class()
+            probe.enable()
+            probe.disable()
+        except ValueError as e:
+            self.main.disable()
+            log.warning(f"cProfile unavailable per thread ({e}); profiling with the stack sampler only")
+            return
+        threading.setprofile(self._start_thread)
+        self.enabled = True
+
+    def stop(self) -> None:
+        if self.enabled:
+            self.main.disable()
+            threading.setprofile(None)
+
+    def stats(self) -> "pstats.Stats | None":
+        """
+        Merge the per-thread profiles, or return None if cProfile was not used.
+        """
+        if not self.enabled:
+            return None
+
+        import pstats
+
+        stats = pstats.Stats(self.main)
+        with _lock:
+            threads = list(self.threads)
+        for profile in threads:
+            try:
+                stats.add(profile)
+            except TypeError:
+                # A thread that never called into Python has no stats.
+                pass
+        return stats
+
+
+def _write_artifacts(out_dir: Path, stats: "pstats.Stats | None", sampler: _StackSampler,
+                     peak: int, current: int, snapshot: "tracemalloc.Snapshot", wall: float) -> None:
+    import io
+
+    if stats is not None:
+        stats.dump_stats(out_dir / "cpu.pstats")
+
+        text = io.StringIO()
+        stats.stream = text
+        stats.sort_stats("cumulative").print_stats(60)
+        (out_dir / "cpu.txt").write_text(text.getvalue(), encoding="utf-8")
+
+    with open(out_dir / "stacks.folded", "w", encoding="utf-8") as f:
+        for stack, count in sorted(sampler.counts.items()):
+            f.write(f"{stack} {count}\n")
+
+    top = snapshot.statistics("lineno")[:25]
+    memory = {
+        "peakBytes": peak,
+        "currentBytes": current,
+        "top": [
+            {"location": str(stat.traceback[0]), "bytes": stat.size, "count": stat.count}
+            for stat in top
+        ],
+    }
+    (out_dir / "memory.json").write_text(json.dumps(memory, indent=2), encoding="utf-8")
+
+    with _lock:
+        events = list(_spans)
+    trace = {
+        "traceEvents": events,
+        "displayTimeUnit": "ms",
+        "otherData": {"wallSeconds": round(wall, 3)},
+    }
+    (out_dir / "trace.json").write_text(json.dumps(trace), encoding="utf-8")
+
+
+@contextmanager
+def session(name: str, profile_dir: str | None):
+    """
+    Profile the enclosed block when `profile_dir` is set; otherwise do nothing.
+
+    Artifacts go to `{profile_dir}/{name}-{timestamp}/`. Failures while writing
+    them are logged, never raised, so profiling cannot change a run's outcome.
+
+    Args:
+        name: Entry point name, used in the directory name.
+        profile_dir: Parent directory, or None to disable profiling.
+    """
+    global _active, _origin
+
+    if not profile_dir:
+        yield None
+        return
+
+    import tracemalloc
+
+    out_dir = Path(profile_dir) / f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    log.info(f"Profiling enabled; artifacts go to [{out_dir}]")
+
+    with _lock:
+        _spans.clear()
+    _origin = time.perf_counter()
+    _active = True
+
+    tracemalloc.start()
+    sampler = _StackSampler(PROFILE_SAMPLE_INTERVAL)
+    sampler.start()
+    profiler = _Profiler()
+    profiler.start()
+    start = time.perf_counter()
+
+    try:
+        yield out_dir
+    finally:
+        wall = time.perf_counter() - start
+        profiler.stop()
+        sampler.stop()
+        _active = False
+        # Snapshot before building the stats so their allocations are not reported.
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        try:
+            _write_artifacts(out_dir, profiler.stats(), sampler, peak, current, snapshot, wall)
+            log.info(
+                f"Profile written to [{out_dir}]: wall [{wall:.1f}s], "
+                f"peak traced memory [{peak / 1024 / 1024:.1f}MB]"
+            )
+        except Exception as e:
+            log.warning(f"Failed to write profile artifacts to [{out_dir}]: {e}")
@@ -1,15 +1,75 @@
 """
 GitHub Release helpers.
 
-Uses the `gh` CLI to check for and create GitHub Releases.
+Uses the GitHub REST API (`lib.github`) to check for and create GitHub Releases.
+Falls back to the `gh` CLI when no API token is configured.
 """
 
+import time
+import threading
 import subprocess
 import logging
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from packaging.version import InvalidVersion
+
+from . import limits, metrics
+from .catalog import ReleaseCatalog
+from .config import UPLOAD_WORKERS, UPLOAD_RETRIES
+from .github import GitHubClient, GitHubError
+from .profiling import traced
+from .version import version_key
 
 log = logging.getLogger(__name__)
 
+_client: GitHubClient | None = None
+_catalog: ReleaseCatalog | None = None
+
+
+def _get_client() -> GitHubClient | None:
+    """
+    Return the shared API client, or None to use the `gh` CLI.
+    """
+    global _client
+    if _client is None:
+        _client = GitHubClient.from_env()
+    return _client
+
+
+@traced
+def load_catalog() -> ReleaseCatalog | None:
+    """
+    Snapshot all releases so existence checks are answered locally.
+
+    Returns:
+        The catalog, or None when only the `gh` CLI is available.
+    """
+    global _catalog
+    client = _get_client()
+    if client:
+        _catalog = ReleaseCatalog.load(client)
+    return _catalog
+
+
+def missing_assets(version: str, expected: dict[str, int | None]) -> list[str]:
+    """
+    Return the assets an existing release lacks or holds at the wrong size.
+
+    Requires a loaded catalog; without one nothing is reported missing.
+
+    Args:
+        version: Version string.
+        expected: Asset name -> expected size.
+
+    Returns:
+        Names of assets that need uploading.
+    """
+    if _catalog is None:
+        return []
+    return _catalog.missing_assets(f"v{version}", expected)
+
 
 def release_exists(version: str) -> bool:
     """
@@ -22,26 +82,217 @@ def release_exists(version: str) -> bool:
         True if the release already exists.
     """
     tag = f"v{version}"
-    result = subprocess.run(
-        ["gh", "release", "view", tag],
-        capture_output=True,
-        text=True
-    )
-    exists = result.returncode == 0
+
+    client = _get_client()
+    if _catalog is not None:
+        exists = _catalog.exists(tag)
+    elif client:
+        exists = client.get_release_by_tag(tag) is not None
+    else:
+        result = subprocess.run(
+            ["gh", "release", "view", tag],
+            capture_output=True,
+            text=True
+        )
+        exists = result.returncode == 0
 
     if exists:
         log.info(f"Release [{tag}] already exists")
     return exists
 
 
-def create_release(version: str, notes: str, files: list[Path]) -> None:
+def _create_release_gh(tag: str, notes: str, files: list[Path], target: str | None = None) -> None:
+    cmd = [
+        "gh", "release", "create", tag,
+        "--title", tag,
+        "--notes", notes,
+    ]
+    if target:
+        cmd += ["--target", target]
+
+    for f in files:
+        cmd.append(str(f))
+
+    result = subprocess.run(cmd, capture_output=True, text=True)
+
+    if result.returncode != 0:
+        log.error(f"Release creation failed: {result.stderr}")
+        raise RuntimeError(f"Release creation failed for [{tag}]: {result.stderr}")
+
+
+def _upload_one(
+    client: GitHubClient,
+    release: dict,
+    path: Path,
+    existing: dict[str, dict],
+    lock: threading.Lock
+) -> None:
+    """
+    Upload one asset with its own retries.
+
+    An asset already present with the same size is left alone; one with a
+    different size (or left half-created by a failed attempt) is replaced.
+    """
+    size = path.stat().st_size
+
+    for attempt in range(1, UPLOAD_RETRIES + 1):
+        with lock:
+            asset = existing.get(path.name)
+
+        if asset and asset.get("size") == size and asset.get("state", "uploaded") == "uploaded":
+            log.info(f"Asset [{path.name}] already uploaded with the same size; skipping")
+            return
+
+        try:
+            if asset:
+                client.delete_asset(asset["id"])
+
+            with limits.upload_slot():
+                start = time.monotonic()
+                uploaded = client.upload_asset(release, path)
+                elapsed = max(time.monotonic() - start, 1e-6)
+
+            with lock:
+                existing[path.name] = uploaded
+            metrics.record_asset(path.name, upload_bytes=size, upload_seconds=elapsed)
+            log.info(
+                f"Uploaded [{path.name}] ({size / 1024 / 1024:.1f}MB) in [{elapsed:.1f}s], "
+                f"[{size / 1024 / 1024 / elapsed:.1f}MB/s]"
+            )
+            return
+
+        # Connection resets and timeouts surface from requests (or as OSError
+        # while the body is streamed from disk), not as GitHubError.
+        except (GitHubError, requests.RequestException, OSError) as e:
+            if attempt == UPLOAD_RETRIES:
+                raise
+            metrics.record_asset(path.name, upload_retries=1)
+            delay = 2 ** attempt
+            log.warning(
+                f"Upload of [{path.name}] failed (attempt {attempt}/{UPLOAD_RETRIES}): {e}; "
+                f"retrying in [{delay}]s"
+            )
+            time.sleep(delay)
+
+            # A failed upload can leave a partial asset behind; look again before retrying.
+            try:
+                current = {a["name"]: a for a in client.list_assets(release)}
+            except (GitHubError, requests.RequestException):
+                current = None
+            if current is not None:
+                with lock:
+                    existing.clear()
+                    existing.update(current)
+
+
+def _upload_all(client: GitHubClient, release: dict, files: list[Path]) -> None:
+    """
+    Upload assets concurrently (`UPLOAD_WORKERS`), each retried on its own.
+
+    Raises:
+        GitHubError: If any asset still fails after its retries.
+    """
+    existing = {a["name"]: a for a in client.list_assets(release)}
+    lock = threading.Lock()
+    errors = []
+
+    with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as executor:
+        futures = {
+            executor.submit(_upload_one, client, release, f, existing, lock): f
+            for f in files
+        }
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                log.error(f"Asset [{futures[future].name}] upload failed: {e}")
+                errors.append(f"{futures[future].name}: {e}")
+
+    if errors:
+        raise GitHubError("Some asset uploads failed:\n" + "\n".join(errors))
+
+
+def _has_newer_release(tag: str) -> bool:
+    """
+    Return True if the catalog holds a published release newer than `tag`.
+
+    Versions can be published out of order (backfill, repairs); an older one
+    must not take over the "Latest" badge.
+    """
+    if _catalog is None:
+        return False
+    key = version_key(tag.removeprefix("v"))
+    for other in list(_catalog.releases):
+        try:
+            if _catalog.exists(other) and version_key(other.removeprefix("v")) > key:
+                return True
+        except InvalidVersion:
+            continue
+    return False
+
+
+def _reuse_draft(client: GitHubClient, tag: str, notes: str, target: str | None) -> dict | None:
+    """
+    Take over a draft left with the tag by an earlier run, deleting any others.
+
+    Its assets are kept; `_upload_all` skips those already uploaded at the same size.
+    """
+    if _catalog is None:
+        return None
+
+    release = None
+    for draft_id in _catalog.draft_ids(tag):
+        if release is None:
+            release = client.update_draft(draft_id, tag, notes, target)
+            if release is not None:
+                log.info(f"Reusing draft release [{tag}] (id [{draft_id}])")
+                continue
+        else:
+            log.info(f"Deleting extra draft release [{tag}] (id [{draft_id}])")
+            client.delete_release(draft_id)
+        _catalog.forget_draft(tag, draft_id)
+    return release
+
+
+def _create_release_api(client: GitHubClient, tag: str, notes: str, files: list[Path],
+                        target: str | None = None) -> None:
+    release = _reuse_draft(client, tag, notes, target)
+    if release is None:
+        release = client.create_release(tag, tag, notes, draft=True, target=target)
+
+    try:
+        _upload_all(client, release, files)
+        release = client.publish_release(release, make_latest=not _has_newer_release(tag))
+        if _catalog is not None:
+            _catalog.record(release)
+
+    # Whatever the failure, the draft must not outlive this attempt.
+    except Exception as e:
+        log.error(f"Release creation failed: {e}")
+        try:
+            client.delete_release(release["id"])
+            if _catalog is not None:
+                _catalog.forget_draft(tag, release["id"])
+        except (GitHubError, requests.RequestException) as cleanup_error:
+            log.warning(f"Failed to delete draft release [{tag}]: {cleanup_error}")
+        raise RuntimeError(f"Release creation failed for [{tag}]: {e}")
+
+
+@traced
+def create_release(version: str, notes: str, files: list[Path], target: str | None = None) -> None:
     """
     Create a GitHub Release and upload attachments.
 
+    With the API client, the release is created as a draft, the assets are
+    uploaded concurrently with per-asset retries, and only then is it
+    published, so a failed upload never leaves a visible release with
+    partial assets.
+
     Args:
         version: Version string.
         notes: Release notes (changelog excerpt).
         files: Files to upload.
+        target: Commit SHA to create the tag on (default: the default branch's HEAD).
 
     Raises:
         RuntimeError: If release creation fails.
@@ -49,22 +300,53 @@ def create_release(version: str, notes: str, files: list[Path]) -> None:
     tag = f"v{version}"
     log.info(f"Creating release [{tag}] with [{len(files)}] attachment(s)...")
 
-    cmd = [
-        "gh", "release", "create", tag,
-        "--title", tag,
-        "--notes", notes if notes else f"Release {version}",
-    ]
+    notes = notes if notes else f"Release {version}"
 
-    for f in files:
-        cmd.append(str(f))
+    client = _get_client()
+    if client:
+        _create_release_api(client, tag, notes, files, target)
+    else:
+        _create_release_gh(tag, notes, files, target)
 
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    log.info(f"Release [{tag}] created successfully")
 
-    if result.returncode != 0:
-        log.error(f"Release creation failed: {result.stderr}")
-        raise RuntimeError(f"Release creation failed for [{tag}]: {result.stderr}")
 
-    log.info(f"Release [{tag}] created successfully")
+@traced
+def upload_assets(version: str, files: list[Path]) -> None:
+    """
+    Upload files to an existing release, replacing same-named assets of a different size.
+
+    Args:
+        version: Version string.
+        files: Files to upload.
+
+    Raises:
+        RuntimeError: If the upload fails.
+    """
+    tag = f"v{version}"
+    log.info(f"Uploading [{len(files)}] asset(s) to existing release [{tag}]...")
+
+    client = _get_client()
+    if not client:
+        cmd = ["gh", "release", "upload", tag, "--clobber", *[str(f) for f in files]]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"Asset upload failed for [{tag}]: {result.stderr}")
+        return
+
+    try:
+        release = client.get_release_by_tag(tag)
+        if release is None:
+            raise GitHubError(f"Release [{tag}] not found")
+
+        _upload_all(client, release, files)
+
+        if _catalog is not None:
+            _catalog.record(client.get_release_by_tag(tag))
+    except GitHubError as e:
+        raise RuntimeError(f"Asset upload failed for [{tag}]: {e}")
+
+    log.info(f"Release [{tag}] repaired")
 
 
 def delete_release(version: str) -> bool:
@@ -78,6 +360,22 @@ def delete_release(version: str) -> bool:
         True if deletion succeeded.
     """
     tag = f"v{version}"
+
+    client = _get_client()
+    if client:
+        try:
+            release = client.get_release_by_tag(tag)
+            if release:
+                client.delete_release(release["id"])
+            client.delete_tag(tag)
+            if _catalog is not None:
+                _catalog.forget(tag)
+            log.info(f"Release [{tag}] deleted")
+            return True
+        except GitHubError as e:
+            log.warning(f"Failed to delete release [{tag}]: {e}")
+            return False
+
     result = subprocess.run(
         ["gh", "release", "delete", tag, "--yes", "--cleanup-tag"],
         capture_output=True,
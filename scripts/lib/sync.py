@@ -0,0 +1,286 @@
+"""
+Per-version sync stages.
+
+Splits syncing one version into fetch-manifest, download, deltas, mirror,
+persist, publish and record stages so versions can be run serially or through
+`pipeline.run_pipeline`.
+"""
+
+import time
+import shutil
+import logging
+import tempfile
+from pathlib import Path
+
+from . import metrics, mirror, platforms
+from .config import DELTA_ENABLED, COMPRESS_FORMATS
+from .delta import build_deltas
+from .compress import describe_variants
+from .fetcher import get_manifest
+from .downloader import download_version_files, asset_name
+from .changelog import extract_notes
+from .version import save_synced
+from .git_batch import GitBatch
+from .release import release_exists, create_release, missing_assets, upload_assets
+from .metadata import save_version_metadata, save_version_manifest, load_version_manifest
+from .pipeline import FINISHED
+
+log = logging.getLogger(__name__)
+
+FALLBACK_WARNING = (
+    "> **⚠️ Warning:** This release has no binary installers due to upstream manifest.json fetch failure.\n"
+    "> Please visit the [official repository](https://github.com/anthropics/claude-code) for downloads or wait for updates.\n\n"
+)
+
+
+class SyncJob:
+    """
+    State of one version as it moves through the sync stages.
+    """
+
+    def __init__(self, gcs_bucket: str, version: str, changelog_content: str, git_batch: GitBatch):
+        self.gcs_bucket = gcs_bucket
+        self.version = version
+        self.changelog_content = changelog_content
+        self.git_batch = git_batch
+
+        self.exists = False
+        self.repair = False
+        self.mirror_only = False
+        self.restored: list[str] = []
+        self.manifest: dict = {}
+        self.workdir: Path | None = None
+        self.files: list[Path] = []
+        self.notes = ""
+        self.commit: str | None = None
+
+    def __str__(self) -> str:
+        return self.version
+
+
+def fetch_manifest(job: SyncJob) -> None:
+    """
+    Check for an existing release and fetch the version's manifest.
+    """
+    log.info(f"========== Start syncing version [{job.version}] ==========")
+
+    if release_exists(job.version):
+        job.exists = True
+        _check_existing(job)
+        return
+
+    job.manifest = platforms.select(get_manifest(job.gcs_bucket, job.version))
+
+    if job.manifest.get("_fallback_mode", False):
+        log.info(
+            f"Version [{job.version}] entering fallback mode: "
+            f"manifest unavailable, will create release without binaries"
+        )
+    elif job.manifest.get(platforms.SKIPPED_KEY):
+        log.info(
+            f"Version [{job.version}]: syncing {sorted(job.manifest['platforms'])}, "
+            f"skipping {sorted(job.manifest[platforms.SKIPPED_KEY])} ({platforms.describe()})"
+        )
+
+
+def _check_existing(job: SyncJob) -> None:
+    """
+    Decide whether an existing release is complete or needs missing assets uploaded.
+    """
+    # The saved manifest answers without a request; upstream is only asked when
+    # there is none (or it was saved in fallback mode, without platforms).
+    saved = load_version_manifest(job.version)
+    if not saved or saved.get("_fallback_mode", False):
+        saved = get_manifest(job.gcs_bucket, job.version)
+
+    # Platforms outside the selection are not expected, so they are never "missing".
+    manifest = platforms.select(saved)
+    selected = manifest.get("platforms", {})
+    expected = {asset_name(job.version, p): info.get("size") for p, info in selected.items()}
+
+    missing = missing_assets(job.version, expected) if expected else []
+    if not missing:
+        if expected and mirror.enabled() and not mirror.has_version(job.version):
+            log.info(f"Release for version [{job.version}] already exists; adding it to the mirror")
+            job.mirror_only = True
+            job.manifest = manifest
+            return
+        log.info(f"Release for version [{job.version}] already exists; skipping")
+        return
+
+    log.warning(f"Release for version [{job.version}] is missing asset(s) {missing}; repairing")
+    job.repair = True
+    job.manifest = {
+        **manifest,
+        "platforms": {
+            p: info for p, info in selected.items()
+            if asset_name(job.version, p) in missing
+        },
+    }
+    # Platforms an earlier, narrower run skipped: the saved manifest is updated once they are added.
+    job.restored = [
+        p for p in platforms.newly_selected(load_version_manifest(job.version))
+        if p in job.manifest["platforms"]
+    ]
+
+
+def download(job: SyncJob) -> None:
+    """
+    Download and verify the version's platform binaries into a temp directory,
+    with their compressed variants when `COMPRESS_FORMATS` is set.
+    """
+    if job.exists and not job.repair and not job.mirror_only:
+        return
+
+    job.workdir = Path(tempfile.mkdtemp(prefix=f"sync-{job.version}-"))
+
+    # Repairs only upload missing binaries; variants come with new releases.
+    variants = () if job.exists else COMPRESS_FORMATS
+    job.files = download_version_files(
+        job.gcs_bucket, job.version, job.manifest, job.workdir, variants
+    )
+    if not variants or not job.files:
+        return
+
+    compressed = {}
+    for platform in job.manifest.get("platforms", {}):
+        records = describe_variants(job.workdir / asset_name(job.version, platform), variants)
+        if records:
+            compressed[platform] = records
+            job.files = job.files + [job.workdir / r["asset"] for r in records.values()]
+    if compressed:
+        job.manifest = {**job.manifest, "compressed": compressed}
+
+
+def deltas(job: SyncJob) -> None:
+    """
+    Build delta assets against the previous synced version (when enabled).
+
+    The deltas are published with the release and recorded under `deltas` in
+    the saved manifest.
+    """
+    if not DELTA_ENABLED or job.exists or not job.files:
+        return
+
+    built = build_deltas(job.gcs_bucket, job.version, job.manifest, job.workdir)
+    if built:
+        job.manifest = {**job.manifest, "deltas": built}
+        job.files = job.files + [job.workdir / d["asset"] for d in built.values()]
+
+
+def mirror_version(job: SyncJob) -> None:
+    """
+    Add the version to the local mirror (when one is configured).
+
+    Repairs are skipped: they only download the missing binaries, and the
+    version was mirrored when it was first synced.
+    """
+    if not mirror.enabled() or job.repair or not job.files:
+        return
+
+    mirror.write_version(job.version, job.manifest, job.workdir)
+
+
+def _record_restored(job: SyncJob) -> None:
+    """
+    Move platforms added by a repair from `skippedPlatforms` to `platforms`
+    in the saved manifest.
+    """
+    saved = load_version_manifest(job.version)
+    if not saved:
+        return
+    manifest = platforms.restore(saved, job.restored)
+    save_version_manifest(job.version, manifest)
+    log.info(f"Version [{job.version}]: recorded previously skipped platform(s) {job.restored}")
+
+
+def persist(job: SyncJob) -> None:
+    """
+    Write `releases/{version}/` for a new release and push it, so the release
+    tag can be created on a commit that contains it.
+    """
+    if job.exists:
+        return
+
+    notes = extract_notes(job.changelog_content, job.version)
+
+    # Add warning to Release notes in fallback mode
+    if job.manifest.get("_fallback_mode", False):
+        notes = FALLBACK_WARNING + notes
+    job.notes = notes
+
+    # Save version metadata to releases/{version}/
+    try:
+        save_version_metadata(job.version, notes, job.manifest)
+    except (IOError, OSError) as e:
+        log.error(f"Failed to save metadata for version [{job.version}]: {e}")
+        raise  # Terminate flow on failure
+
+    job.commit = job.git_batch.push_release(job.version)
+
+
+def publish(job: SyncJob) -> None:
+    """
+    Create the GitHub Release with the downloaded binaries (or upload the missing ones).
+    """
+    if job.exists and not job.repair:
+        return
+
+    if job.repair:
+        upload_assets(job.version, job.files)
+    else:
+        create_release(job.version, job.notes, job.files, target=job.commit)
+
+
+def record(job: SyncJob) -> None:
+    """
+    Record the version as synced and queue `version.json` for git.
+
+    Runs after `publish`, so a version whose release failed is retried by the
+    next run instead of being recorded.
+    """
+    if job.restored:
+        _record_restored(job)
+
+    save_synced(job.version)
+    job.git_batch.add(job.version)
+
+    if not job.exists or job.repair:
+        log.info(f"========== Version [{job.version}] synced successfully ==========")
+
+
+def cleanup(job: SyncJob) -> None:
+    """
+    Remove the job's temporary download directory.
+    """
+    if job.workdir:
+        shutil.rmtree(job.workdir, ignore_errors=True)
+        job.workdir = None
+
+
+STAGES = [
+    ("fetch-manifest", fetch_manifest),
+    ("download", download),
+    ("deltas", deltas),
+    ("mirror", mirror_version),
+    ("persist", persist),
+    ("publish", publish),
+    ("record", record),
+]
+
+
+def run_stages(job: SyncJob) -> None:
+    """
+    Run every stage for one job on the calling thread, recording stage times.
+
+    Raises:
+        Exception: Whatever the failing stage raised.
+    """
+    for name, stage in STAGES:
+        start = time.monotonic()
+        try:
+            result = stage(job)
+        finally:
+            metrics.record_stage(job.version, name, time.monotonic() - start)
+        if result is FINISHED:
+            break
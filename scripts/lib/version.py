@@ -4,73 +4,277 @@ Version index management.
 Loads, updates, and compares versions using `packaging.version`.
 """
 
+import os
 import json
 import logging
+import threading
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
+from typing import Iterable, Iterator
 
 from packaging.version import Version
 
-from .config import MIN_VERSION, VERSION_FILE
+from .config import (
+    MIN_VERSION,
+    VERSION_FILE,
+    VERSION_JOURNAL_FILE,
+    VERSION_JOURNAL_COMPACT_EVERY,
+)
 
 log = logging.getLogger(__name__)
 
+# Serializes journal appends and compaction between threads of one process.
+_journal_lock = threading.RLock()
+# Records in the journal, seeded from the file on the first append (guarded by `_journal_lock`).
+_journal_count: int | None = None
 
-def load_synced() -> list[str]:
+
+@lru_cache(maxsize=None)
+def version_key(version: str) -> Version:
     """
-    Load the synced version list from `version.json`.
+    Parse a version string once; repeated lookups return the cached sort key.
+    """
+    return Version(version)
+
+
+class VersionIndex:
+    """
+    Sorted set of version strings backed by pre-parsed sort keys.
+
+    Versions are kept oldest to newest in a list parallel to their keys, so
+    inserts and range queries use binary search and membership uses a set.
+    """
+
+    def __init__(self, versions: Iterable[str] = ()):
+        self._members = set(versions)
+        self._versions = sorted(self._members, key=version_key)
+        self._keys = [version_key(v) for v in self._versions]
+
+    def __len__(self) -> int:
+        return len(self._versions)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._versions)
+
+    def __contains__(self, version: str) -> bool:
+        return version in self._members
+
+    def add(self, version: str) -> bool:
+        """
+        Insert a version in order.
+
+        Returns:
+            True if the version was added, False if it was already present.
+        """
+        if version in self._members:
+            return False
+
+        key = version_key(version)
+        i = bisect_right(self._keys, key)
+        self._keys.insert(i, key)
+        self._versions.insert(i, version)
+        self._members.add(version)
+        return True
+
+    def newest(self) -> str:
+        """
+        Return the newest version, or an empty string if the index is empty.
+        """
+        return self._versions[-1] if self._versions else ""
+
+    def descending(self) -> list[str]:
+        """
+        Return all versions sorted newest to oldest.
+        """
+        return self._versions[::-1]
+
+    def range(self, min_version: str | None = None, max_version: str | None = None) -> list[str]:
+        """
+        Return versions within `[min_version, max_version]`, sorted oldest to newest.
+        """
+        lo = bisect_left(self._keys, version_key(min_version)) if min_version else 0
+        hi = bisect_right(self._keys, version_key(max_version)) if max_version else len(self._keys)
+        return self._versions[lo:hi]
+
+    def missing_from(self, upstream: Iterable[str], min_version: str | None = None) -> list[str]:
+        """
+        Return upstream versions not in the index (>= `min_version`), sorted oldest to newest.
+        """
+        pending = VersionIndex(v for v in upstream if v not in self._members)
+        return pending.range(min_version)
+
+
+def _read_journal() -> list[dict]:
+    """
+    Read journal records, skipping torn lines left by interrupted appends.
+    """
+    journal_path = Path(VERSION_JOURNAL_FILE)
+    if not journal_path.exists():
+        return []
+
+    records = []
+    with open(journal_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                log.warning(f"Ignoring incomplete record in [{VERSION_JOURNAL_FILE}]: {line.strip()!r}")
+    return records
+
+
+def _read_snapshot() -> tuple[dict, list[dict]]:
+    """
+    Read `version.json` plus any journal records not yet compacted into it.
+
+    The journal is read first: compaction replaces `version.json` before removing
+    the journal, so every record is seen in at least one of the two.
 
     Returns:
-        Synced versions (empty if the file does not exist).
+        The `version.json` data and the pending journal records.
+
+    Raises:
+        RuntimeError: If `version.json` exists but cannot be parsed.
     """
+    records = _read_journal()
     version_path = Path(VERSION_FILE)
 
     if not version_path.exists():
-        log.info(f"Version index file [{VERSION_FILE}] does not exist; returning empty list")
-        return []
+        return {"synced": []}, records
 
     try:
         with open(version_path, "r", encoding="utf-8") as f:
             data = json.load(f)
-        synced = data.get("synced", [])
-        log.info(f"Loaded [{len(synced)}] synced version(s)")
-        return synced
     except (json.JSONDecodeError, IOError) as e:
-        log.error(f"Failed to read version index: {e}")
-        return []
+        # Refuse to treat a damaged index as empty; that would re-sync every version.
+        raise RuntimeError(f"Failed to read version index [{VERSION_FILE}]: {e}")
+
+    return data, records
+
+
+def load_index() -> VersionIndex:
+    """
+    Load the synced versions from `version.json` and its journal into a `VersionIndex`.
+
+    Returns:
+        Index of synced versions (empty if neither file exists).
+
+    Raises:
+        RuntimeError: If `version.json` is unreadable.
+    """
+    data, records = _read_snapshot()
+
+    index = VersionIndex(data.get("synced", []))
+    for record in records:
+        index.add(record["version"])
+
+    log.info(f"Loaded [{len(index)}] synced version(s)")
+    return index
+
+
+def load_synced() -> list[str]:
+    """
+    Load the synced version list from `version.json`.
+
+    Returns:
+        Synced versions, newest to oldest (empty if the file does not exist).
+    """
+    return load_index().descending()
 
 
 def save_synced(version: str) -> None:
     """
-    Add a version to `version.json` and update metadata.
+    Record a newly synced version.
 
-    The list is kept sorted by version (newest to oldest), and `latestSynced`
-    is set to the newest version.
+    The version is appended to the journal and fsynced; `version.json` itself is
+    only rewritten when the journal is compacted (every
+    `VERSION_JOURNAL_COMPACT_EVERY` records, or by `flush_synced`).
 
     Args:
         version: Newly synced version string.
     """
-    version_path = Path(VERSION_FILE)
+    with _journal_lock:
+        _append_journal(version)
 
-    if version_path.exists():
-        with open(version_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-    else:
-        data = {"synced": []}
 
-    synced = data.get("synced", [])
-    if version not in synced:
-        synced.append(version)
-        synced.sort(key=lambda v: Version(v), reverse=True)
+def _append_journal(version: str) -> None:
+    global _journal_count
+
+    if _journal_count is None:
+        _journal_count = len(_read_journal())
+
+    record = {"version": version, "time": datetime.now(timezone.utc).isoformat()}
+    line = json.dumps(record) + "\n"
+
+    journal_path = Path(VERSION_JOURNAL_FILE)
+    if journal_path.exists() and journal_path.stat().st_size:
+        with open(journal_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                # Start a fresh line after a torn record.
+                line = "\n" + line
+
+    with open(journal_path, "a", encoding="utf-8") as f:
+        f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+
+    _journal_count += 1
+    log.info(f"Version [{version}] appended to journal [{VERSION_JOURNAL_FILE}]")
+
+    # Counted in-process: re-reading the journal after every append is quadratic in its length.
+    if _journal_count >= VERSION_JOURNAL_COMPACT_EVERY:
+        flush_synced()
+
+
+def flush_synced() -> None:
+    """
+    Compact the journal into `version.json`.
+
+    The new index is written to a temporary file and atomically renamed over
+    `version.json`, so readers always see either the old or the new snapshot.
+    The list is kept sorted by version (newest to oldest), and `latestSynced`
+    is set to the newest version.
+    """
+    with _journal_lock:
+        _compact()
+
+
+def _compact() -> None:
+    global _journal_count
+
+    data, records = _read_snapshot()
+    if not records:
+        _journal_count = 0
+        return
+
+    index = VersionIndex(data.get("synced", []))
+    for record in records:
+        index.add(record["version"])
+    synced = index.descending()
 
     data["synced"] = synced
-    data["lastRun"] = datetime.now(timezone.utc).isoformat()
-    data["latestSynced"] = synced[0] if synced else ""
+    data["lastRun"] = records[-1].get("time") or datetime.now(timezone.utc).isoformat()
+    data["latestSynced"] = index.newest()
 
-    with open(version_path, "w", encoding="utf-8") as f:
+    version_path = Path(VERSION_FILE)
+    tmp_path = version_path.with_name(f".{version_path.name}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, version_path)
+
+    Path(VERSION_JOURNAL_FILE).unlink(missing_ok=True)
+    _journal_count = 0
 
-    log.info(f"Version [{version}] added to index; total versions [{len(synced)}]")
+    log.info(
+        f"Compacted [{len(records)}] journal record(s) into [{VERSION_FILE}]; "
+        f"total versions [{len(synced)}]"
+    )
 
 
 def get_pending(all_versions: list[str], synced: list[str]) -> list[str]:
@@ -84,15 +288,7 @@ def get_pending(all_versions: list[str], synced: list[str]) -> list[str]:
     Returns:
         Pending versions (>= MIN_VERSION), sorted oldest to newest.
     """
-    synced_set = set(synced)
-    min_ver = Version(MIN_VERSION)
-
-    pending = [
-        v for v in all_versions
-        if v not in synced_set and Version(v) >= min_ver
-    ]
-
-    pending.sort(key=lambda v: Version(v))
+    pending = VersionIndex(synced).missing_from(all_versions, MIN_VERSION)
 
     log.info(
         f"All versions [{len(all_versions)}], "
@@ -114,8 +310,8 @@ def compare(v1: str, v2: str) -> int:
     Returns:
         -1 if v1 < v2, 0 if v1 == v2, 1 if v1 > v2.
     """
-    ver1 = Version(v1)
-    ver2 = Version(v2)
+    ver1 = version_key(v1)
+    ver2 = version_key(v2)
 
     if ver1 < ver2:
         return -1
@@ -0,0 +1,242 @@
+"""
+Static server for a local download mirror.
+
+Serves the directory written by `sync_release.py --mirror-dir` so installs can
+use an internal download base URL:
+
+    python scripts/mirror_server.py --root /srv/claude-mirror --port 8080
+
+Supports HEAD, single byte ranges (`Range` / `If-Range`) and conditional
+requests (`If-None-Match` / `If-Modified-Since`). Bodies are sent with
+`sendfile`, and every connection gets its own thread with HTTP/1.1 keep-alive.
+"""
+
+import os
+import sys
+import hashlib
+import logging
+import argparse
+import mimetypes
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from lib.config import MIRROR_DIR, MIRROR_PORT
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S"
+)
+log = logging.getLogger(__name__)
+
+# `latest` changes over time; files under a version directory never do.
+MUTABLE_FILES = {"latest"}
+
+# Files up to this size get a content hash as their ETag.
+HASHED_ETAG_MAX_SIZE = 1024 * 1024
+
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """
+    Parse a single `bytes=` range against a file size.
+
+    Returns:
+        (start, end) inclusive, or None if the header is not a single byte range.
+
+    Raises:
+        ValueError: If the range cannot be satisfied.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    first, _, last = spec.strip().partition("-")
+    try:
+        if not first:
+            # Suffix range: the last N bytes.
+            length = int(last)
+        else:
+            start = int(first)
+            end = int(last) if last else size - 1
+    except ValueError:
+        return None
+
+    if not first:
+        if length <= 0 or size == 0:
+            raise ValueError(f"range [{header}] selects no bytes of [{size}]")
+        return max(size - length, 0), size - 1
+    if start >= size or end < start:
+        raise ValueError(f"range [{header}] outside [0, {size})")
+    return start, min(end, size - 1)
+
+
+def entity_tag(path: Path, st: os.stat_result) -> str:
+    """
+    Return the ETag of a mirror file.
+
+    Files are replaced by rename and the filesystem may hand a new file the
+    inode of the one it replaced, so small files (`latest`, manifests) are tagged
+    by content and binaries by inode, modification time and size.
+    """
+    if st.st_size <= HASHED_ETAG_MAX_SIZE:
+        with open(path, "rb") as f:
+            return f'"{hashlib.sha256(f.read()).hexdigest()[:32]}"'
+    return f'"{st.st_ino:x}-{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+
+class MirrorHandler(BaseHTTPRequestHandler):
+    """
+    Serves files below `server.root`; directories and paths outside it are 404.
+    """
+
+    protocol_version = "HTTP/1.1"
+    server_version = "ccr-mirror"
+
+    def do_GET(self) -> None:
+        self._serve(send_body=True)
+
+    def do_HEAD(self) -> None:
+        self._serve(send_body=False)
+
+    def _resolve(self) -> Path | None:
+        root = self.server.root
+        relative = unquote(urlsplit(self.path).path).lstrip("/")
+        path = (root / relative).resolve()
+        if path != root and root not in path.parents:
+            return None
+        return path if path.is_file() else None
+
+    def _not_modified(self, etag: str, mtime: float) -> bool:
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            tags = [t.strip() for t in if_none_match.split(",")]
+            return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _serve(self, send_body: bool) -> None:
+        path = self._resolve()
+        if path is None:
+            self.send_error(404)
+            return
+
+        st = path.stat()
+        etag = entity_tag(path, st)
+        last_modified = formatdate(st.st_mtime, usegmt=True)
+
+        def common_headers() -> None:
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", last_modified)
+            self.send_header("Accept-Ranges", "bytes")
+            if path.name in MUTABLE_FILES:
+                self.send_header("Cache-Control", "no-cache")
+            else:
+                self.send_header("Cache-Control", "public, max-age=31536000, immutable")
+
+        if self._not_modified(etag, st.st_mtime):
+            self.send_response(304)
+            common_headers()
+            self.end_headers()
+            return
+
+        size = st.st_size
+        start, end = 0, size - 1
+        status = 200
+
+        range_header = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        if range_header and (not if_range or if_range in (etag, last_modified)):
+            try:
+                byte_range = parse_range(range_header, size)
+            except ValueError:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                common_headers()
+                self.end_headers()
+                return
+            if byte_range:
+                start, end = byte_range
+                status = 206
+
+        length = end - start + 1 if size else 0
+        self.send_response(status)
+        self.send_header("Content-Type", mimetypes.guess_type(path.name)[0] or "application/octet-stream")
+        self.send_header("Content-Length", str(length))
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        common_headers()
+        self.end_headers()
+
+        if not send_body or not length:
+            return
+        try:
+            with open(path, "rb") as f:
+                self.connection.sendfile(f, start, length)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.access_log:
+            log.info(f"{self.address_string()} {format % args}")
+
+
+class MirrorServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, address: tuple[str, int], root: Path, access_log: bool = False):
+        self.root = root.resolve()
+        self.access_log = access_log
+        super().__init__(address, MirrorHandler)
+
+
+def main(args: argparse.Namespace) -> int:
+    """
+    Main entry point.
+
+    Returns:
+        0 on a clean shutdown, 1 if the server cannot start.
+    """
+    root = Path(args.root)
+    if not root.is_dir():
+        log.error(f"Mirror directory [{root}] does not exist")
+        return 1
+
+    try:
+        server = MirrorServer((args.host, args.port), root, args.access_log)
+    except OSError as e:
+        log.error(f"Cannot listen on [{args.host}:{args.port}]: {e}")
+        return 1
+
+    host, port = server.server_address[:2]
+    log.info(f"Serving mirror [{server.root}] on [http://{host}:{port}]")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a local Claude Code download mirror.")
+    parser.add_argument("--root", default=MIRROR_DIR or None, required=not MIRROR_DIR,
+                        help="Mirror directory (default: $CCR_MIRROR_DIR)")
+    parser.add_argument("--host", default="0.0.0.0", help="Address to listen on (default: 0.0.0.0)")
+    parser.add_argument("--port", type=int, default=MIRROR_PORT, help=f"Port (default: {MIRROR_PORT})")
+    parser.add_argument("--access-log", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    sys.exit(main(args))
@@ -0,0 +1,108 @@
+"""
+Query the aggregated manifest index (`releases/index.json`).
+
+    python scripts/query_releases.py --checksum db75cb2c
+    python scripts/query_releases.py --latest --platform linux-arm64-musl
+    python scripts/query_releases.py --platform darwin-arm64 --from 2.0.0 --sizes
+    python scripts/query_releases.py --from 2.1.0 --to 2.1.10 --json
+
+Without a query option, lists the builds matching `--platform` / `--from` / `--to`.
+"""
+
+import os
+import sys
+import json
+import logging
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from lib import manifest_index
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S"
+)
+log = logging.getLogger(__name__)
+
+
+def size_trend(rows: list[dict]) -> list[dict]:
+    """
+    Add each build's size change from the previous version of the same platform.
+    """
+    previous: dict[str, int] = {}
+    trend = []
+    for row in rows:
+        last = previous.get(row["platform"])
+        change = row["size"] - last if last is not None and row["size"] is not None else None
+        trend.append({**row, "sizeChange": change})
+        if row["size"] is not None:
+            previous[row["platform"]] = row["size"]
+    return trend
+
+
+def print_rows(rows: list[dict], columns: list[str]) -> None:
+    for row in rows:
+        print("\t".join("" if row.get(c) is None else str(row[c]) for c in columns))
+
+
+def main(args: argparse.Namespace) -> int:
+    """
+    Main entry point.
+
+    Returns:
+        0 if anything matched, otherwise 1.
+    """
+    try:
+        index = manifest_index.rebuild() if args.rebuild else manifest_index.load()
+    except OSError as e:
+        log.error(f"Cannot read the manifest index: {e}")
+        return 1
+
+    if args.platforms:
+        for platform in index.platforms():
+            print(platform)
+        return 0
+
+    try:
+        if args.checksum:
+            rows = index.find_checksum(args.checksum)
+        elif args.latest:
+            row = index.latest(args.platform)
+            rows = [row] if row else []
+        else:
+            rows = index.builds(args.platform, args.first, args.last)
+    except ValueError as e:
+        log.error(f"Invalid query: {e}")
+        return 1
+
+    columns = ["version", "platform", "size", "checksum", "buildDate"]
+    if args.sizes:
+        rows = size_trend(rows)
+        columns = ["version", "platform", "size", "sizeChange"]
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print_rows(rows, columns)
+    return 0 if rows else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query synced release manifests.")
+    parser.add_argument("--checksum", help="SHA256 (or a prefix) to look up")
+    parser.add_argument("--platform", help="Only builds for this platform, e.g. linux-arm64-musl")
+    parser.add_argument("--from", dest="first", help="Oldest version to include")
+    parser.add_argument("--to", dest="last", help="Newest version to include")
+    parser.add_argument("--latest", action="store_true", help="Newest version with a build for --platform")
+    parser.add_argument("--sizes", action="store_true", help="Show size changes between versions")
+    parser.add_argument("--platforms", action="store_true", help="List the known platforms")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of tab-separated rows")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the index from releases/*/manifest.json first")
+    args = parser.parse_args()
+
+    if args.latest and not args.platform:
+        parser.error("--latest requires --platform")
+
+    sys.exit(main(args))
@@ -0,0 +1,3 @@
+"""
+Local stand-ins for the services the sync scripts talk to, for offline testing.
+"""
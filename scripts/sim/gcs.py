@@ -0,0 +1,264 @@
+"""
+Static file server standing in for the upstream download bucket.
+
+Serves in-memory objects with ETag, HEAD and single byte-range support,
+which is what the downloader relies on. Latency, per-connection bandwidth
+caps, 5xx responses and connection resets can be injected.
+"""
+
+import time
+import random
+import hashlib
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Objects at least this large are eligible for injected connection resets.
+RESET_MIN_SIZE = 1024 * 1024
+
+
+class SyntheticBlob:
+    """
+    Deterministic pseudo-random content of any size, generated on the fly.
+
+    Only a small block derived from `seed` is held in memory; the content is
+    that block repeated, so distinct seeds give distinct checksums.
+    """
+
+    block_size = 64 * 1024
+
+    def __init__(self, size: int, seed: str):
+        self.size = size
+        self.seed = seed
+        digest = hashlib.sha256(seed.encode("utf-8")).digest()
+        self._block = b"".join(
+            hashlib.sha256(digest + i.to_bytes(4, "big")).digest()
+            for i in range(self.block_size // 32)
+        )
+        self._sha256: str | None = None
+
+    def __len__(self) -> int:
+        return self.size
+
+    def read(self, start: int, end: int, chunk_size: int):
+        """
+        Yield the bytes in `[start, end)` in chunks.
+        """
+        block = self._block
+        offset = start
+        while offset < end:
+            length = min(chunk_size, end - offset)
+            pos = offset % self.block_size
+            reps = (pos + length) // self.block_size + 1
+            yield (block * reps)[pos:pos + length] if reps > 1 else block[pos:pos + length]
+            offset += length
+
+    def sha256(self) -> str:
+        if self._sha256 is None:
+            sha256 = hashlib.sha256()
+            for chunk in self.read(0, self.size, 1024 * 1024):
+                sha256.update(chunk)
+            self._sha256 = sha256.hexdigest()
+        return self._sha256
+
+
+class FakeGCS:
+    """
+    In-memory object server.
+
+    Attributes:
+        url: Base URL of the running server.
+        objects: Path (without leading slash) -> bytes or `SyntheticBlob`.
+        bytes_sent: Total body bytes written to clients.
+        latency: Seconds added before every response.
+        bandwidth: Per-connection cap in bytes/second (None for unlimited).
+        error_rate: Probability of answering 503 instead of serving.
+        reset_rate: Probability of dropping a large object's connection mid-body.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, seed: int = 0):
+        self.objects: dict[str, bytes | SyntheticBlob] = {}
+        self.bytes_sent = 0
+        self.request_count = 0
+        self.errors_injected = 0
+        self.resets_injected = 0
+        self.latency = 0.0
+        self.bandwidth: float | None = None
+        self.error_rate = 0.0
+        self.reset_rate = 0.0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        self.server = ThreadingHTTPServer((host, port), _make_handler(self))
+        self.server.daemon_threads = True
+        self.server.request_queue_size = 128
+        self.url = f"http://{host}:{self.server.server_port}"
+
+    def put(self, path: str, data: bytes | str) -> str:
+        """
+        Store an object and return its URL.
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self.objects[path.lstrip("/")] = data
+        return f"{self.url}/{path.lstrip('/')}"
+
+    def put_synthetic(self, path: str, size: int, seed: str) -> tuple[str, str]:
+        """
+        Store a generated object and return its URL and SHA256.
+        """
+        blob = SyntheticBlob(size, seed)
+        self.objects[path.lstrip("/")] = blob
+        return f"{self.url}/{path.lstrip('/')}", blob.sha256()
+
+    def roll(self, rate: float) -> bool:
+        """
+        Return True with probability `rate` (thread-safe, seeded).
+        """
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < rate
+
+    def start(self) -> "FakeGCS":
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "FakeGCS":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def count(self, sent: int) -> None:
+        with self._lock:
+            self.bytes_sent += sent
+            self.request_count += 1
+
+
+def _parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """
+    Parse a single `bytes=start-end` range; None if absent or unsupported.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start, _, end = header[len("bytes="):].partition("-")
+    if not start:
+        length = int(end)
+        return max(size - length, 0), size - 1
+    return int(start), min(int(end), size - 1) if end else size - 1
+
+
+def _make_handler(gcs: FakeGCS):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        chunk_size = 256 * 1024
+
+        def log_message(self, *args):
+            pass
+
+        def do_HEAD(self):
+            self._serve(head=True)
+
+        def do_GET(self):
+            self._serve(head=False)
+
+        def _lookup(self) -> bytes | SyntheticBlob | None:
+            return gcs.objects.get(self.path.split("?", 1)[0].lstrip("/"))
+
+        def _etag(self, data: bytes | SyntheticBlob) -> str:
+            if isinstance(data, SyntheticBlob):
+                key = f"{data.seed}:{data.size}".encode("utf-8")
+            else:
+                key = data[:65536] + str(len(data)).encode("utf-8")
+            return '"' + hashlib.md5(key).hexdigest() + '"'
+
+        def _serve(self, head: bool) -> None:
+            if gcs.latency:
+                time.sleep(gcs.latency)
+
+            data = self._lookup()
+            if data is not None and gcs.roll(gcs.error_rate):
+                with gcs._lock:
+                    gcs.errors_injected += 1
+                self.send_response(503)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                gcs.count(0)
+                return
+
+            if data is None:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                gcs.count(0)
+                return
+
+            etag = self._etag(data)
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                gcs.count(0)
+                return
+
+            size = len(data)
+            byte_range = _parse_range(self.headers.get("Range", ""), size)
+            if_range = self.headers.get("If-Range")
+            if byte_range and if_range and if_range != etag:
+                byte_range = None
+
+            if byte_range and byte_range[0] >= size:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                gcs.count(0)
+                return
+
+            start, end = byte_range or (0, size - 1)
+            self.send_response(206 if byte_range else 200)
+            self.send_header("Content-Length", str(end - start + 1))
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("ETag", etag)
+            if byte_range:
+                self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+            self.end_headers()
+
+            if head:
+                gcs.count(0)
+                return
+
+            reset_at = None
+            if size >= RESET_MIN_SIZE and gcs.roll(gcs.reset_rate):
+                reset_at = start + (end - start) // 2
+                with gcs._lock:
+                    gcs.resets_injected += 1
+
+            sent = 0
+            try:
+                for chunk in self.body(data, start, end + 1):
+                    if reset_at is not None and start + sent + len(chunk) > reset_at:
+                        self.close_connection = True
+                        return
+                    self.wfile.write(chunk)
+                    sent += len(chunk)
+                    if gcs.bandwidth:
+                        time.sleep(len(chunk) / gcs.bandwidth)
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True
+            finally:
+                gcs.count(sent)
+
+        def body(self, data: bytes | SyntheticBlob, start: int, end: int):
+            if isinstance(data, SyntheticBlob):
+                yield from data.read(start, end, self.chunk_size)
+                return
+            view = memoryview(data)
+            for offset in range(start, end, self.chunk_size):
+                yield view[offset:min(offset + self.chunk_size, end)]
+
+    return Handler
@@ -0,0 +1,285 @@
+"""
+In-memory stand-in for the GitHub Releases REST API.
+
+Implements the subset of endpoints used by `lib.github.GitHubClient`, so the
+release flow can be exercised without network access:
+
+    python -c "from sim.github_api import FakeGitHub; FakeGitHub(port=8765).serve()"
+
+then run with `GITHUB_API_URL=http://127.0.0.1:8765 GITHUB_REPOSITORY=owner/repo GITHUB_TOKEN=x`.
+"""
+
+import re
+import json
+import time
+import random
+import hashlib
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs, unquote
+
+
+class FakeGitHub:
+    """
+    Fake Releases API server holding releases and asset metadata in memory.
+
+    Uploaded bytes are hashed and counted, not stored.
+
+    Attributes:
+        url: Base URL of the running server.
+        releases: Release id -> release object.
+        bytes_uploaded: Total asset bytes received.
+        latency: Seconds added before every response.
+        bandwidth: Upload cap in bytes/second per connection (None for unlimited).
+        upload_error_rate: Probability of failing an upload with a 502 after
+            reading its body, as the real upload host occasionally does.
+    """
+
+    def __init__(self, repo: str = "owner/repo", host: str = "127.0.0.1", port: int = 0, seed: int = 0):
+        self.repo = repo
+        self.releases: dict[int, dict] = {}
+        self.bytes_uploaded = 0
+        self.request_count = 0
+        self.errors_injected = 0
+        self.latency = 0.0
+        self.bandwidth: float | None = None
+        self.upload_error_rate = 0.0
+        self._random = random.Random(seed)
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+        self.server = ThreadingHTTPServer((host, port), _make_handler(self))
+        self.server.daemon_threads = True
+        self.url = f"http://{host}:{self.server.server_port}"
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> "FakeGitHub":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve(self) -> None:
+        self.server.serve_forever()
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "FakeGitHub":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def next_id(self) -> int:
+        with self._lock:
+            value = self._next_id
+            self._next_id += 1
+            return value
+
+    def published(self) -> dict[str, dict]:
+        """
+        Return published releases by tag.
+        """
+        return {r["tag_name"]: r for r in self.releases.values() if not r["draft"]}
+
+    def new_release(self, tag: str, name: str = "", body: str = "", draft: bool = False,
+                    target: str = "main") -> dict:
+        release_id = self.next_id()
+        release = {
+            "id": release_id,
+            "tag_name": tag,
+            "name": name or tag,
+            "body": body,
+            "draft": draft,
+            "target_commitish": target,
+            "upload_url": f"{self.url}/uploads/repos/{self.repo}/releases/{release_id}/assets{{?name,label}}",
+            "assets": [],
+        }
+        self.releases[release_id] = release
+        return release
+
+
+def _make_handler(gh: FakeGitHub):
+    repo = re.escape(gh.repo)
+    routes = [
+        ("GET", rf"/repos/{repo}/releases/tags/(?P<tag>[^/]+)", "get_by_tag"),
+        ("GET", rf"/repos/{repo}/releases", "list_releases"),
+        ("POST", rf"/repos/{repo}/releases", "create_release"),
+        ("PATCH", rf"/repos/{repo}/releases/(?P<id>\d+)", "update_release"),
+        ("DELETE", rf"/repos/{repo}/releases/(?P<id>\d+)", "delete_release"),
+        ("GET", rf"/repos/{repo}/releases/(?P<id>\d+)/assets", "list_assets"),
+        ("DELETE", rf"/repos/{repo}/releases/assets/(?P<id>\d+)", "delete_asset"),
+        ("DELETE", rf"/repos/{repo}/git/refs/tags/(?P<tag>[^/]+)", "delete_tag"),
+        ("POST", rf"/uploads/repos/{repo}/releases/(?P<id>\d+)/assets", "upload_asset"),
+    ]
+    routes = [(m, re.compile(p + "$"), name) for m, p, name in routes]
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status: int, payload=None, headers: dict | None = None) -> None:
+            body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _json_body(self) -> dict:
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length) or b"{}")
+
+        def _dispatch(self, method: str) -> None:
+            with gh._lock:
+                gh.request_count += 1
+            if gh.latency:
+                time.sleep(gh.latency)
+
+            parts = urlsplit(self.path)
+            if not self.headers.get("Authorization"):
+                self._send(401, {"message": "Requires authentication"})
+                return
+
+            for route_method, pattern, name in routes:
+                match = pattern.match(parts.path)
+                if route_method == method and match:
+                    params = {k: unquote(v) for k, v in match.groupdict().items()}
+                    getattr(self, name)(params, parse_qs(parts.query))
+                    return
+
+            self._send(404, {"message": "Not Found"})
+
+        def do_GET(self):
+            self._dispatch("GET")
+
+        def do_POST(self):
+            self._dispatch("POST")
+
+        def do_PATCH(self):
+            self._dispatch("PATCH")
+
+        def do_DELETE(self):
+            self._dispatch("DELETE")
+
+        def _release(self, params: dict) -> dict | None:
+            release = gh.releases.get(int(params["id"]))
+            if release is None:
+                self._send(404, {"message": "Not Found"})
+            return release
+
+        def get_by_tag(self, params, query):
+            release = gh.published().get(params["tag"])
+            if release is None:
+                self._send(404, {"message": "Not Found"})
+            else:
+                self._send(200, release)
+
+        def list_releases(self, params, query):
+            per_page = int(query.get("per_page", ["30"])[0])
+            page = int(query.get("page", ["1"])[0])
+            ordered = sorted(gh.releases.values(), key=lambda r: r["id"], reverse=True)
+            chunk = ordered[(page - 1) * per_page:page * per_page]
+
+            headers = {}
+            if page * per_page < len(ordered):
+                next_url = f"{gh.url}/repos/{gh.repo}/releases?per_page={per_page}&page={page + 1}"
+                headers["Link"] = f'<{next_url}>; rel="next"'
+            self._send(200, chunk, headers)
+
+        def create_release(self, params, query):
+            data = self._json_body()
+            tag = data.get("tag_name", "")
+            if not data.get("draft") and tag in gh.published():
+                self._send(422, {"message": "Validation Failed", "errors": [{"code": "already_exists"}]})
+                return
+            release = gh.new_release(tag, data.get("name", ""), data.get("body", ""), bool(data.get("draft")),
+                                     data.get("target_commitish", "main"))
+            self._send(201, release)
+
+        def update_release(self, params, query):
+            release = self._release(params)
+            if release is None:
+                return
+            data = self._json_body()
+            if data.get("draft") is False and release["tag_name"] in gh.published():
+                self._send(422, {"message": "Validation Failed", "errors": [{"code": "already_exists"}]})
+                return
+            for key in ("draft", "name", "body", "target_commitish"):
+                if key in data:
+                    release[key] = data[key]
+            self._send(200, release)
+
+        def delete_release(self, params, query):
+            if gh.releases.pop(int(params["id"]), None) is None:
+                self._send(404, {"message": "Not Found"})
+            else:
+                self._send(204)
+
+        def list_assets(self, params, query):
+            release = self._release(params)
+            if release is not None:
+                self._send(200, release["assets"])
+
+        def delete_asset(self, params, query):
+            asset_id = int(params["id"])
+            for release in gh.releases.values():
+                for asset in release["assets"]:
+                    if asset["id"] == asset_id:
+                        release["assets"].remove(asset)
+                        self._send(204)
+                        return
+            self._send(404, {"message": "Not Found"})
+
+        def delete_tag(self, params, query):
+            self._send(204)
+
+        def upload_asset(self, params, query):
+            release = self._release(params)
+            if release is None:
+                return
+
+            name = query.get("name", [""])[0]
+            remaining = int(self.headers.get("Content-Length") or 0)
+            sha256 = hashlib.sha256()
+            size = 0
+            while remaining:
+                chunk = self.rfile.read(min(remaining, 1024 * 1024))
+                if not chunk:
+                    break
+                sha256.update(chunk)
+                size += len(chunk)
+                remaining -= len(chunk)
+                if gh.bandwidth:
+                    time.sleep(len(chunk) / gh.bandwidth)
+
+            with gh._lock:
+                gh.bytes_uploaded += size
+                failed = gh.upload_error_rate > 0 and gh._random.random() < gh.upload_error_rate
+                if failed:
+                    gh.errors_injected += 1
+
+            if failed:
+                self._send(502, {"message": "Server Error"})
+                return
+
+            if any(a["name"] == name for a in release["assets"]):
+                self._send(422, {"message": "Validation Failed", "errors": [{"code": "already_exists"}]})
+                return
+
+            asset = {
+                "id": gh.next_id(),
+                "name": name,
+                "size": size,
+                "state": "uploaded",
+                "digest": f"sha256:{sha256.hexdigest()}",
+            }
+            release["assets"].append(asset)
+            self._send(201, asset)
+
+    return Handler
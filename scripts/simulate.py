@@ -0,0 +1,403 @@
+"""
+End-to-end sync simulation against local stand-ins.
+
+Starts a GCS-layout object server (`sim.gcs`), a fake GitHub Releases API
+(`sim.github_api`) and a bare git remote, then runs the real
+`check_update.py` / `sync_release.py` entry points against them as
+subprocesses, the way the workflows do:
+
+    python scripts/simulate.py --versions 20 --size 8M
+    python scripts/simulate.py --versions 10 --latency 0.05 --bandwidth 20M \\
+        --error-rate 0.02 --reset-rate 0.1 --corrupt 1 --output sim.json
+
+In `cron` mode (the default) runs repeat update check + sync until no versions
+are pending, which exercises `MAX_PER_RUN` batching; `direct` mode hands every
+version to a single sync run and `backfill` mode runs `backfill.py` once.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import hashlib
+import logging
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from lib.downloader import asset_name
+from sim.gcs import FakeGCS
+from sim.github_api import FakeGitHub
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S"
+)
+log = logging.getLogger(__name__)
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+REPO_ROOT = SCRIPTS_DIR.parent
+
+BUCKET = "claude-code-releases"
+PLATFORMS = [
+    "darwin-arm64", "darwin-x64", "linux-arm64", "linux-x64",
+    "linux-arm64-musl", "linux-x64-musl", "win32-x64", "win32-arm64",
+]
+
+
+def parse_size(value: str) -> int:
+    """
+    Parse a byte count with an optional K/M/G suffix (binary units).
+    """
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+    value = value.strip().upper().rstrip("B")
+    if value and value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+
+def make_versions(count: int) -> list[str]:
+    """
+    Synthetic version numbers, oldest first.
+    """
+    return [f"3.{i // 100}.{i % 100}" for i in range(count)]
+
+
+def populate(gcs: FakeGCS, versions: list[str], platforms: list[str], size: int,
+             corrupt: int, rng: random.Random) -> set[str]:
+    """
+    Publish an upstream layout on the object server.
+
+    Serves `install.sh`, `CHANGELOG.md` and, under the bucket, `latest`,
+    `{version}/manifest.json` and `{version}/{platform}/claude[.exe]`.
+    `corrupt` binaries get a wrong manifest checksum.
+
+    Returns:
+        Versions that contain a corrupted binary.
+    """
+    bucket_url = f"{gcs.url}/{BUCKET}"
+    gcs.put("install.sh", f'#!/bin/bash\nDOWNLOAD_BASE_URL="{bucket_url}"\n')
+    gcs.put(f"{BUCKET}/latest", versions[-1] + "\n")
+
+    changelog = ["# Changelog", ""]
+    for version in reversed(versions):
+        changelog += [f"## {version}", "", f"- Simulated change in {version}", ""]
+    gcs.put("CHANGELOG.md", "\n".join(changelog))
+
+    pairs = [(v, p) for v in versions for p in platforms]
+    corrupted = set(rng.sample(pairs, min(corrupt, len(pairs))))
+
+    for version in versions:
+        manifest = {
+            "version": version,
+            "commit": hashlib.sha1(version.encode("utf-8")).hexdigest(),
+            "buildDate": "2026-01-01T00:00:00Z",
+            "platforms": {},
+        }
+        for i, platform in enumerate(platforms):
+            binary = "claude.exe" if platform.startswith("win32") else "claude"
+            blob_size = size + i * 4096
+            _, checksum = gcs.put_synthetic(
+                f"{BUCKET}/{version}/{platform}/{binary}", blob_size, f"{version}/{platform}"
+            )
+            if (version, platform) in corrupted:
+                checksum = hashlib.sha256(checksum.encode("utf-8")).hexdigest()
+            manifest["platforms"][platform] = {"binary": binary, "checksum": checksum, "size": blob_size}
+        gcs.put(f"{BUCKET}/{version}/manifest.json", json.dumps(manifest, indent=2))
+
+    return {v for v, _ in corrupted}
+
+
+def _git(cwd: Path, *args: str) -> str:
+    result = subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"git {' '.join(args)} failed: {result.stderr.strip()}")
+    return result.stdout
+
+
+def make_workspace(root: Path) -> tuple[Path, Path]:
+    """
+    Create a bare remote and a clone holding a copy of `scripts/` and an empty index.
+
+    Returns:
+        (workspace, remote) paths.
+    """
+    remote = root / "remote.git"
+    workspace = root / "workspace"
+    _git(root, "init", "-q", "--bare", str(remote))
+    _git(root, "clone", "-q", str(remote), str(workspace))
+    _git(workspace, "config", "user.name", "sim")
+    _git(workspace, "config", "user.email", "sim@localhost")
+
+    shutil.copytree(SCRIPTS_DIR, workspace / "scripts", ignore=shutil.ignore_patterns("__pycache__"))
+    shutil.copy2(REPO_ROOT / ".gitignore", workspace / ".gitignore")
+    (workspace / "version.json").write_text(json.dumps({"synced": []}, indent=2), encoding="utf-8")
+
+    _git(workspace, "add", ".")
+    _git(workspace, "commit", "-q", "-m", "Initial commit")
+    _git(workspace, "push", "-q", "-u", "origin", "HEAD")
+    return workspace, remote
+
+
+def run_script(workspace: Path, env: dict, log_path: Path, *args: str) -> tuple[int, float, str]:
+    """
+    Run an entry point in the workspace.
+
+    Returns:
+        (exit code, wall seconds, combined output).
+    """
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, *args], cwd=workspace, env=env,
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+    )
+    elapsed = time.perf_counter() - start
+    with open(log_path, "a", encoding="utf-8") as f:
+        f.write(f"$ {' '.join(args)}\n{result.stdout}\n")
+    return result.returncode, elapsed, result.stdout
+
+
+def read_outputs(path: Path) -> dict[str, str]:
+    outputs = {}
+    if path.exists():
+        for line in path.read_text(encoding="utf-8").splitlines():
+            name, _, value = line.partition("=")
+            outputs[name] = value
+    return outputs
+
+
+def simulate(args: argparse.Namespace, root: Path) -> dict:
+    """
+    Run one simulation in `root` and return the report.
+    """
+    rng = random.Random(args.seed)
+    versions = make_versions(args.versions)
+    platforms = PLATFORMS[:args.platforms]
+
+    gcs = FakeGCS(seed=args.seed)
+    gh = FakeGitHub(seed=args.seed)
+    with gcs, gh:
+        corrupted = populate(gcs, versions, platforms, args.size, args.corrupt, rng)
+
+        gcs.latency = gh.latency = args.latency
+        gcs.bandwidth = args.bandwidth
+        gh.bandwidth = args.upload_bandwidth
+        gcs.error_rate = args.error_rate
+        gcs.reset_rate = args.reset_rate
+        gh.upload_error_rate = args.upload_error_rate
+
+        workspace, remote = make_workspace(root)
+        log_path = root / "runs.log"
+        env = dict(
+            os.environ,
+            CCR_INSTALL_SCRIPT_URL=f"{gcs.url}/install.sh",
+            CCR_CHANGELOG_URL=f"{gcs.url}/CHANGELOG.md",
+            GITHUB_API_URL=gh.url,
+            GITHUB_REPOSITORY=gh.repo,
+            GITHUB_TOKEN="simulated",
+            GIT_TERMINAL_PROMPT="0",
+        )
+        env.pop("GITHUB_STEP_SUMMARY", None)
+
+        log.info(
+            f"Simulating [{len(versions)}] versions x [{len(platforms)}] platforms "
+            f"of [{args.size}] bytes ({args.mode} mode) in [{root}]"
+        )
+
+        profile_args = ["--profile", "--profile-dir", str(root / "profiles")] if args.profile else []
+        runs = []
+        stages: dict[str, float] = {}
+        timers: dict[str, float] = {}
+        retries = {"download": 0, "upload": 0}
+        wall_start = time.perf_counter()
+
+        for run in range(1, args.max_runs + 1):
+            if args.mode in ("direct", "backfill"):
+                batch = versions if run == 1 else []
+                check_seconds = 0.0
+            else:
+                output_path = root / f"output-{run}.txt"
+                env["GITHUB_OUTPUT"] = str(output_path)
+                # Same two steps as check-update.yml: the stdlib probe, then the full check.
+                rc, check_seconds, _ = run_script(workspace, env, log_path, "scripts/check_update.py", "--probe-only")
+                outputs = read_outputs(output_path)
+                if rc == 0 and outputs.get("changed") != "false":
+                    rc, full_seconds, _ = run_script(
+                        workspace, env, log_path, "scripts/check_update.py", "--no-probe", *profile_args
+                    )
+                    check_seconds += full_seconds
+                    outputs = read_outputs(output_path)
+                if rc != 0:
+                    log.error(f"Update check failed in run [{run}]; see [{log_path}]")
+                    break
+                batch = json.loads(outputs.get("versions", "[]")) if outputs.get("has_updates") == "true" else []
+
+            if not batch:
+                break
+
+            metrics_path = root / f"metrics-{run}.json"
+            env["CCR_METRICS_JSON"] = str(metrics_path)
+            if args.mode == "backfill":
+                command = ["scripts/backfill.py", "--concurrency", str(args.concurrency)]
+            else:
+                command = ["scripts/sync_release.py", json.dumps(batch)]
+            rc, sync_seconds, _ = run_script(workspace, env, log_path, *command, *profile_args)
+            if metrics_path.exists():
+                run_metrics = json.loads(metrics_path.read_text(encoding="utf-8"))
+                for totals, source in ((stages, run_metrics["stages"]), (timers, run_metrics["timers"])):
+                    for name, seconds in source.items():
+                        totals[name] = totals.get(name, 0.0) + seconds
+                for platform in run_metrics["platforms"].values():
+                    retries["download"] += platform["downloadRetries"]
+                    retries["upload"] += platform["uploadRetries"]
+            runs.append({
+                "versions": batch,
+                "exitCode": rc,
+                "checkSeconds": round(check_seconds, 3),
+                "syncSeconds": round(sync_seconds, 3),
+            })
+            log.info(f"Run [{run}]: synced {batch} in [{sync_seconds:.1f}s], exit code [{rc}]")
+
+            # Failed versions stay pending; a cron loop would retry them forever.
+            if args.mode == "cron" and rc != 0 and set(batch) <= corrupted:
+                break
+
+        wall = time.perf_counter() - wall_start
+
+        published = gh.published()
+        expected = [v for v in versions if v not in corrupted]
+        complete = [
+            v for v in expected
+            if f"v{v}" in published
+            and {asset_name(v, p) for p in platforms} <= {a["name"] for a in published[f"v{v}"]["assets"]}
+        ]
+        remote_index = json.loads(_git(remote, "show", "HEAD:version.json"))
+        # A tag must point at a pushed commit that already holds the version's metadata.
+        untagged = [
+            v for v in complete
+            if subprocess.run(
+                ["git", "cat-file", "-e", f"{published[f'v{v}']['target_commitish']}:releases/{v}/manifest.json"],
+                cwd=remote, capture_output=True,
+            ).returncode != 0
+        ]
+        commits = int(_git(remote, "rev-list", "--count", "HEAD").strip()) - 1
+
+        return {
+            "config": {
+                "versions": len(versions),
+                "platforms": len(platforms),
+                "size": args.size,
+                "mode": args.mode,
+                "latency": args.latency,
+                "bandwidth": args.bandwidth,
+                "uploadBandwidth": args.upload_bandwidth,
+                "errorRate": args.error_rate,
+                "resetRate": args.reset_rate,
+                "uploadErrorRate": args.upload_error_rate,
+                "corrupt": args.corrupt,
+                "seed": args.seed,
+            },
+            "wallSeconds": round(wall, 3),
+            "runs": runs,
+            "stageSeconds": {k: round(v, 3) for k, v in stages.items()},
+            "timerSeconds": {k: round(v, 3) for k, v in timers.items()},
+            "retries": retries,
+            "bytes": {
+                "downloaded": gcs.bytes_sent,
+                "uploaded": gh.bytes_uploaded,
+                "expected": sum(args.size + i * 4096 for i in range(len(platforms))) * len(versions),
+            },
+            "requests": {"gcs": gcs.request_count, "github": gh.request_count},
+            "faults": {
+                "gcs5xx": gcs.errors_injected,
+                "gcsResets": gcs.resets_injected,
+                "uploadErrors": gh.errors_injected,
+                "corruptedVersions": sorted(corrupted),
+            },
+            "result": {
+                "published": len(complete),
+                "expected": len(expected),
+                "missing": [v for v in expected if v not in complete],
+                "tagsWithoutMetadata": untagged,
+                "synced": len(remote_index.get("synced", [])),
+                "commits": commits,
+            },
+        }
+
+
+def print_report(report: dict) -> None:
+    mb = 1024 * 1024
+    wall = report["wallSeconds"]
+    moved = report["bytes"]["downloaded"] + report["bytes"]["uploaded"]
+    result = report["result"]
+
+    print(f"Wall time:     {wall:.1f}s over {len(report['runs'])} run(s)")
+    print(f"Downloaded:    {report['bytes']['downloaded'] / mb:.1f} MiB "
+          f"(payload {report['bytes']['expected'] / mb:.1f} MiB)")
+    print(f"Uploaded:      {report['bytes']['uploaded'] / mb:.1f} MiB")
+    print(f"Throughput:    {moved / mb / wall if wall else 0:.1f} MiB/s")
+    print(f"Requests:      gcs {report['requests']['gcs']}, github {report['requests']['github']}")
+    print(f"Faults:        {report['faults']}")
+    print(f"Retries:       {report['retries']}")
+    print(f"Published:     {result['published']}/{result['expected']} "
+          f"(synced {result['synced']}, commits {result['commits']})")
+    if result["missing"]:
+        print(f"Missing:       {result['missing']}")
+    if result["tagsWithoutMetadata"]:
+        print(f"Bad tags:      {result['tagsWithoutMetadata']} (tag commit lacks releases/{{version}}/)")
+    for stage, seconds in {**report["stageSeconds"], **report["timerSeconds"]}.items():
+        print(f"  {stage:<16}{seconds:8.1f}s")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--versions", type=int, default=10, help="Number of upstream versions")
+    parser.add_argument("--platforms", type=int, default=len(PLATFORMS), choices=range(1, len(PLATFORMS) + 1),
+                        metavar=f"1-{len(PLATFORMS)}", help="Platforms per version")
+    parser.add_argument("--size", type=parse_size, default=parse_size("4M"), help="Binary size, e.g. 8M")
+    parser.add_argument("--mode", choices=["cron", "direct", "backfill"], default="cron")
+    parser.add_argument("--concurrency", type=int, default=3, help="Versions in flight in backfill mode")
+    parser.add_argument("--max-runs", type=int, default=100, help="Upper bound on sync runs")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--bandwidth", type=parse_size, default=None, help="Per-connection download cap per second")
+    parser.add_argument("--upload-bandwidth", type=parse_size, default=None, help="Per-connection upload cap per second")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of a GCS 503")
+    parser.add_argument("--reset-rate", type=float, default=0.0, help="Probability of a mid-body reset")
+    parser.add_argument("--upload-error-rate", type=float, default=0.0, help="Probability of a failed upload")
+    parser.add_argument("--corrupt", type=int, default=0, help="Binaries served with a wrong checksum")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", help="Directory for the workspace and remote (default: a temp dir)")
+    parser.add_argument("--keep", action="store_true", help="Keep the temp dir")
+    parser.add_argument("--profile", action="store_true",
+                        help="Run the entry points with --profile (artifacts under {workdir}/profiles)")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    root = Path(args.workdir or tempfile.mkdtemp(prefix="ccr-sim-")).resolve()
+    root.mkdir(parents=True, exist_ok=True)
+    try:
+        report = simulate(args, root)
+    except Exception as e:
+        log.error(f"Simulation failed: {e}", exc_info=True)
+        return 1
+    finally:
+        if not args.workdir and not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    result = report["result"]
+    return 0 if result["published"] == result["expected"] and not result["tagsWithoutMetadata"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,18 +8,20 @@ import os
 import sys
 import json
 import logging
-import tempfile
-import subprocess
-from pathlib import Path
+import argparse
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from lib.fetcher import get_gcs_bucket, get_manifest
-from lib.downloader import download_version_files
-from lib.changelog import fetch_changelog, extract_notes
-from lib.version import save_synced
-from lib.release import release_exists, create_release
-from lib.metadata import save_version_metadata
+from lib import metrics, mirror, platforms, profiling
+from lib.config import PIPELINE_MAX_IN_FLIGHT, METRICS_JSON_FILE, METRICS_PROMETHEUS_FILE, MIRROR_DIR
+from lib.fetcher import get_gcs_bucket
+from lib.http_client import log_connection_stats
+from lib.changelog import fetch_changelog
+from lib.version import flush_synced
+from lib.git_batch import GitBatch
+from lib.release import load_catalog
+from lib.pipeline import run_pipeline, stage_totals
+from lib.sync import SyncJob, STAGES, cleanup, run_stages
 
 logging.basicConfig(
     level=logging.INFO,
@@ -29,52 +31,11 @@ logging.basicConfig(
 log = logging.getLogger(__name__)
 
 
-def git_commit_and_push(version: str) -> None:
-    """
-    Commit and push the `version.json` and `releases/{version}/` updates.
-
-    Args:
-        version: The version that was just synced.
-    """
-    try:
-        # Add version.json
-        subprocess.run(
-            ["git", "add", "version.json"],
-            check=True,
-            capture_output=True
-        )
-
-        # Add releases/{version}/ directory
-        releases_path = f"releases/{version}"
-        subprocess.run(
-            ["git", "add", releases_path],
-            check=True,
-            capture_output=True
-        )
-
-        commit_msg = f":bookmark: Release version {version}"
-        subprocess.run(
-            ["git", "commit", "-m", commit_msg],
-            check=True,
-            capture_output=True
-        )
-
-        subprocess.run(
-            ["git", "push"],
-            check=True,
-            capture_output=True
-        )
-
-        log.info(f"Git commit and push succeeded: [{commit_msg}]")
-
-    except subprocess.CalledProcessError as e:
-        log.warning(f"Git operation failed: {e.stderr.decode() if e.stderr else str(e)}")
-
-
 def sync_one_version(
     gcs_bucket: str,
     version: str,
-    changelog_content: str
+    changelog_content: str,
+    git_batch: GitBatch | None = None
 ) -> bool:
     """
     Sync a single version.
@@ -83,63 +44,28 @@ def sync_one_version(
         gcs_bucket: GCS_BUCKET base URL.
         version: Version to sync.
         changelog_content: Full CHANGELOG content.
+        git_batch: Batch that collects the git changes; if omitted, they are
+            committed and pushed immediately.
 
     Returns:
         True on success, False on failure.
     """
-    log.info(f"========== Start syncing version [{version}] ==========")
+    if git_batch is None:
+        git_batch = GitBatch(every=1)
+
+    job = SyncJob(gcs_bucket, version, changelog_content, git_batch)
 
     try:
-        if release_exists(version):
-            log.info(f"Release for version [{version}] already exists; skipping")
-            save_synced(version)
-            return True
-
-        manifest = get_manifest(gcs_bucket, version)
-
-        # Detect fallback mode
-        is_fallback = manifest.get("_fallback_mode", False)
-        if is_fallback:
-            log.info(
-                f"Version [{version}] entering fallback mode: "
-                f"manifest unavailable, will create release without binaries"
-            )
-
-        with tempfile.TemporaryDirectory() as tmpdir:
-            files = download_version_files(
-                gcs_bucket, version, manifest, Path(tmpdir)
-            )
-
-            notes = extract_notes(changelog_content, version)
-
-            # Add warning to Release notes in fallback mode
-            if is_fallback:
-                fallback_warning = (
-                    "> **⚠️ Warning:** This release has no binary installers due to upstream manifest.json fetch failure.\n"
-                    "> Please visit the [official repository](https://github.com/anthropics/claude-code) for downloads or wait for updates.\n\n"
-                )
-                notes = fallback_warning + notes
-
-            # Save version metadata to releases/{version}/
-            try:
-                save_version_metadata(version, notes, manifest)
-            except (IOError, OSError) as e:
-                log.error(f"Failed to save metadata for version [{version}]: {e}")
-                raise  # Terminate flow on failure
-
-            save_synced(version)
-
-            git_commit_and_push(version)
-
-            create_release(version, notes, files)
-
-        log.info(f"========== Version [{version}] synced successfully ==========")
+        run_stages(job)
         return True
 
     except Exception as e:
         log.error(f"Failed to sync version [{version}]: {e}", exc_info=True)
         return False
 
+    finally:
+        cleanup(job)
+
 
 def main(versions_json: str) -> int:
     """
@@ -159,20 +85,36 @@ def main(versions_json: str) -> int:
 
         log.info(f"Versions to sync: {versions}")
 
-        gcs_bucket = get_gcs_bucket()
-        changelog_content = fetch_changelog()
+        with metrics.timer("prepare"):
+            gcs_bucket = get_gcs_bucket()
+            changelog_content = fetch_changelog()
+            load_catalog()
 
-        success_count = 0
-        fail_count = 0
+        git_batch = GitBatch()
+        jobs = (SyncJob(gcs_bucket, v, changelog_content, git_batch) for v in versions)
 
-        for version in versions:
-            if sync_one_version(gcs_bucket, version, changelog_content):
-                success_count += 1
-            else:
-                fail_count += 1
+        # Version N+1 downloads while version N is published and recorded.
+        items = run_pipeline(jobs, STAGES, PIPELINE_MAX_IN_FLIGHT, cleanup)
+
+        success_count = sum(1 for item in items if item.ok)
+        fail_count = len(items) - success_count
+        for item in items:
+            for stage, seconds in item.timings.items():
+                metrics.record_stage(str(item.payload), stage, seconds)
+            if not item.ok:
+                log.error(f"Failed to sync version [{item.payload}]: {item.error}")
+
+        git_batch.commit()
+        flush_synced()
+        for i, included in enumerate(git_batch.commits, 1):
+            log.info(f"Commit [{i}/{len(git_batch.commits)}] included versions: {included}")
 
         log.info(f"Sync finished: succeeded [{success_count}], failed [{fail_count}]")
+        for stage, seconds in stage_totals(items).items():
+            log.info(f"Stage [{stage}] total time [{seconds:.1f}s]")
+        log_connection_stats()
 
+        metrics.set_run(versions=len(items), succeeded=success_count, failed=fail_count)
         return 0 if fail_count == 0 else 1
 
     except json.JSONDecodeError as e:
@@ -181,12 +123,22 @@ def main(versions_json: str) -> int:
     except Exception as e:
         log.error(f"Sync failed: {e}", exc_info=True)
         return 1
+    finally:
+        metrics.export(METRICS_JSON_FILE, METRICS_PROMETHEUS_FILE)
 
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python sync_release.py '<json_versions>'")
-        print('Example: python sync_release.py \'["1.0.37","1.0.38"]\'')
-        sys.exit(1)
-
-    sys.exit(main(sys.argv[1]))
+    parser = argparse.ArgumentParser(description="Sync Claude Code versions to GitHub Releases.")
+    parser.add_argument("versions", help='JSON array of versions, e.g. \'["1.0.37","1.0.38"]\'')
+    parser.add_argument("--mirror-dir", default=MIRROR_DIR,
+                        help="Also write synced versions into this directory, laid out like "
+                             "the upstream download base URL (default: $CCR_MIRROR_DIR)")
+    platforms.add_platform_arguments(parser)
+    profiling.add_profile_arguments(parser)
+    args = parser.parse_args()
+    mirror.configure(args.mirror_dir)
+    platforms.configure(platforms.parse_patterns(args.platforms), platforms.parse_patterns(args.skip_platforms))
+
+    with profiling.session("sync_release", args.profile_dir if args.profile else None):
+        exit_code = main(args.versions)
+    sys.exit(exit_code)
@@ -0,0 +1,46 @@
+"""
+Shared fixtures.
+
+Tests import the library the way the entry points do, with `scripts/` on
+`sys.path`, and talk HTTP only to the local stand-ins in `scripts/sim/`:
+
+    pip install -r requirements.txt pytest
+    python -m pytest
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+from sim.gcs import FakeGCS  # noqa: E402
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """
+    Run in an empty directory: `version.json`, its journal and `.cache/` are relative paths.
+    """
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def gcs():
+    """
+    A running `FakeGCS` object server.
+    """
+    with FakeGCS() as server:
+        yield server
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    """
+    Skip retry backoff delays.
+    """
+    import time
+
+    monkeypatch.setattr(time, "sleep", lambda seconds: None)
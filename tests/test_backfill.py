@@ -0,0 +1,38 @@
+from backfill import interleave_by_size, load_checkpoint, save_checkpoint
+
+
+def test_interleave_by_size_pairs_large_and_small():
+    sizes = {"a": 50, "b": 10, "c": 40, "d": 20, "e": 30}
+
+    assert interleave_by_size(list(sizes), sizes) == ["a", "b", "c", "d", "e"]
+
+
+def test_interleave_by_size_treats_unknown_sizes_as_smallest():
+    assert interleave_by_size(["x", "y", "z"], {"y": 5, "z": 1}) == ["y", "x", "z"]
+    assert interleave_by_size([], {}) == []
+
+
+def test_checkpoint_round_trip(tmp_path):
+    path = tmp_path / "backfill.json"
+    checkpoint = load_checkpoint(path, "1.0.37", "2.0.0", "all platforms")
+    checkpoint["done"].append("1.0.38")
+    save_checkpoint(path, checkpoint)
+
+    assert load_checkpoint(path, "1.0.37", "2.0.0", "all platforms")["done"] == ["1.0.38"]
+
+
+def test_checkpoint_for_another_range_or_selection_starts_over(tmp_path):
+    path = tmp_path / "backfill.json"
+    checkpoint = load_checkpoint(path, "1.0.37", "2.0.0", "all platforms")
+    checkpoint["done"].append("1.0.38")
+    save_checkpoint(path, checkpoint)
+
+    assert load_checkpoint(path, "1.0.37", "2.0.1", "all platforms")["done"] == []
+    assert load_checkpoint(path, "1.0.37", "2.0.0", "linux-x64")["done"] == []
+
+
+def test_unreadable_checkpoint_starts_over(tmp_path):
+    path = tmp_path / "backfill.json"
+    path.write_text("{")
+
+    assert load_checkpoint(path, "1.0.37", "2.0.0", "all platforms")["done"] == []
@@ -0,0 +1,49 @@
+import pytest
+
+from lib import changelog
+
+VERSIONS = [f"2.0.{i}" for i in range(30, 0, -1)]
+
+
+@pytest.fixture
+def upstream(workdir, gcs, monkeypatch):
+    """
+    Serve a CHANGELOG (newest first) and point the library at it.
+    """
+    def publish(versions):
+        gcs.put("CHANGELOG.md", "# Changelog\n\n" + "".join(f"## {v}\n\n- change\n\n" for v in versions))
+
+    publish(VERSIONS)
+    monkeypatch.setattr(changelog, "CHANGELOG_URL", f"{gcs.url}/CHANGELOG.md")
+    return publish
+
+
+def test_parse_versions():
+    content = "# Changelog\n\n## 2.0.1\n\n- b\n\n## 2.0.0-beta.1\n\n- a\n\n## not a version\n"
+
+    assert changelog.parse_versions(content) == ["2.0.1", "2.0.0-beta.1"]
+
+
+def test_stream_reads_everything_until_a_full_scan_was_recorded(upstream):
+    # 2.0.5 failed long ago; everything around it synced.
+    known = set(VERSIONS) - {"2.0.30", "2.0.5"}
+
+    assert list(changelog.iter_new_versions(known, stop_after=10)) == ["2.0.30", "2.0.5"]
+
+
+def test_stream_stops_after_known_run_when_unchanged(upstream, caplog):
+    known = set(VERSIONS) - {"2.0.30", "2.0.5"}
+    list(changelog.iter_new_versions(known, stop_after=10))
+
+    with caplog.at_level("INFO"):
+        assert list(changelog.iter_new_versions(known, stop_after=10)) == ["2.0.30"]
+    assert "older unsynced versions wait for the next full scan" in caplog.text
+
+
+def test_stream_reads_everything_again_when_changelog_changed(upstream):
+    known = set(VERSIONS) - {"2.0.5"}
+    list(changelog.iter_new_versions(known, stop_after=10))
+
+    upstream(["2.0.31"] + VERSIONS)
+
+    assert list(changelog.iter_new_versions(known, stop_after=10)) == ["2.0.31", "2.0.5"]
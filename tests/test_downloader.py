@@ -0,0 +1,175 @@
+import json
+import hashlib
+
+import pytest
+
+from lib import downloader
+
+SIZE = 3 * 1024 * 1024 + 123
+
+
+def _blob(gcs, name="claude", size=SIZE):
+    url, sha256 = gcs.put_synthetic(name, size, seed=name)
+    return url, sha256, gcs.objects[name]
+
+
+def _content(blob, start=0, end=None):
+    return b"".join(blob.read(start, blob.size if end is None else end, 1024 * 1024))
+
+
+def _etag(gcs, url):
+    from lib import http_client
+
+    return http_client.get(url, headers={"Range": "bytes=0-0"}).headers["ETag"]
+
+
+def test_download_file_verifies_checksum(workdir, gcs):
+    url, sha256, blob = _blob(gcs)
+    dest = workdir / "claude"
+
+    assert downloader.download_file(url, dest, sha256) == dest
+    assert dest.read_bytes() == _content(blob)
+    assert not (workdir / "claude.part").exists()
+    assert not (workdir / "claude.part.json").exists()
+
+
+def test_download_file_rejects_bad_checksum(workdir, gcs):
+    url, _, _ = _blob(gcs)
+    dest = workdir / "claude"
+
+    with pytest.raises(RuntimeError, match="SHA256 verification failed"):
+        downloader.download_file(url, dest, "0" * 64)
+    assert not dest.exists()
+    assert not (workdir / "claude.part").exists()
+
+
+def test_download_file_resumes_partial(workdir, gcs):
+    url, sha256, blob = _blob(gcs)
+    dest = workdir / "claude"
+    half = SIZE // 2
+    (workdir / "claude.part").write_bytes(_content(blob, 0, half))
+    (workdir / "claude.part.json").write_text(json.dumps({"url": url, "sha256": sha256, "etag": _etag(gcs, url)}))
+    sent_before = gcs.bytes_sent
+
+    downloader.download_file(url, dest, sha256)
+
+    assert dest.read_bytes() == _content(blob)
+    assert gcs.bytes_sent - sent_before == SIZE - half
+
+
+def test_download_file_restarts_when_upstream_changed(workdir, gcs):
+    url, sha256, blob = _blob(gcs)
+    dest = workdir / "claude"
+    (workdir / "claude.part").write_bytes(b"x" * 1000)
+    (workdir / "claude.part.json").write_text(json.dumps({"url": url, "sha256": sha256, "etag": '"old"'}))
+
+    downloader.download_file(url, dest, sha256)
+
+    assert hashlib.sha256(dest.read_bytes()).hexdigest() == sha256
+
+
+def test_download_file_discards_partial_for_other_checksum(workdir, gcs):
+    url, sha256, blob = _blob(gcs)
+    dest = workdir / "claude"
+    (workdir / "claude.part").write_bytes(b"x" * 1000)
+    (workdir / "claude.part.json").write_text(json.dumps({"url": url, "sha256": "f" * 64}))
+    sent_before = gcs.bytes_sent
+
+    downloader.download_file(url, dest, sha256)
+
+    assert dest.read_bytes() == _content(blob)
+    assert gcs.bytes_sent - sent_before == SIZE
+
+
+def test_download_file_resumes_after_connection_reset(workdir, gcs, no_sleep):
+    url, sha256, blob = _blob(gcs)
+    dest = workdir / "claude"
+    gcs.reset_rate = 1.0
+
+    # Every response is cut halfway, so each retry has to continue where the last one stopped.
+    with pytest.raises(RuntimeError, match="Download failed"):
+        downloader.download_file(url, dest, sha256)
+    kept = (workdir / "claude.part").stat().st_size
+    assert SIZE // 2 <= kept < SIZE
+
+    gcs.reset_rate = 0.0
+    sent_before = gcs.bytes_sent
+    downloader.download_file(url, dest, sha256)
+
+    assert dest.read_bytes() == _content(blob)
+    assert gcs.bytes_sent - sent_before == SIZE - kept
+
+
+@pytest.fixture
+def segmented(monkeypatch):
+    monkeypatch.setattr(downloader, "DOWNLOAD_SEGMENT_MIN_SIZE", 1024 * 1024)
+
+
+def test_segmented_download_merges_ranges(workdir, gcs, segmented):
+    url, sha256, blob = _blob(gcs)
+    dest = workdir / "claude"
+
+    downloader.download_file_segmented(url, dest, sha256, size=SIZE, segments=4)
+
+    assert dest.read_bytes() == _content(blob)
+    assert not (workdir / "claude.part.json").exists()
+    # The range probe plus one request per segment.
+    assert gcs.request_count == 5
+
+
+def test_segmented_download_resumes_each_range(workdir, gcs, segmented):
+    url, sha256, blob = _blob(gcs)
+    dest = workdir / "claude"
+    step = -(-SIZE // 4)
+    segments = []
+    data = bytearray(SIZE)
+    for i, start in enumerate(range(0, SIZE, step)):
+        end = min(start + step, SIZE) - 1
+        # Segment 0 done, 1 untouched, 2 and 3 half done.
+        position = {0: end + 1, 1: start}.get(i, start + (end - start) // 2)
+        data[start:position] = _content(blob, start, position)
+        segments.append([start, end, position])
+    (workdir / "claude.part").write_bytes(bytes(data))
+    state = {"url": url, "sha256": sha256, "size": SIZE, "etag": _etag(gcs, url), "segments": segments}
+    (workdir / "claude.part.json").write_text(json.dumps(state))
+    remaining = sum(end + 1 - position for _, end, position in segments)
+    sent_before = gcs.bytes_sent
+
+    downloader.download_file_segmented(url, dest, sha256, size=SIZE, segments=4)
+
+    assert dest.read_bytes() == _content(blob)
+    # Only the missing bytes of each range (plus the one-byte range probe).
+    assert gcs.bytes_sent - sent_before == remaining + 1
+
+
+def test_segmented_download_keeps_partial_on_failure(workdir, gcs, segmented, no_sleep):
+    # Data is kept in whole chunks, so each range must be cut after at least one.
+    url, sha256, blob = _blob(gcs, size=16 * 1024 * 1024)
+    dest = workdir / "claude"
+    gcs.reset_rate = 1.0
+
+    with pytest.raises(RuntimeError, match="partial kept"):
+        downloader.download_file_segmented(url, dest, sha256, size=blob.size, segments=4)
+    state = json.loads((workdir / "claude.part.json").read_text())
+    remaining = sum(end + 1 - position for _, end, position in state["segments"])
+    assert 0 < remaining < blob.size
+
+    gcs.reset_rate = 0.0
+    sent_before = gcs.bytes_sent
+    downloader.download_file_segmented(url, dest, sha256, size=blob.size, segments=4)
+
+    assert dest.read_bytes() == _content(blob)
+    assert gcs.bytes_sent - sent_before == remaining + 1
+
+
+def test_segmented_download_discards_partial_of_changed_file(workdir, gcs, segmented):
+    url, sha256, blob = _blob(gcs)
+    dest = workdir / "claude"
+    (workdir / "claude.part").write_bytes(b"x" * SIZE)
+    state = {"url": url, "sha256": sha256, "size": SIZE, "etag": '"old"',
+             "segments": [[0, SIZE - 1, SIZE // 2]]}
+    (workdir / "claude.part.json").write_text(json.dumps(state))
+
+    downloader.download_file_segmented(url, dest, sha256, size=SIZE, segments=4)
+
+    assert dest.read_bytes() == _content(blob)
@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+from lib import manifest_index
+from lib.manifest_index import ManifestIndex
+from query_releases import size_trend
+
+
+def _manifest(version, sizes):
+    return {
+        "version": version,
+        "buildDate": f"{version}-date",
+        "platforms": {
+            platform: {"checksum": f"{version}-{platform}".encode().hex().ljust(64, "0"), "size": size}
+            for platform, size in sizes.items()
+        },
+    }
+
+
+MANIFESTS = {
+    "1.0.9": _manifest("1.0.9", {"linux-x64": 100, "darwin-arm64": 90}),
+    "1.0.10": _manifest("1.0.10", {"linux-x64": 110}),
+    "2.0.0": _manifest("2.0.0", {"linux-x64": 105, "darwin-arm64": 95}),
+}
+
+
+@pytest.fixture
+def index():
+    index = ManifestIndex()
+    for version, manifest in MANIFESTS.items():
+        index.put(version, manifest)
+    return index
+
+
+def _save_releases(base_dir):
+    for version, manifest in MANIFESTS.items():
+        path = base_dir / "releases" / version / "manifest.json"
+        path.parent.mkdir(parents=True)
+        path.write_text(json.dumps(manifest))
+
+
+def test_round_trip(tmp_path, index):
+    path = tmp_path / "index.json"
+    index.save(path)
+
+    loaded = ManifestIndex.load(path)
+
+    assert loaded.entries == index.entries
+    assert loaded.builds() == index.builds()
+
+
+def test_one_row_per_line(index):
+    lines = index.to_json().splitlines()
+
+    assert json.loads(index.to_json())["format"] == manifest_index.INDEX_FORMAT
+    assert sum('"linux-x64"' in line for line in lines) == 3
+    assert all(line.count('"darwin-arm64"') <= 1 for line in lines)
+
+
+def test_queries(index):
+    checksum = MANIFESTS["1.0.10"]["platforms"]["linux-x64"]["checksum"]
+
+    assert index.versions() == ["1.0.9", "1.0.10", "2.0.0"]
+    assert index.versions("1.0.10") == ["1.0.10", "2.0.0"]
+    assert index.platforms() == ["darwin-arm64", "linux-x64"]
+    assert [r["version"] for r in index.find_checksum(checksum)] == ["1.0.10"]
+    assert [r["version"] for r in index.find_checksum(checksum[:12].upper())] == ["1.0.10"]
+    assert index.find_checksum("f" * 64) == []
+    assert [r["version"] for r in index.builds("darwin-arm64")] == ["1.0.9", "2.0.0"]
+    assert index.latest("darwin-arm64")["size"] == 95
+    assert index.latest("win32-x64") is None
+
+
+def test_put_rejects_non_versions(index):
+    with pytest.raises(ValueError):
+        index.put("index.json", {})
+
+
+def test_load_rebuilds_missing_or_unreadable_index(tmp_path):
+    _save_releases(tmp_path)
+
+    assert manifest_index.load(tmp_path).versions() == ["1.0.9", "1.0.10", "2.0.0"]
+    assert manifest_index.index_path(tmp_path).exists()
+
+    manifest_index.index_path(tmp_path).write_text('{"format": 1}')
+    assert manifest_index.load(tmp_path).versions() == ["1.0.9", "1.0.10", "2.0.0"]
+
+
+def test_update_adds_version(tmp_path):
+    _save_releases(tmp_path)
+    manifest_index.rebuild(tmp_path)
+
+    manifest_index.update("2.0.1", _manifest("2.0.1", {"linux-x64": 120}), tmp_path)
+
+    assert ManifestIndex.load(manifest_index.index_path(tmp_path)).latest("linux-x64")["version"] == "2.0.1"
+
+
+def test_size_trend(index):
+    trend = size_trend(index.builds("linux-x64"))
+
+    assert [row["sizeChange"] for row in trend] == [None, 10, -5]
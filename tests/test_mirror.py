@@ -0,0 +1,152 @@
+import json
+import threading
+
+import pytest
+import requests
+
+from lib import mirror
+from lib.downloader import asset_name
+from mirror_server import MirrorServer, entity_tag, parse_range
+
+MANIFEST = {
+    "version": "2.0.1",
+    "buildDate": "2025-01-01T00:00:00Z",
+    "platforms": {
+        "linux-x64": {"checksum": "a" * 64, "size": 5},
+        "win32-x64": {"checksum": "b" * 64, "size": 5},
+    },
+    "skippedPlatforms": {"darwin-arm64": {"checksum": "c" * 64, "size": 5}},
+    "deltas": {},
+}
+
+
+@pytest.fixture
+def mirror_root(tmp_path):
+    root = tmp_path / "mirror"
+    mirror.configure(str(root))
+    yield root
+    mirror.configure(None)
+
+
+def _binaries(workdir, version, manifest):
+    for platform in manifest["platforms"]:
+        (workdir / asset_name(version, platform)).write_bytes(platform.encode("utf-8")[:5])
+    return workdir
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-9", (0, 9)),
+    ("bytes=10-", (10, 99)),
+    ("bytes=90-200", (90, 99)),
+    ("bytes=-10", (90, 99)),
+    ("bytes=-500", (0, 99)),
+    ("bytes=0-1,5-6", None),
+    ("items=0-1", None),
+    ("bytes=a-b", None),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 100) == expected
+
+
+@pytest.mark.parametrize("header, size", [
+    ("bytes=100-", 100),
+    ("bytes=5-2", 100),
+    ("bytes=-0", 100),
+    ("bytes=-10", 0),
+])
+def test_parse_range_unsatisfiable(header, size):
+    with pytest.raises(ValueError):
+        parse_range(header, size)
+
+
+def test_entity_tag_follows_content(tmp_path):
+    path = tmp_path / "latest"
+    path.write_text("2.0.0")
+    first = entity_tag(path, path.stat())
+    path.write_text("2.0.1")
+
+    assert entity_tag(path, path.stat()) != first
+
+
+def test_write_version_lays_out_synced_platforms(tmp_path, mirror_root):
+    workdir = _binaries(tmp_path, "2.0.1", MANIFEST)
+
+    mirror.write_version("2.0.1", MANIFEST, workdir)
+
+    assert (mirror_root / "2.0.1" / "linux-x64" / "claude").exists()
+    assert (mirror_root / "2.0.1" / "win32-x64" / "claude.exe").exists()
+    assert not (mirror_root / "2.0.1" / "darwin-arm64").exists()
+    saved = json.loads((mirror_root / "2.0.1" / "manifest.json").read_text())
+    assert set(saved["platforms"]) == {"linux-x64", "win32-x64"}
+    assert "skippedPlatforms" not in saved and "deltas" not in saved
+    assert (mirror_root / "latest").read_text() == "2.0.1"
+    assert mirror.has_version("2.0.1")
+
+
+def test_latest_only_moves_forward(tmp_path, mirror_root):
+    workdir = _binaries(tmp_path, "2.0.1", MANIFEST)
+    mirror.write_version("2.0.1", MANIFEST, workdir)
+    older = {**MANIFEST, "version": "2.0.0"}
+    _binaries(tmp_path, "2.0.0", older)
+
+    mirror.write_version("2.0.0", older, workdir)
+
+    assert (mirror_root / "latest").read_text() == "2.0.1"
+
+
+def test_write_version_requires_every_binary(tmp_path, mirror_root):
+    with pytest.raises(RuntimeError, match="was not downloaded"):
+        mirror.write_version("2.0.1", MANIFEST, tmp_path)
+    assert not mirror.has_version("2.0.1")
+
+
+@pytest.fixture
+def server(tmp_path):
+    root = tmp_path / "served"
+    (root / "2.0.1" / "linux-x64").mkdir(parents=True)
+    (root / "2.0.1" / "linux-x64" / "claude").write_bytes(bytes(range(256)) * 8)
+    (root / "latest").write_text("2.0.1")
+    (tmp_path / "secret").write_text("outside")
+
+    httpd = MirrorServer(("127.0.0.1", 0), root)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_server_serves_ranges(server):
+    url = f"{server}/2.0.1/linux-x64/claude"
+    full = requests.get(url).content
+
+    resp = requests.get(url, headers={"Range": "bytes=100-199"})
+
+    assert resp.status_code == 206
+    assert resp.headers["Content-Range"] == f"bytes 100-199/{len(full)}"
+    assert resp.content == full[100:200]
+    assert requests.get(url, headers={"Range": f"bytes={len(full)}-"}).status_code == 416
+
+
+def test_server_if_range_mismatch_sends_whole_file(server):
+    url = f"{server}/2.0.1/linux-x64/claude"
+
+    resp = requests.get(url, headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+
+    assert resp.status_code == 200
+    assert len(resp.content) == 2048
+
+
+def test_server_conditional_get(server):
+    first = requests.get(f"{server}/latest")
+
+    again = requests.get(f"{server}/latest", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert first.text == "2.0.1"
+    assert first.headers["Cache-Control"] == "no-cache"
+    assert again.status_code == 304
+
+
+def test_server_stays_inside_root(server):
+    assert requests.get(f"{server}/../secret").status_code == 404
+    assert requests.get(f"{server}/%2e%2e/secret").status_code == 404
+    assert requests.get(f"{server}/2.0.1").status_code == 404
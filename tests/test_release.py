@@ -0,0 +1,87 @@
+import pytest
+
+from lib import github, release
+from sim.github_api import FakeGitHub
+
+
+@pytest.fixture
+def gh(workdir, monkeypatch):
+    """
+    A running `FakeGitHub` with the release module pointed at it and a fresh catalog.
+    """
+    with FakeGitHub() as server:
+        monkeypatch.setenv("GITHUB_API_URL", server.url)
+        monkeypatch.setenv("GITHUB_REPOSITORY", server.repo)
+        monkeypatch.setenv("GITHUB_TOKEN", "token")
+        monkeypatch.setattr(release, "_client", None)
+        monkeypatch.setattr(release, "_catalog", None)
+        yield server
+
+
+@pytest.fixture
+def asset(workdir):
+    path = workdir / "claude-linux-x64"
+    path.write_bytes(b"binary")
+    return path
+
+
+def _by_tag(gh):
+    return sorted((r["tag_name"], r["draft"]) for r in gh.releases.values())
+
+
+def test_draft_does_not_count_as_release(gh):
+    gh.new_release("v2.0.1", draft=True)
+    gh.new_release("v2.0.0")
+    release.load_catalog()
+
+    assert not release.release_exists("2.0.1")
+    assert release.release_exists("2.0.0")
+
+
+def test_create_release_reuses_leftover_draft(gh, asset):
+    gh.new_release("v2.0.1", draft=True)
+    kept = gh.new_release("v2.0.1", draft=True)
+    kept["assets"].append({"id": 99, "name": asset.name, "size": asset.stat().st_size, "state": "uploaded"})
+    release.load_catalog()
+
+    release.create_release("2.0.1", "notes", [asset], target="abc123")
+
+    assert _by_tag(gh) == [("v2.0.1", False)]
+    published = gh.published()["v2.0.1"]
+    assert published["id"] == kept["id"]
+    assert published["body"] == "notes"
+    assert published["target_commitish"] == "abc123"
+    assert gh.bytes_uploaded == 0
+    assert release.release_exists("2.0.1")
+
+
+def test_failed_upload_deletes_draft(gh, asset, monkeypatch):
+    release.load_catalog()
+
+    def broken(*args, **kwargs):
+        raise ValueError("unexpected")
+
+    monkeypatch.setattr(github.GitHubClient, "upload_asset", broken)
+
+    with pytest.raises(RuntimeError, match="Release creation failed"):
+        release.create_release("2.0.1", "notes", [asset])
+    assert gh.releases == {}
+
+
+def test_upload_retries_transport_errors(gh, asset, monkeypatch, no_sleep):
+    release.load_catalog()
+    upload = github.GitHubClient.upload_asset
+    calls = []
+
+    def flaky(self, *args, **kwargs):
+        calls.append(1)
+        if len(calls) == 1:
+            raise OSError("read failed")
+        return upload(self, *args, **kwargs)
+
+    monkeypatch.setattr(github.GitHubClient, "upload_asset", flaky)
+
+    release.create_release("2.0.1", "notes", [asset])
+
+    assert len(calls) == 2
+    assert _by_tag(gh) == [("v2.0.1", False)]
@@ -0,0 +1,119 @@
+import json
+
+import pytest
+
+from lib import version
+from lib.config import VERSION_FILE, VERSION_JOURNAL_FILE
+from lib.version import VersionIndex
+
+
+@pytest.fixture
+def journal(workdir, monkeypatch):
+    """
+    An empty working directory with the in-process journal count reset.
+    """
+    monkeypatch.setattr(version, "_journal_count", None)
+    return workdir / VERSION_JOURNAL_FILE
+
+
+def test_index_orders_by_version_not_text():
+    index = VersionIndex(["1.0.9", "1.0.10", "2.0.0", "1.0.100"])
+
+    assert list(index) == ["1.0.9", "1.0.10", "1.0.100", "2.0.0"]
+    assert index.descending() == ["2.0.0", "1.0.100", "1.0.10", "1.0.9"]
+    assert index.newest() == "2.0.0"
+    assert len(index) == 4
+
+
+def test_index_add_keeps_order_and_ignores_duplicates():
+    index = VersionIndex(["1.0.1", "1.0.3"])
+
+    assert index.add("1.0.2") is True
+    assert index.add("1.0.2") is False
+    assert "1.0.2" in index
+    assert list(index) == ["1.0.1", "1.0.2", "1.0.3"]
+
+
+def test_index_range_is_inclusive():
+    index = VersionIndex(["1.0.1", "1.0.2", "1.0.3", "1.0.4"])
+
+    assert index.range("1.0.2", "1.0.3") == ["1.0.2", "1.0.3"]
+    assert index.range("1.0.3") == ["1.0.3", "1.0.4"]
+    assert index.range(max_version="1.0.1") == ["1.0.1"]
+    assert index.range("1.0.5") == []
+
+
+def test_empty_index():
+    index = VersionIndex()
+
+    assert index.newest() == ""
+    assert index.descending() == []
+    assert index.missing_from(["1.0.1"]) == ["1.0.1"]
+
+
+def test_missing_from_respects_floor():
+    index = VersionIndex(["1.0.37", "1.0.39"])
+
+    assert index.missing_from(["1.0.36", "1.0.37", "1.0.38", "1.0.40"], "1.0.37") == ["1.0.38", "1.0.40"]
+
+
+def test_get_pending_sorts_oldest_first():
+    pending = version.get_pending(["2.0.1", "1.0.37", "2.0.0", "1.0.36"], ["2.0.0"])
+
+    assert pending == ["1.0.37", "2.0.1"]
+
+
+def test_save_synced_appends_to_journal(journal):
+    version.save_synced("1.0.40")
+    version.save_synced("1.0.41")
+
+    assert not (journal.parent / VERSION_FILE).exists()
+    assert [json.loads(line)["version"] for line in journal.read_text().splitlines()] == ["1.0.40", "1.0.41"]
+    assert version.load_synced() == ["1.0.41", "1.0.40"]
+
+
+def test_torn_journal_line_is_skipped_and_not_extended(journal):
+    journal.write_text('{"version": "1.0.40", "time": "t"}\n{"version": "1.0.4')
+
+    assert version.load_synced() == ["1.0.40"]
+
+    version.save_synced("1.0.41")
+
+    lines = journal.read_text().splitlines()
+    assert lines[-1].startswith('{"version": "1.0.41"')
+    assert version.load_synced() == ["1.0.41", "1.0.40"]
+
+
+def test_flush_compacts_journal_into_version_file(journal):
+    (journal.parent / VERSION_FILE).write_text(json.dumps({"synced": ["1.0.39"]}))
+    version.save_synced("1.0.41")
+    version.save_synced("1.0.40")
+
+    version.flush_synced()
+
+    data = json.loads((journal.parent / VERSION_FILE).read_text())
+    assert data["synced"] == ["1.0.41", "1.0.40", "1.0.39"]
+    assert data["latestSynced"] == "1.0.41"
+    assert not journal.exists()
+
+
+def test_journal_compacts_every_n_records(journal, monkeypatch):
+    monkeypatch.setattr(version, "VERSION_JOURNAL_COMPACT_EVERY", 3)
+    # Records left by an earlier process count towards the threshold.
+    journal.write_text('{"version": "1.0.40", "time": "t"}\n')
+
+    version.save_synced("1.0.41")
+    assert journal.exists()
+    version.save_synced("1.0.42")
+    assert not journal.exists()
+    version.save_synced("1.0.43")
+
+    assert json.loads((journal.parent / VERSION_FILE).read_text())["synced"] == ["1.0.42", "1.0.41", "1.0.40"]
+    assert version.load_synced() == ["1.0.43", "1.0.42", "1.0.41", "1.0.40"]
+
+
+def test_unreadable_version_file_is_an_error(journal):
+    (journal.parent / VERSION_FILE).write_text("{")
+
+    with pytest.raises(RuntimeError, match="Failed to read version index"):
+        version.load_synced()